@@ -1,3 +1,4 @@
+from .async_server import AsyncMerchantWebhookServer
 from .server import MerchantWebhookServer
 
-__all__ = ["MerchantWebhookServer"]
+__all__ = ["AsyncMerchantWebhookServer", "MerchantWebhookServer"]
@@ -0,0 +1,205 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler
+
+from src.merchant_receiver.server import (
+    MAX_BODY_BYTES,
+    MerchantWebhookServer,
+    count_request,
+    handle_metrics,
+    handle_webhook,
+)
+from src.observability.prometheus import CONTENT_TYPE as PROMETHEUS_CONTENT_TYPE
+
+_MAX_HEADER_BYTES = 64 * 1024
+# How long a request body may take to arrive when keep-alive is off.
+_BODY_TIMEOUT = 30.0
+
+
+class _Headers(dict):
+    """Request headers keeping their sent case, with case-insensitive ``get``."""
+
+    def __init__(self, items: list[tuple[str, str]]):
+        super().__init__(items)
+        self._lower = {k.lower(): v for k, v in items}
+
+    def get(self, key: str, default=None):
+        return self._lower.get(key.lower(), default)
+
+
+def _parse_head(head: bytes) -> tuple[str, str, str, _Headers]:
+    lines = head.decode("latin-1").split("\r\n")
+    method, path, version = lines[0].split(" ", 2)
+    items = []
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            items.append((name.strip(), value.strip()))
+    return method, path, version, _Headers(items)
+
+
+def _response(
+    code: int, content_type: str | None, body: bytes, keep_alive: bool,
+    version: str = "HTTP/1.1",
+) -> bytes:
+    reason = BaseHTTPRequestHandler.responses.get(code, ("",))[0]
+    head = [f"HTTP/1.1 {code} {reason}"]
+    if content_type:
+        head.append(f"Content-Type: {content_type}")
+    head.append(f"Content-Length: {len(body)}")
+    if not keep_alive:
+        head.append("Connection: close")
+    elif version != "HTTP/1.1":
+        # HTTP/1.0 clients close unless told the connection persists.
+        head.append("Connection: keep-alive")
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+class AsyncMerchantWebhookServer(MerchantWebhookServer):
+    """``MerchantWebhookServer`` served by one asyncio event loop.
+
+    Every connection is a coroutine on a single background thread instead
+    of an OS thread. Connections stay open between requests, including
+    pipelined ones, within the ``set_keep_alive`` limits. Configuration,
+    validation, recorded events and connection stats are the same as the
+    threaded server's.
+
+    Bodies are limited to ``MAX_BODY_BYTES`` (413 otherwise) and must
+    arrive within the keep-alive idle timeout (408 otherwise).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        secret: str | None = None,
+        backlog: int = 1024,
+    ):
+        super().__init__(host, port, secret)
+        self._backlog = backlog
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._aserver: asyncio.Server | None = None
+        self._connections: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    def start(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        started = threading.Event()
+        failure: list[BaseException] = []
+
+        def run() -> None:
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._aserver = self._loop.run_until_complete(asyncio.start_server(
+                    self._handle, self._host, self._port,
+                    backlog=self._backlog, limit=_MAX_HEADER_BYTES,
+                ))
+            except BaseException as e:
+                failure.append(e)
+                started.set()
+                return
+            # Get the actual port (useful when port=0)
+            self._port = self._aserver.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait()
+        if failure:
+            self._thread.join()
+            self._thread = None
+            self._loop.close()
+            self._loop = None
+            raise failure[0]
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+        if self._aserver is not None:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._loop.close()
+        self._loop = None
+        self._aserver = None
+
+    async def _shutdown(self) -> None:
+        self._aserver.close()
+        # Closing the transports ends each connection's read loop.
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._aserver.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        config = self._config
+        with config["lock"]:
+            config["connection_stats"]["connections"] += 1
+        loop = asyncio.get_running_loop()
+        served = 0
+        try:
+            while True:
+                idle_timeout = config["keep_alive_timeout"]
+                idle = loop.call_later(idle_timeout, writer.close) if idle_timeout > 0 else None
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.LimitOverrunError:
+                    writer.write(_response(431, None, b"", keep_alive=False))
+                    break
+                finally:
+                    if idle is not None:
+                        idle.cancel()
+                try:
+                    method, path, version, headers = _parse_head(head[:-4])
+                    length = int(headers.get("Content-Length", 0))
+                    if length < 0:
+                        raise ValueError("negative Content-Length")
+                except ValueError:
+                    writer.write(_response(400, None, b"", keep_alive=False))
+                    break
+                if "chunked" in headers.get("Transfer-Encoding", "").lower():
+                    writer.write(_response(411, None, b"", keep_alive=False))
+                    break
+                if length > MAX_BODY_BYTES:
+                    writer.write(_response(413, None, b"", keep_alive=False))
+                    break
+                try:
+                    body = await asyncio.wait_for(
+                        reader.readexactly(length), idle_timeout or _BODY_TIMEOUT,
+                    ) if length > 0 else b""
+                except asyncio.TimeoutError:
+                    writer.write(_response(408, None, b"", keep_alive=False))
+                    break
+
+                if method == "POST":
+                    delay = config["response_delay"]
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    code, response = handle_webhook(config, headers, body)
+                    content_type = "application/json"
+                elif method == "GET":
+                    code, response = handle_metrics(config, path)
+                    content_type = PROMETHEUS_CONTENT_TYPE if code == 200 else None
+                else:
+                    code, response, content_type = 501, b"", None
+
+                served += 1
+                keep_alive = count_request(config, served)
+                connection = headers.get("Connection", "").lower()
+                if version == "HTTP/1.1":
+                    keep_alive = keep_alive and connection != "close"
+                else:
+                    keep_alive = keep_alive and connection == "keep-alive"
+                writer.write(_response(code, content_type, response, keep_alive, version))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
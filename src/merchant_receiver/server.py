@@ -1,99 +1,183 @@
 import json
+import socket
 import threading
+import time
 from http.server import HTTPServer, ThreadingHTTPServer, BaseHTTPRequestHandler
 from typing import Self
 
+from src.observability.metrics import MetricsCollector
+from src.observability.prometheus import CONTENT_TYPE as PROMETHEUS_CONTENT_TYPE
+from src.observability.prometheus import PrometheusRenderer
 from src.utils.crypto import verify_signature
 
 
+_REQUIRED_FIELDS = ["payment_id", "event_type", "amount", "currency", "timestamp", "status"]
+
+# Largest request body either server backend will read.
+MAX_BODY_BYTES = 1024 * 1024
+
+
+def _json(code: int, body: dict) -> tuple[int, bytes]:
+    return code, json.dumps(body).encode()
+
+
+def handle_webhook(config: dict, headers, body: bytes) -> tuple[int, bytes]:
+    """Validate and record one webhook POST against a server ``config``.
+
+    ``headers`` needs a case-insensitive ``get`` and must convert to a dict
+    with ``dict()``. Returns the status code and JSON response body. Shared
+    by every server backend; the caller applies ``response_delay``.
+    """
+    # Parse payload
+    try:
+        payload = json.loads(body)
+    except (json.JSONDecodeError, ValueError):
+        return _json(400, {"error": "invalid JSON"})
+
+    # Validate required fields
+    missing = [f for f in _REQUIRED_FIELDS if f not in payload]
+    if missing:
+        return _json(400, {"error": f"missing fields: {missing}"})
+
+    # Validate amount is numeric
+    try:
+        float(payload["amount"])
+    except (ValueError, TypeError):
+        return _json(400, {"error": "invalid amount"})
+
+    # Signature verification
+    if config["signature_secret"]:
+        sig = headers.get("X-Webhook-Signature", "")
+        if not sig:
+            return _json(401, {"error": "missing signature"})
+        if not verify_signature(payload, config["signature_secret"], sig):
+            return _json(401, {"error": "invalid signature"})
+
+    # Idempotency check
+    event_id = headers.get("X-Event-ID", "")
+    if config["idempotency_enabled"] and event_id:
+        with config["lock"]:
+            if event_id in config["processed_event_ids"]:
+                # Return success but don't process again
+                return _json(200, {"status": "already_processed"})
+
+    # Record the event
+    with config["lock"]:
+        config["received_events"].append({
+            "event_id": event_id,
+            "payload": payload,
+            "headers": dict(headers),
+            "replay": headers.get("X-Webhook-Replay", "").lower() == "true",
+        })
+        if event_id:
+            config["processed_event_ids"].add(event_id)
+
+    code = config["response_code"]
+    if 200 <= code < 300:
+        return _json(code, {"status": "ok"})
+    return code, b""
+
+
+def handle_metrics(config: dict, path: str) -> tuple[int, bytes]:
+    """Render the metrics page for a GET of ``path``, or 404."""
+    renderer = config["metrics_renderer"]
+    if renderer is None or path.split("?", 1)[0] != config["metrics_path"]:
+        return 404, b""
+    return 200, renderer.render().encode("utf-8")
+
+
+def count_request(config: dict, served: int) -> bool:
+    """Count a request, the ``served``-th on its connection.
+
+    Returns whether the connection may stay open after responding.
+    """
+    with config["lock"]:
+        stats = config["connection_stats"]
+        stats["requests"] += 1
+        if served > 1:
+            stats["reused"] += 1
+    max_requests = config["max_requests_per_connection"]
+    return config["keep_alive_timeout"] > 0 and (max_requests is None or served < max_requests)
+
+
 class _WebhookHandler(BaseHTTPRequestHandler):
-    """HTTP request handler for receiving webhooks."""
+    """HTTP request handler for receiving webhooks.
+
+    Speaks HTTP/1.1, so a connection serves requests until the client closes
+    it, sits idle for ``keep_alive_timeout`` or reaches the per-connection cap.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        config = self.server.config  # type: ignore[attr-defined]
+        # StreamRequestHandler applies this to the socket; an idle read
+        # times out and ends the connection.
+        self.timeout = config["keep_alive_timeout"] or None
+        super().setup()
+        self.requests_served = 0
+        with config["lock"]:
+            config["connection_stats"]["connections"] += 1
+            config["open_connections"].add(self.connection)
+
+    def finish(self):
+        config = self.server.config  # type: ignore[attr-defined]
+        with config["lock"]:
+            config["open_connections"].discard(self.connection)
+        super().finish()
+
+    def _respond(
+        self, code: int, content_type: str | None, body: bytes, close: bool = False,
+    ) -> None:
+        self.requests_served += 1
+        config = self.server.config  # type: ignore[attr-defined]
+        keep_alive = count_request(config, self.requests_served) and not close
+        self.send_response(code)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if not keep_alive:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        code, body = handle_metrics(self.server.config, self.path)  # type: ignore[attr-defined]
+        self._respond(code, PROMETHEUS_CONTENT_TYPE if code == 200 else None, body)
+
+    def _content_length(self) -> int | None:
+        """The body length, or None after answering a request whose body
+        cannot be framed; the connection is then closed, since the unread
+        body would be taken for the next request."""
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            self._respond(411, None, b"", close=True)
+            return None
+        try:
+            length = int(self.headers["Content-Length"])
+        except (KeyError, TypeError, ValueError):
+            length = -1
+        if length < 0:
+            self._respond(400, None, b"", close=True)
+            return None
+        if length > MAX_BODY_BYTES:
+            self._respond(413, None, b"", close=True)
+            return None
+        return length
 
     def do_POST(self):
-        content_length = int(self.headers.get("Content-Length", 0))
+        content_length = self._content_length()
+        if content_length is None:
+            return
         body = self.rfile.read(content_length)
 
         server_config = self.server.config  # type: ignore[attr-defined]
 
         # Simulate slow response
         if server_config["response_delay"] > 0:
-            import time
             time.sleep(server_config["response_delay"])
 
-        # Parse payload
-        try:
-            payload = json.loads(body)
-        except (json.JSONDecodeError, ValueError):
-            self.send_response(400)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(json.dumps({"error": "invalid JSON"}).encode())
-            return
-
-        # Validate required fields
-        required_fields = ["payment_id", "event_type", "amount", "currency", "timestamp", "status"]
-        missing = [f for f in required_fields if f not in payload]
-        if missing:
-            self.send_response(400)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(json.dumps({"error": f"missing fields: {missing}"}).encode())
-            return
-
-        # Validate amount is numeric
-        try:
-            float(payload["amount"])
-        except (ValueError, TypeError):
-            self.send_response(400)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(json.dumps({"error": "invalid amount"}).encode())
-            return
-
-        # Signature verification
-        if server_config["signature_secret"]:
-            sig = self.headers.get("X-Webhook-Signature", "")
-            if not sig:
-                self.send_response(401)
-                self.send_header("Content-Type", "application/json")
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": "missing signature"}).encode())
-                return
-            if not verify_signature(payload, server_config["signature_secret"], sig):
-                self.send_response(401)
-                self.send_header("Content-Type", "application/json")
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": "invalid signature"}).encode())
-                return
-
-        # Idempotency check
-        event_id = self.headers.get("X-Event-ID", "")
-        if server_config["idempotency_enabled"] and event_id:
-            with server_config["lock"]:
-                if event_id in server_config["processed_event_ids"]:
-                    # Return success but don't process again
-                    self.send_response(200)
-                    self.send_header("Content-Type", "application/json")
-                    self.end_headers()
-                    self.wfile.write(json.dumps({"status": "already_processed"}).encode())
-                    return
-
-        # Record the event
-        with server_config["lock"]:
-            server_config["received_events"].append({
-                "event_id": event_id,
-                "payload": payload,
-                "headers": dict(self.headers),
-            })
-            if event_id:
-                server_config["processed_event_ids"].add(event_id)
-
-        code = server_config["response_code"]
-        self.send_response(code)
-        self.send_header("Content-Type", "application/json")
-        self.end_headers()
-        if 200 <= code < 300:
-            self.wfile.write(json.dumps({"status": "ok"}).encode())
+        code, response = handle_webhook(server_config, self.headers, body)
+        self._respond(code, "application/json", response)
 
     def log_message(self, format, *args):
         """Suppress default request logging."""
@@ -114,6 +198,12 @@ class MerchantWebhookServer:
             "received_events": [],
             "processed_event_ids": set(),
             "lock": threading.Lock(),
+            "metrics_renderer": None,
+            "metrics_path": "/metrics",
+            "keep_alive_timeout": 5.0,
+            "max_requests_per_connection": 1000,
+            "connection_stats": {"connections": 0, "requests": 0, "reused": 0},
+            "open_connections": set(),
         }
         self._server: ThreadingHTTPServer | None = None
         self._thread: threading.Thread | None = None
@@ -134,6 +224,30 @@ class MerchantWebhookServer:
         self._config["idempotency_enabled"] = True
         return self
 
+    def enable_metrics_endpoint(
+        self, metrics: MetricsCollector, path: str = "/metrics", min_interval: float = 1.0,
+    ) -> Self:
+        """Serve ``metrics`` in Prometheus text format on GET ``path``."""
+        self._config["metrics_renderer"] = PrometheusRenderer(metrics, min_interval=min_interval)
+        self._config["metrics_path"] = path
+        return self
+
+    def set_keep_alive(
+        self, idle_timeout: float = 5.0, max_requests: int | None = 1000,
+    ) -> Self:
+        """Close connections idle for ``idle_timeout`` seconds or after
+        ``max_requests`` requests. ``idle_timeout=0`` closes every
+        connection after one request."""
+        self._config["keep_alive_timeout"] = idle_timeout
+        self._config["max_requests_per_connection"] = max_requests
+        return self
+
+    def get_connection_stats(self) -> dict[str, int]:
+        """Connections accepted, requests served, and requests served on a
+        connection that had already served one."""
+        with self._config["lock"]:
+            return dict(self._config["connection_stats"])
+
     def start(self) -> None:
         self._server = ThreadingHTTPServer((self._host, self._port), _WebhookHandler)
         self._server.config = self._config  # type: ignore[attr-defined]
@@ -147,6 +261,14 @@ class MerchantWebhookServer:
             self._server.shutdown()
             self._server.server_close()
             self._server = None
+            # Handler threads would otherwise keep idle connections open.
+            with self._config["lock"]:
+                connections = list(self._config["open_connections"])
+            for conn in connections:
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
         if self._thread:
             self._thread.join(timeout=5)
             self._thread = None
@@ -155,6 +277,10 @@ class MerchantWebhookServer:
     def url(self) -> str:
         return f"http://{self._host}:{self._port}/webhook"
 
+    @property
+    def metrics_url(self) -> str:
+        return f"http://{self._host}:{self._port}{self._config['metrics_path']}"
+
     @property
     def port(self) -> int:
         return self._port
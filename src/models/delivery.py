@@ -19,3 +19,31 @@ class DeliveryAttempt:
     timestamp: datetime
     response_time_ms: float
     error: str | None = None
+
+    @property
+    def failed(self) -> bool:
+        """No response, or a 4xx/5xx one. Anything else counts as delivered."""
+        return self.status_code is None or self.status_code >= 400
+
+    def to_dict(self) -> dict:
+        return {
+            "attempt_id": self.attempt_id,
+            "event_id": self.event_id,
+            "url": self.url,
+            "status_code": self.status_code,
+            "timestamp": self.timestamp.isoformat(),
+            "response_time_ms": self.response_time_ms,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DeliveryAttempt":
+        return cls(
+            attempt_id=data["attempt_id"],
+            event_id=data["event_id"],
+            url=data["url"],
+            status_code=data["status_code"],
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            response_time_ms=data["response_time_ms"],
+            error=data.get("error"),
+        )
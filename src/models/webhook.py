@@ -12,6 +12,27 @@ class WebhookEvent:
     payload: dict
     signature: str = ""
 
+    def to_dict(self) -> dict:
+        return {
+            "event_id": self.event_id,
+            "payment_id": self.payment_id,
+            "event_type": self.event_type,
+            "timestamp": self.timestamp.isoformat(),
+            "payload": self.payload,
+            "signature": self.signature,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "WebhookEvent":
+        return cls(
+            event_id=data["event_id"],
+            payment_id=data["payment_id"],
+            event_type=data["event_type"],
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            payload=data["payload"],
+            signature=data.get("signature", ""),
+        )
+
 
 @dataclass
 class WebhookPayload:
@@ -1,4 +1,30 @@
-from .metrics import MetricsCollector
-from .alerting import AlertManager
+from .metrics import MetricsCollector, MetricsSnapshot
+from .histogram import LatencyHistogram
+from .alerting import (
+    AlertManager,
+    AlertRule,
+    BurnRateRule,
+    FailureRateRule,
+    LatencyPercentileRule,
+    VolumeDropRule,
+)
+from .dispatch import AlertDispatcher
+from .aggregation import MetricsAggregator, MetricsPublisher
+from .prometheus import MetricsHTTPServer, PrometheusRenderer
 
-__all__ = ["MetricsCollector", "AlertManager"]
+__all__ = [
+    "MetricsCollector",
+    "MetricsSnapshot",
+    "LatencyHistogram",
+    "AlertManager",
+    "AlertRule",
+    "BurnRateRule",
+    "FailureRateRule",
+    "LatencyPercentileRule",
+    "VolumeDropRule",
+    "AlertDispatcher",
+    "MetricsAggregator",
+    "MetricsPublisher",
+    "PrometheusRenderer",
+    "MetricsHTTPServer",
+]
@@ -0,0 +1,177 @@
+import json
+import logging
+import multiprocessing
+import threading
+from multiprocessing.connection import Client, Connection, Listener
+
+from src.observability.metrics import MetricsCollector
+
+log = logging.getLogger(__name__)
+
+
+def _authkey_for(address: str | tuple[str, int], authkey: bytes | None) -> bytes | None:
+    """TCP connections always authenticate; without an explicit key they use
+    this process's ``multiprocessing`` authkey, which child processes share."""
+    if authkey is None and isinstance(address, tuple):
+        return bytes(multiprocessing.current_process().authkey)
+    return authkey
+
+
+class MetricsAggregator:
+    """Collects ``MetricsCollector`` states from other processes on this host.
+
+    Listens on a local socket (a TCP address such as ``("127.0.0.1", 0)`` or a
+    Unix socket path). Each worker sends ``export_state()`` as JSON from a
+    ``MetricsPublisher``; only the latest state per worker is kept, so a
+    publish replaces the previous one instead of adding to it. ``collector``
+    merges them into one ``MetricsCollector`` for the global view.
+
+    A TCP address is always authenticated: ``authkey`` defaults to the
+    process's ``multiprocessing`` authkey, so workers started with
+    ``multiprocessing`` connect without configuration and other local users
+    cannot. A Unix socket may go without a key. Connections that fail the
+    handshake, and messages that are not a valid state, are logged and
+    dropped.
+
+    The first state accepted fixes the window and bucket layout; a state
+    with another layout could not be merged with it, so it is rejected
+    rather than breaking ``collector`` for every consumer.
+    """
+
+    def __init__(
+        self,
+        address: str | tuple[str, int] = ("127.0.0.1", 0),
+        authkey: bytes | None = None,
+    ):
+        self._listener = Listener(address, authkey=_authkey_for(address, authkey))
+        self._states: dict[str, dict] = {}
+        self._layout: tuple | None = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._accept, name="metrics-aggregator", daemon=True)
+        self._thread.start()
+
+    @property
+    def address(self) -> str | tuple[str, int]:
+        return self._listener.address
+
+    def _accept(self) -> None:
+        while not self._closed:
+            try:
+                conn = self._listener.accept()
+            except multiprocessing.AuthenticationError:
+                log.warning("Rejected a metrics connection that failed authentication")
+                continue
+            except (OSError, EOFError):
+                if self._closed:
+                    return
+                continue
+            threading.Thread(target=self._receive, args=(conn,), daemon=True).start()
+
+    def _receive(self, conn: Connection) -> None:
+        with conn:
+            while True:
+                try:
+                    data = conn.recv_bytes()
+                except (OSError, EOFError):
+                    return
+                try:
+                    message = json.loads(data)
+                    self.update(message["worker_id"], message["state"])
+                except (ValueError, KeyError, TypeError) as e:
+                    log.warning("Dropped a malformed metrics message: %s", e)
+
+    def update(self, worker_id: str, state: dict) -> None:
+        """Record a worker's state directly, without going through the socket.
+
+        Raises ValueError (or KeyError/TypeError for a malformed state) if
+        the state cannot be merged with the ones already held.
+        """
+        if state["version"] != MetricsCollector.STATE_VERSION:
+            raise ValueError(f"unsupported state version {state['version']}")
+        layout = _layout_of(state)
+        # A trial merge catches anything else collector() would trip on.
+        MetricsCollector.from_states([state])
+        with self._lock:
+            if self._layout is None:
+                self._layout = layout
+            elif layout != self._layout:
+                raise ValueError(
+                    f"worker {worker_id} uses another window layout than the other workers"
+                )
+            self._states[worker_id] = state
+
+    def workers(self) -> list[str]:
+        with self._lock:
+            return sorted(self._states)
+
+    def collector(self) -> MetricsCollector:
+        """A fresh collector holding the merged state of every worker."""
+        with self._lock:
+            states = list(self._states.values())
+        return MetricsCollector.from_states(states)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._listener.close()
+        self._thread.join(timeout=1.0)
+
+
+def _layout_of(state: dict) -> tuple:
+    return (
+        state["window_seconds"],
+        tuple(state["windows"]),
+        state["bucket_seconds"],
+        state["latency_slices"],
+        tuple(
+            (tier["span_seconds"], tier["bucket_seconds"], tier["slice_seconds"])
+            for tier in state["tiers"]
+        ),
+    )
+
+
+class MetricsPublisher:
+    """Sends a collector's state to a ``MetricsAggregator`` every ``interval`` seconds.
+
+    ``publish`` sends immediately; ``close`` sends a final state before
+    disconnecting, so the aggregator sees everything the worker recorded.
+    ``authkey`` defaults as in ``MetricsAggregator``.
+    """
+
+    def __init__(
+        self,
+        metrics: MetricsCollector,
+        address: str | tuple[str, int],
+        worker_id: str,
+        interval: float = 1.0,
+        authkey: bytes | None = None,
+    ):
+        self.metrics = metrics
+        self.worker_id = worker_id
+        self.interval = interval
+        self._conn = Client(address, authkey=_authkey_for(address, authkey))
+        self._send_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-publisher", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.publish()
+
+    def publish(self) -> None:
+        message = {"worker_id": self.worker_id, "state": self.metrics.export_state()}
+        with self._send_lock:
+            if not self._conn.closed:
+                self._conn.send_bytes(json.dumps(message).encode("utf-8"))
+
+    def close(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self.publish()
+        with self._send_lock:
+            self._conn.close()
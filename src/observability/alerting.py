@@ -1,26 +1,542 @@
-from src.observability.metrics import MetricsCollector
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+
+from src.observability.dispatch import AlertDispatcher
+from src.observability.histogram import LatencyHistogram
+from src.observability.metrics import OVERFLOW_LABEL, Label, MetricsCollector, MetricsSnapshot
+
+log = logging.getLogger(__name__)
+
+
+class MetricsView:
+    """Metric snapshots read once per evaluation and shared by every rule.
+
+    Each window is read from the collector at most once, overall and per
+    label. Filtered counts and latencies come from indexes over the
+    per-label snapshots and histograms, built once per window, so thousands
+    of rules cost one pass over the collector plus a dict lookup each.
+    """
+
+    def __init__(self, metrics: MetricsCollector):
+        self.metrics = metrics
+        self._windows: dict[float, MetricsSnapshot] | None = None
+        self._by_label: dict[float | None, dict[Label, MetricsSnapshot]] = {}
+        self._indexes: dict[float | None, dict[tuple, MetricsSnapshot]] = {}
+        self._overflow: dict[float | None, int] = {}
+        self._latency_by_label: dict[float | None, dict[Label, LatencyHistogram]] = {}
+        self._latency_indexes: dict[float | None, dict[tuple, LatencyHistogram]] = {}
+        self._latency: dict[float | None, LatencyHistogram] = {}
+
+    def by_label(self, window_seconds: float | None = None) -> dict[Label, MetricsSnapshot]:
+        snaps = self._by_label.get(window_seconds)
+        if snaps is None:
+            snaps = self._by_label[window_seconds] = self.metrics.snapshot_by_label(window_seconds)
+        return snaps
+
+    def _index(self, window_seconds: float | None) -> dict[tuple, MetricsSnapshot]:
+        # Every label contributes once to each distinct key it matches: its
+        # exact key and both partial keys, which coincide when a part is None.
+        index = self._indexes.get(window_seconds)
+        if index is not None:
+            return index
+        by_label = self.by_label(window_seconds)
+        counts: dict[Label, list[int]] = {}
+        for (e, u), snap in by_label.items():
+            for key in {(e, u), (e, None), (None, u)}:
+                entry = counts.setdefault(key, [0, 0])
+                entry[0] += snap.successes
+                entry[1] += snap.failures
+        window = window_seconds or self.metrics.window_seconds
+        overflow = by_label.get(OVERFLOW_LABEL)
+        overflow = self._overflow[window_seconds] = overflow.total if overflow else 0
+        index = self._indexes[window_seconds] = {
+            key: MetricsSnapshot(s, f, window, overflow) for key, (s, f) in counts.items()
+        }
+        return index
+
+    def snapshot(
+        self,
+        event_type: str | None = None,
+        url: str | None = None,
+        window_seconds: float | None = None,
+    ) -> MetricsSnapshot:
+        if event_type is None and url is None:
+            window = window_seconds or self.metrics.window_seconds
+            if self._windows is None:
+                self._windows = self.metrics.snapshot_windows()
+            snap = self._windows.get(window)
+            if snap is None:
+                snap = self._windows[window] = self.metrics.snapshot(window_seconds=window)
+            return snap
+        snap = self._index(window_seconds).get((event_type, url))
+        if snap is None:
+            window = window_seconds or self.metrics.window_seconds
+            snap = MetricsSnapshot(0, 0, window, self._overflow[window_seconds])
+        return snap
+
+    def latency_by_label(self, window_seconds: float | None = None) -> dict[Label, LatencyHistogram]:
+        histograms = self._latency_by_label.get(window_seconds)
+        if histograms is None:
+            histograms = self._latency_by_label[window_seconds] = self.metrics.latency_by_label(
+                window_seconds
+            )
+        return histograms
+
+    def _latency_index(self, window_seconds: float | None) -> dict[tuple, LatencyHistogram]:
+        # Keyed like _index: each label's histogram is merged into every
+        # distinct key it matches.
+        index = self._latency_indexes.get(window_seconds)
+        if index is None:
+            index = self._latency_indexes[window_seconds] = {}
+            for (e, u), histogram in self.latency_by_label(window_seconds).items():
+                for key in {(e, u), (e, None), (None, u)}:
+                    merged = index.get(key)
+                    if merged is None:
+                        index[key] = histogram.copy()
+                    else:
+                        merged.merge(histogram)
+        return index
+
+    def latency(
+        self,
+        event_type: str | None = None,
+        url: str | None = None,
+        window_seconds: float | None = None,
+    ) -> LatencyHistogram:
+        if event_type is None and url is None:
+            histogram = self._latency.get(window_seconds)
+            if histogram is None:
+                histogram = self._latency[window_seconds] = self.metrics.latency_histogram(
+                    window_seconds=window_seconds
+                )
+            return histogram
+        histogram = self._latency_index(window_seconds).get((event_type, url))
+        return histogram if histogram is not None else LatencyHistogram()
+
+
+class _RuleState:
+    __slots__ = ("firing", "streak")
+
+    def __init__(self):
+        self.firing = False
+        self.streak = 0
+
+
+class AlertRule(ABC):
+    """A condition evaluated against a ``MetricsView``, with hysteresis.
+
+    A rule measures one value per key: a single ``None`` key, or one key per
+    label when ``per_label`` is set (optionally narrowed by ``event_type`` /
+    ``url``). A key fires after ``for_checks`` consecutive breaching
+    evaluations, then stays firing until ``clears`` holds, which subclasses
+    put below the firing threshold so a value hovering at the threshold does
+    not flap. A key with no data resolves.
+    """
+
+    type = "webhook_rule"
+
+    def __init__(
+        self,
+        name: str | None = None,
+        event_type: str | None = None,
+        url: str | None = None,
+        window_seconds: float | None = None,
+        per_label: bool = False,
+        for_checks: int = 1,
+    ):
+        self.name = name or self.type
+        self.event_type = event_type
+        self.url = url
+        self.window_seconds = window_seconds
+        self.per_label = per_label
+        self.for_checks = max(1, for_checks)
+        self._states: dict[Label | None, _RuleState] = {}
+
+    def _labels(self, labels: Iterable[Label]) -> Iterator[Label]:
+        for label in labels:
+            if (self.event_type is None or label[0] == self.event_type) and (
+                self.url is None or label[1] == self.url
+            ):
+                yield label
+
+    @abstractmethod
+    def measure(self, view: MetricsView) -> Iterator[tuple[Label | None, float, dict]]:
+        """Yield ``(key, value, details)`` for every key with enough data."""
+
+    @abstractmethod
+    def fires(self, value: float) -> bool:
+        """Whether ``value`` breaches the rule."""
+
+    @abstractmethod
+    def clears(self, value: float) -> bool:
+        """Whether ``value`` resolves a firing key."""
+
+    def windows(self) -> tuple[float, ...]:
+        """Every window the rule reads, besides the collector's default."""
+        return () if self.window_seconds is None else (self.window_seconds,)
+
+    def describe(self, key: Label | None, value: float, details: dict) -> str:
+        return f"{self.name}: {value:g}"
+
+    def evaluate(self, view: MetricsView) -> list[dict]:
+        """Advance every key's state and return firing/resolved alerts."""
+        alerts = []
+        seen = set()
+        for key, value, details in self.measure(view):
+            seen.add(key)
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = _RuleState()
+            if state.firing:
+                if self.clears(value):
+                    state.firing = False
+                    state.streak = 0
+                    alerts.append(self._alert("resolved", key, value, details))
+                continue
+            if self.fires(value):
+                state.streak += 1
+                if state.streak >= self.for_checks:
+                    state.firing = True
+                    alerts.append(self._alert("firing", key, value, details))
+            else:
+                state.streak = 0
+
+        for key in [k for k in self._states if k not in seen]:
+            if self._states.pop(key).firing:
+                alerts.append(self._alert("resolved", key, None, {}))
+        return alerts
+
+    def _alert(self, state: str, key: Label | None, value: float | None, details: dict) -> dict:
+        if value is None:
+            message = f"{self.name} resolved (no data)"
+        else:
+            message = self.describe(key, value, details)
+            if state == "resolved":
+                message = f"{self.name} resolved: {message}"
+        return {
+            "type": self.type,
+            "rule": self.name,
+            "state": state,
+            "event_type": key[0] if key else self.event_type,
+            "url": key[1] if key else self.url,
+            "value": value,
+            **details,
+            "message": message,
+        }
+
+    def firing(self) -> list[Label | None]:
+        return [key for key, state in self._states.items() if state.firing]
+
+    def reset(self) -> None:
+        self._states.clear()
+
+
+class FailureRateRule(AlertRule):
+    """Fires when the failure rate exceeds ``threshold``; clears at or below
+    ``resolve_threshold`` (default: ``threshold``)."""
+
+    type = "webhook_failure_rate"
+
+    def __init__(
+        self,
+        threshold: float = 0.10,
+        resolve_threshold: float | None = None,
+        min_deliveries: int = 1,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.threshold = threshold
+        self.resolve_threshold = threshold if resolve_threshold is None else resolve_threshold
+        self.min_deliveries = min_deliveries
+
+    def measure(self, view: MetricsView) -> Iterator[tuple[Label | None, float, dict]]:
+        if self.per_label:
+            snaps = view.by_label(self.window_seconds)
+            items = ((label, snaps[label]) for label in self._labels(snaps))
+        else:
+            items = [(None, view.snapshot(self.event_type, self.url, self.window_seconds))]
+        for key, snap in items:
+            if snap.total >= self.min_deliveries:
+                yield key, snap.failure_rate, {
+                    "threshold": self.threshold,
+                    "total_deliveries": snap.total,
+                    "failed_deliveries": snap.failures,
+                }
+
+    def fires(self, value: float) -> bool:
+        return value > self.threshold
+
+    def clears(self, value: float) -> bool:
+        return value <= self.resolve_threshold
+
+    def describe(self, key, value, details) -> str:
+        where = f" for {key[0]} {key[1]}" if key else ""
+        return (
+            f"Webhook failure rate{where} {value:.1%} exceeds threshold {self.threshold:.1%} "
+            f"({details['failed_deliveries']}/{details['total_deliveries']} deliveries failed)"
+        )
+
+
+class LatencyPercentileRule(AlertRule):
+    """Fires when the ``percentile`` latency exceeds ``threshold_ms``; clears
+    at or below ``resolve_threshold_ms`` (default: ``threshold_ms``)."""
+
+    type = "webhook_latency"
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        percentile: float = 95,
+        resolve_threshold_ms: float | None = None,
+        min_deliveries: int = 1,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.threshold_ms = threshold_ms
+        self.percentile = percentile
+        self.resolve_threshold_ms = (
+            threshold_ms if resolve_threshold_ms is None else resolve_threshold_ms
+        )
+        self.min_deliveries = min_deliveries
+
+    def measure(self, view: MetricsView) -> Iterator[tuple[Label | None, float, dict]]:
+        if self.per_label:
+            histograms = view.latency_by_label(self.window_seconds)
+            items = ((label, histograms[label]) for label in self._labels(histograms))
+        else:
+            items = [(None, view.latency(self.event_type, self.url, self.window_seconds))]
+        for key, histogram in items:
+            if histogram.count >= self.min_deliveries:
+                yield key, histogram.percentile(self.percentile), {
+                    "percentile": self.percentile,
+                    "threshold_ms": self.threshold_ms,
+                    "total_deliveries": histogram.count,
+                }
+
+    def fires(self, value: float) -> bool:
+        return value > self.threshold_ms
+
+    def clears(self, value: float) -> bool:
+        return value <= self.resolve_threshold_ms
+
+    def describe(self, key, value, details) -> str:
+        where = f" for {key[0]} {key[1]}" if key else ""
+        return (
+            f"Webhook p{self.percentile:g} latency{where} {value:.1f}ms exceeds "
+            f"threshold {self.threshold_ms:.1f}ms ({details['total_deliveries']} deliveries)"
+        )
+
+
+class VolumeDropRule(AlertRule):
+    """Fires when the delivery rate in ``window_seconds`` falls below
+    ``min_ratio`` of the rate over ``baseline_window_seconds``; clears once
+    it is back to ``resolve_ratio`` (default: ``min_ratio``).
+
+    Only evaluated when the baseline window holds ``min_baseline``
+    deliveries, so a quiet start does not count as a drop.
+    """
+
+    type = "webhook_volume_drop"
+
+    def __init__(
+        self,
+        window_seconds: float,
+        baseline_window_seconds: float,
+        min_ratio: float = 0.5,
+        resolve_ratio: float | None = None,
+        min_baseline: int = 10,
+        **kwargs,
+    ):
+        super().__init__(window_seconds=window_seconds, **kwargs)
+        self.baseline_window_seconds = baseline_window_seconds
+        self.min_ratio = min_ratio
+        self.resolve_ratio = min_ratio if resolve_ratio is None else resolve_ratio
+        self.min_baseline = min_baseline
+
+    def measure(self, view: MetricsView) -> Iterator[tuple[Label | None, float, dict]]:
+        if self.per_label:
+            baseline = view.by_label(self.baseline_window_seconds)
+            recent = view.by_label(self.window_seconds)
+            empty = MetricsSnapshot(0, 0, self.window_seconds)
+            items = (
+                (label, recent.get(label, empty), baseline[label])
+                for label in self._labels(baseline)
+            )
+        else:
+            items = [(
+                None,
+                view.snapshot(self.event_type, self.url, self.window_seconds),
+                view.snapshot(self.event_type, self.url, self.baseline_window_seconds),
+            )]
+        for key, recent_snap, baseline_snap in items:
+            if baseline_snap.total < self.min_baseline:
+                continue
+            recent_rate = recent_snap.total / self.window_seconds
+            baseline_rate = baseline_snap.total / self.baseline_window_seconds
+            yield key, recent_rate / baseline_rate, {
+                "min_ratio": self.min_ratio,
+                "recent_deliveries": recent_snap.total,
+                "baseline_deliveries": baseline_snap.total,
+            }
+
+    def windows(self) -> tuple[float, ...]:
+        return (self.window_seconds, self.baseline_window_seconds)
+
+    def fires(self, value: float) -> bool:
+        return value < self.min_ratio
+
+    def clears(self, value: float) -> bool:
+        return value >= self.resolve_ratio
+
+    def describe(self, key, value, details) -> str:
+        where = f" for {key[0]} {key[1]}" if key else ""
+        return (
+            f"Webhook volume{where} dropped to {value:.0%} of the baseline rate "
+            f"(minimum {self.min_ratio:.0%})"
+        )
+
+
+class BurnRateRule(AlertRule):
+    """Multi-window SLO burn-rate alert.
+
+    The error budget is ``1 - slo_target``; the burn rate over a window is
+    its failure rate divided by the budget (1.0 spends the budget exactly
+    over the SLO period). The rule fires when both ``short_window_seconds``
+    and ``long_window_seconds`` burn faster than ``burn_rate``: the long
+    window shows the budget is really being spent, the short one that it
+    still is. It clears once either window (in practice the short one)
+    drops below ``resolve_burn_rate`` (default: ``burn_rate``).
+
+    Both windows must be tracked by the collector (``windows=``), so every
+    burn-rate rule is answered from the shared buckets.
+    """
+
+    type = "webhook_burn_rate"
+
+    def __init__(
+        self,
+        slo_target: float = 0.999,
+        short_window_seconds: float = 300,
+        long_window_seconds: float = 3600,
+        burn_rate: float = 14.4,
+        resolve_burn_rate: float | None = None,
+        min_deliveries: int = 1,
+        **kwargs,
+    ):
+        if not 0 < slo_target < 1:
+            raise ValueError("slo_target must be between 0 and 1")
+        super().__init__(window_seconds=long_window_seconds, **kwargs)
+        self.slo_target = slo_target
+        self.short_window_seconds = short_window_seconds
+        self.long_window_seconds = long_window_seconds
+        self.burn_rate = burn_rate
+        self.resolve_burn_rate = burn_rate if resolve_burn_rate is None else resolve_burn_rate
+        self.min_deliveries = min_deliveries
+
+    @property
+    def error_budget(self) -> float:
+        return 1 - self.slo_target
+
+    def windows(self) -> tuple[float, ...]:
+        return (self.short_window_seconds, self.long_window_seconds)
+
+    def measure(self, view: MetricsView) -> Iterator[tuple[Label | None, float, dict]]:
+        if self.per_label:
+            long_snaps = view.by_label(self.long_window_seconds)
+            short_snaps = view.by_label(self.short_window_seconds)
+            empty = MetricsSnapshot(0, 0, self.short_window_seconds)
+            items = (
+                (label, short_snaps.get(label, empty), long_snaps[label])
+                for label in self._labels(long_snaps)
+            )
+        else:
+            items = [(
+                None,
+                view.snapshot(self.event_type, self.url, self.short_window_seconds),
+                view.snapshot(self.event_type, self.url, self.long_window_seconds),
+            )]
+        budget = self.error_budget
+        for key, short, long in items:
+            if long.total < self.min_deliveries:
+                continue
+            short_burn = short.failure_rate / budget
+            long_burn = long.failure_rate / budget
+            yield key, min(short_burn, long_burn), {
+                "slo_target": self.slo_target,
+                "burn_rate_threshold": self.burn_rate,
+                "short_burn_rate": short_burn,
+                "long_burn_rate": long_burn,
+                "total_deliveries": long.total,
+                "failed_deliveries": long.failures,
+            }
+
+    def fires(self, value: float) -> bool:
+        return value >= self.burn_rate
+
+    def clears(self, value: float) -> bool:
+        return value < self.resolve_burn_rate
+
+    def describe(self, key, value, details) -> str:
+        where = f" for {key[0]} {key[1]}" if key else ""
+        return (
+            f"Webhook error budget{where} burning at {details['short_burn_rate']:.1f}x "
+            f"({self.short_window_seconds:g}s) / {details['long_burn_rate']:.1f}x "
+            f"({self.long_window_seconds:g}s) against a {self.slo_target:.3%} SLO "
+            f"(threshold {self.burn_rate:g}x)"
+        )
 
 
 class AlertManager:
-    """Monitors MetricsCollector and fires alerts when thresholds are exceeded."""
+    """Monitors MetricsCollector and fires alerts when thresholds are exceeded.
+
+    ``check`` and ``check_latency`` cover the single built-in thresholds.
+    ``rules`` are evaluated together by ``evaluate``, from one shared
+    ``MetricsView``, either on demand or every ``interval`` seconds on a
+    background thread between ``start`` and ``stop``.
+
+    Alerts go to ``callback`` synchronously, or, when a ``dispatcher`` is
+    given, are handed to it and sent from its worker thread instead.
+
+    A rule or callback that raises during ``evaluate`` is logged and
+    skipped, so one bad rule cannot stop the others or the background loop.
+    Rules whose windows the collector does not track are rejected with
+    ``ValueError`` when added.
+    """
 
     def __init__(
         self,
         metrics: MetricsCollector,
         threshold: float = 0.10,
         callback=None,
+        latency_threshold_ms: float | None = None,
+        latency_percentile: float = 95,
+        rules: Iterable[AlertRule] = (),
+        dispatcher: AlertDispatcher | None = None,
     ):
         self.metrics = metrics
         self.threshold = threshold
         self.callback = callback
+        self.dispatcher = dispatcher
+        self.latency_threshold_ms = latency_threshold_ms
+        self.latency_percentile = latency_percentile
         self._fired = False
+        self._latency_fired = False
         self._alerts: list[dict] = []
+        self.rules: list[AlertRule] = []
+        for rule in rules:
+            self.add_rule(rule)
+        self._evaluate_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
 
     def check(self) -> dict | None:
         """Check if failure rate exceeds threshold. Returns alert dict or None."""
-        rate = self.metrics.failure_rate()
-        total = self.metrics.total_in_window()
-        failures = self.metrics.failure_count_in_window()
+        snapshot = self.metrics.snapshot()
+        rate = snapshot.failure_rate
+        total = snapshot.total
+        failures = snapshot.failures
 
         if total == 0:
             return None
@@ -44,8 +560,7 @@ class AlertManager:
             self._fired = True
             self._alerts.append(alert)
 
-            if self.callback:
-                self.callback(alert)
+            self._notify(alert)
 
             return alert
 
@@ -53,9 +568,110 @@ class AlertManager:
         self._fired = False
         return None
 
+    def check_latency(self) -> dict | None:
+        """Check if tail latency exceeds latency_threshold_ms. Returns alert dict or None."""
+        if self.latency_threshold_ms is None:
+            return None
+
+        histogram = self.metrics.latency_histogram()
+        if histogram.count == 0:
+            return None
+
+        latency = histogram.percentile(self.latency_percentile)
+        if latency > self.latency_threshold_ms:
+            if self._latency_fired:
+                return None
+
+            alert = {
+                "type": "webhook_latency",
+                "percentile": self.latency_percentile,
+                "latency_ms": latency,
+                "threshold_ms": self.latency_threshold_ms,
+                "total_deliveries": histogram.count,
+                "message": (
+                    f"Webhook p{self.latency_percentile:g} latency {latency:.1f}ms "
+                    f"exceeds threshold {self.latency_threshold_ms:.1f}ms "
+                    f"({histogram.count} deliveries)"
+                ),
+            }
+            self._latency_fired = True
+            self._alerts.append(alert)
+
+            self._notify(alert)
+
+            return alert
+
+        self._latency_fired = False
+        return None
+
+    def _notify(self, alert: dict) -> None:
+        if self.dispatcher is not None:
+            self.dispatcher.submit(alert)
+        elif self.callback:
+            self.callback(alert)
+
+    def _notify_safely(self, alert: dict) -> None:
+        try:
+            self._notify(alert)
+        except Exception:
+            log.exception("Alert notification failed for rule %s", alert.get("rule"))
+
+    def add_rule(self, rule: AlertRule) -> AlertRule:
+        span = self.metrics.windows[-1]
+        for window in rule.windows():
+            if window > span:
+                raise ValueError(
+                    f"rule {rule.name!r} reads a {window:g}s window but the collector "
+                    f"tracks at most {span:g}s; add it to MetricsCollector(windows=...)"
+                )
+        self.rules.append(rule)
+        return rule
+
+    def evaluate(self) -> list[dict]:
+        """Evaluate every rule once. Returns the firing and resolved alerts."""
+        with self._evaluate_lock:
+            view = MetricsView(self.metrics)
+            alerts = []
+            for rule in list(self.rules):
+                try:
+                    alerts.extend(rule.evaluate(view))
+                except Exception:
+                    log.exception("Alert rule %s failed to evaluate", rule.name)
+            for alert in alerts:
+                self._alerts.append(alert)
+                self._notify_safely(alert)
+            return alerts
+
+    def start(self, interval: float = 1.0) -> None:
+        """Run ``evaluate`` every ``interval`` seconds on a background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name="alert-evaluator", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.evaluate()
+            except Exception:
+                log.exception("Alert evaluation failed")
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
     def get_alerts(self) -> list[dict]:
         return list(self._alerts)
 
     def reset(self) -> None:
         self._fired = False
+        self._latency_fired = False
         self._alerts.clear()
+        for rule in self.rules:
+            rule.reset()
@@ -0,0 +1,179 @@
+import math
+from array import array
+from bisect import bisect_left
+
+
+class BucketRing:
+    """Success and failure counters in fixed-width time buckets.
+
+    The ring covers ``span_seconds`` with ``bucket_seconds``-wide slots, each
+    holding the counts for one bucket of monotonic time. Slots are reused as
+    time moves forward, so recording is O(1), a window query is O(buckets),
+    and memory does not depend on how many deliveries are recorded. Windows
+    are measured in whole buckets, the newest of which is still filling.
+    """
+
+    def __init__(self, span_seconds: float, bucket_seconds: float):
+        if span_seconds <= 0 or bucket_seconds <= 0:
+            raise ValueError("span_seconds and bucket_seconds must be positive")
+        self.bucket_seconds = bucket_seconds
+        self.size = max(1, math.ceil(span_seconds / bucket_seconds))
+        self.successes = array("Q", bytes(8 * self.size))
+        self.failures = array("Q", bytes(8 * self.size))
+        self._head: int | None = None  # absolute index of the newest bucket
+
+    def _advance(self, idx: int) -> None:
+        head = self._head
+        if head is not None and idx <= head:
+            return
+        if head is None or idx - head >= self.size:
+            self.successes = array("Q", bytes(8 * self.size))
+            self.failures = array("Q", bytes(8 * self.size))
+        else:
+            for b in range(head + 1, idx + 1):
+                slot = b % self.size
+                self.successes[slot] = 0
+                self.failures[slot] = 0
+        self._head = idx
+
+    def add(self, now: float, success: bool, count: int = 1) -> None:
+        idx = int(now // self.bucket_seconds)
+        if success:
+            self.add_bucket(idx, count, 0)
+        else:
+            self.add_bucket(idx, 0, count)
+
+    def add_bucket(self, idx: int, successes: int, failures: int) -> None:
+        """Add counts to the bucket with absolute index ``idx``."""
+        self._advance(idx)
+        if idx <= self._head - self.size:
+            return  # older than the whole ring
+        slot = idx % self.size
+        self.successes[slot] += successes
+        self.failures[slot] += failures
+
+    def items(self, now: float) -> list[tuple[int, int, int]]:
+        """Non-empty ``(bucket, successes, failures)`` in the span, oldest first."""
+        self._advance(int(now // self.bucket_seconds))
+        result = []
+        for idx in range(self._head - self.size + 1, self._head + 1):
+            slot = idx % self.size
+            if self.successes[slot] or self.failures[slot]:
+                result.append((idx, self.successes[slot], self.failures[slot]))
+        return result
+
+    def buckets_for(self, window_seconds: float | None) -> int:
+        return _buckets_for(self.size, self.bucket_seconds, window_seconds)
+
+    def counts(self, now: float, window_seconds: float | None = None) -> tuple[int, int]:
+        """Return ``(successes, failures)`` over the most recent window."""
+        self._advance(int(now // self.bucket_seconds))
+        idx = self._head
+        n = self.buckets_for(window_seconds)
+        return _window_sum(self.successes, idx, n), _window_sum(self.failures, idx, n)
+
+    def clear(self) -> None:
+        self._head = None
+        self.successes = array("Q", bytes(8 * self.size))
+        self.failures = array("Q", bytes(8 * self.size))
+
+
+def _buckets_for(size: int, bucket_seconds: float, window_seconds: float | None) -> int:
+    if window_seconds is None:
+        return size
+    return min(size, max(1, math.ceil(window_seconds / bucket_seconds)))
+
+
+def _window_sum(column: array, idx: int, n: int) -> int:
+    size = len(column)
+    end = idx % size
+    start = (idx - n + 1) % size
+    if start <= end:
+        return sum(column[start:end + 1])
+    return sum(column[start:]) + sum(column[:end + 1])
+
+
+class SparseBucketMap:
+    """Bucketed success/failure counts for many label ids, stored sparsely.
+
+    Each id maps to a flat ``array('q')`` of ``(bucket, successes, failures)``
+    triples for the buckets it was actually recorded in, oldest first. A
+    series that sees one delivery a minute costs a few dozen bytes instead of
+    a full ring, which keeps tens of thousands of labels affordable.
+    """
+
+    def __init__(self, span_seconds: float, bucket_seconds: float):
+        self.bucket_seconds = bucket_seconds
+        self.size = max(1, math.ceil(span_seconds / bucket_seconds))
+        self.series: dict[int, array] = {}
+
+    def add(self, label_id: int, now: float, success: bool, count: int = 1) -> None:
+        idx = int(now // self.bucket_seconds)
+        data = self.series.get(label_id)
+        if data and data[-3] > idx:
+            # An out-of-order write; take the slow, ordered path.
+            self.add_bucket(label_id, idx, count if success else 0, 0 if success else count)
+            return
+        if data is None:
+            data = self.series[label_id] = array("q")
+        if data and data[-3] == idx:
+            data[-2 if success else -1] += count
+            return
+        if data and data[0] <= idx - self.size:
+            del data[:_first_after(data, idx - self.size)]
+        data.extend((idx, count if success else 0, 0 if success else count))
+
+    def add_bucket(self, label_id: int, idx: int, successes: int, failures: int) -> None:
+        """Add counts to bucket ``idx`` of a label, keeping buckets ordered."""
+        data = self.series.get(label_id)
+        if data is None:
+            data = self.series[label_id] = array("q")
+        if data and idx <= data[-3] - self.size:
+            return  # older than the whole span
+        pos = 3 * bisect_left(data[0::3], idx)
+        if pos < len(data) and data[pos] == idx:
+            data[pos + 1] += successes
+            data[pos + 2] += failures
+        else:
+            data[pos:pos] = array("q", (idx, successes, failures))
+
+    def items(self, label_id: int, now: float) -> list[tuple[int, int, int]]:
+        """Recorded ``(bucket, successes, failures)`` in the span, oldest first."""
+        data = self.series.get(label_id)
+        if not data:
+            return []
+        oldest = max(int(now // self.bucket_seconds), data[-3]) - self.size
+        first = _last_after(data, oldest)
+        return [tuple(data[i:i + 3]) for i in range(first, len(data), 3)]
+
+    def counts(
+        self, label_id: int, now: float, window_seconds: float | None = None,
+    ) -> tuple[int, int]:
+        data = self.series.get(label_id)
+        if not data:
+            return 0, 0
+        idx = max(int(now // self.bucket_seconds), data[-3])
+        n = _buckets_for(self.size, self.bucket_seconds, window_seconds)
+        first = _last_after(data, idx - n)
+        return sum(data[first + 1::3]), sum(data[first + 2::3])
+
+    def clear(self) -> None:
+        self.series.clear()
+
+
+def _first_after(data: array, idx: int) -> int:
+    """Offset of the first triple with a bucket after ``idx``, scanning from
+    the front; cheap when only a few leading buckets have expired."""
+    pos = 0
+    while pos < len(data) and data[pos] <= idx:
+        pos += 3
+    return pos
+
+
+def _last_after(data: array, idx: int) -> int:
+    """Offset of the first triple with a bucket after ``idx``, scanning from
+    the back; cheap when the window holds few buckets."""
+    pos = len(data)
+    while pos and data[pos - 3] > idx:
+        pos -= 3
+    return pos
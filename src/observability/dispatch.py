@@ -0,0 +1,187 @@
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+AlertCallback = Callable[[dict], object]
+
+_STOP = object()
+
+_OPPOSITE_STATE = {"firing": "resolved", "resolved": "firing"}
+
+
+def default_alert_key(alert: dict) -> tuple:
+    return (
+        alert.get("type"),
+        alert.get("rule"),
+        alert.get("state", "firing"),
+        alert.get("event_type"),
+        alert.get("url"),
+    )
+
+
+class AlertDispatcher:
+    """Delivers alerts to callbacks from a dedicated worker thread.
+
+    ``submit`` only enqueues, so a slow or failing alert sink never blocks
+    the thread that raised the alert. When the bounded queue is full the
+    alert is dropped (counted in ``dropped``). Alerts with the same key (by
+    default type, rule, state and label) submitted within ``dedupe_seconds``
+    of each other are sent once. Sending an alert forgets the key of its
+    opposite state, so only repeats of the same transition are deduplicated:
+    firing, resolved, firing again is sent three times.
+
+    Each callback call runs on a small pool with a ``timeout``; a call that
+    raises is retried ``retries`` more times with exponential backoff
+    starting at ``retry_backoff``. Python cannot interrupt a stuck call, so
+    a call past its timeout is not sent again: the retries keep waiting on
+    it. One still running when they run out is abandoned and counted in
+    ``dispatched`` or ``failed`` once it returns. Abandoned calls keep their
+    pool threads, so while every worker is held by one, new calls fail
+    without being queued on the pool.
+    """
+
+    def __init__(
+        self,
+        callbacks: AlertCallback | Iterable[AlertCallback],
+        max_queue: int = 1000,
+        timeout: float = 5.0,
+        retries: int = 3,
+        retry_backoff: float = 0.5,
+        dedupe_seconds: float = 60.0,
+        key: Callable[[dict], tuple] = default_alert_key,
+        max_workers: int = 4,
+    ):
+        self.callbacks = [callbacks] if callable(callbacks) else list(callbacks)
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.dedupe_seconds = dedupe_seconds
+        self.key = key
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._max_workers = max_workers
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="alert-callback",
+        )
+        self._last_sent: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._closed = False
+        self._dispatched = 0
+        self._failed = 0
+        self._dropped = 0
+        self._deduplicated = 0
+        self._abandoned = 0
+        self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, alert: dict) -> bool:
+        """Queue an alert. Returns False if it was deduplicated or dropped."""
+        if self._closed:
+            return False
+        now = time.monotonic()
+        key = self.key(alert)
+        with self._lock:
+            last = self._last_sent.get(key)
+            if last is not None and now - last < self.dedupe_seconds:
+                self._deduplicated += 1
+                return False
+            try:
+                self._queue.put_nowait(alert)
+            except queue.Full:
+                self._dropped += 1
+                return False
+            self._last_sent[key] = now
+            opposite = _OPPOSITE_STATE.get(alert.get("state", "firing"))
+            if opposite is not None:
+                self._last_sent.pop(self.key({**alert, "state": opposite}), None)
+            if len(self._last_sent) > 10_000:
+                cutoff = now - self.dedupe_seconds
+                self._last_sent = {k: t for k, t in self._last_sent.items() if t >= cutoff}
+        return True
+
+    def _run(self) -> None:
+        while True:
+            alert = self._queue.get()
+            if alert is _STOP:
+                return
+            for callback in self.callbacks:
+                self._deliver(callback, alert)
+
+    def _deliver(self, callback: AlertCallback, alert: dict) -> None:
+        future: Future | None = None
+        for attempt in range(self.retries + 1):
+            if attempt and self._stop.wait(self.retry_backoff * 2 ** (attempt - 1)):
+                break
+            if future is None:
+                with self._lock:
+                    saturated = self._abandoned >= self._max_workers
+                if saturated:
+                    continue
+                future = self._pool.submit(callback, alert)
+            # Otherwise the previous call is still running; wait on it again.
+            try:
+                future.result(timeout=self.timeout)
+            except TimeoutError:
+                if future.cancel():
+                    future = None  # never started
+                continue
+            except Exception:
+                future = None
+                continue
+            with self._lock:
+                self._dispatched += 1
+            return
+        with self._lock:
+            if future is None:
+                self._failed += 1
+                return
+            self._abandoned += 1
+        # Runs at once if the call finished after its last wait.
+        future.add_done_callback(self._settle)
+
+    def _settle(self, future: Future) -> None:
+        """Count an abandoned call once it finally returns."""
+        ok = not future.cancelled() and future.exception() is None
+        with self._lock:
+            self._abandoned -= 1
+            if ok:
+                self._dispatched += 1
+            else:
+                self._failed += 1
+
+    @property
+    def dispatched(self) -> int:
+        return self._dispatched
+
+    @property
+    def failed(self) -> int:
+        return self._failed
+
+    @property
+    def abandoned(self) -> int:
+        """Calls past their timeout that have not returned yet."""
+        return self._abandoned
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    @property
+    def deduplicated(self) -> int:
+        return self._deduplicated
+
+    def close(self, timeout: float | None = None) -> None:
+        """Send everything still queued, then stop the worker.
+
+        Retries stop once closing, so a failing sink gets one attempt per
+        queued alert and cannot hold up shutdown with backoff.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,177 @@
+import math
+
+# Values are recorded in whole microseconds. Below 2**SUB_BUCKET_BITS each
+# microsecond has its own bucket; above that every power of two is split into
+# 2**(SUB_BUCKET_BITS - 1) equal buckets, bounding the relative error to
+# 1 / 2**(SUB_BUCKET_BITS - 1) (about 1.6%).
+SUB_BUCKET_BITS = 7
+_LINEAR_LIMIT = 1 << SUB_BUCKET_BITS
+_HALF = _LINEAR_LIMIT >> 1
+
+
+def _bucket_index(value_us: int) -> int:
+    if value_us < _LINEAR_LIMIT:
+        return value_us
+    shift = value_us.bit_length() - SUB_BUCKET_BITS
+    return shift * _HALF + (value_us >> shift)
+
+
+def _bucket_lowest(index: int) -> int:
+    if index < _LINEAR_LIMIT:
+        return index
+    shift = index // _HALF - 1
+    return (index - shift * _HALF) << shift
+
+
+class LatencyHistogram:
+    """Log-linear (HDR-style) histogram of latencies in milliseconds.
+
+    Only buckets that were hit are stored, so a histogram costs a few
+    hundred bytes however many values it holds. Recording is O(1) and two
+    histograms merge by adding bucket counts.
+    """
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, value_ms: float, count: int = 1) -> None:
+        value_ms = max(value_ms, 0.0)
+        index = _bucket_index(int(value_ms * 1000))
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total_ms += value_ms * count
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        self.count += other.count
+        self.total_ms += other.total_ms
+        if other.max_ms > self.max_ms:
+            self.max_ms = other.max_ms
+
+    def to_state(self) -> dict:
+        """JSON-serializable form, restored by ``from_state``."""
+        return {
+            "counts": sorted(self.counts.items()),
+            "count": self.count,
+            "total_ms": self.total_ms,
+            "max_ms": self.max_ms,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "LatencyHistogram":
+        histogram = cls()
+        histogram.counts = {int(index): int(n) for index, n in state["counts"]}
+        histogram.count = state["count"]
+        histogram.total_ms = state["total_ms"]
+        histogram.max_ms = state["max_ms"]
+        return histogram
+
+    def copy(self) -> "LatencyHistogram":
+        clone = LatencyHistogram()
+        clone.merge(self)
+        return clone
+
+    def percentile(self, p: float) -> float:
+        """Nearest-rank percentile in ms: the highest value equivalent to the
+        bucket holding that rank, capped at the recorded maximum."""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                highest_us = _bucket_lowest(index + 1) - 1
+                return min(highest_us / 1000, self.max_ms)
+        return self.max_ms
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max_ms,
+        }
+
+
+class WindowedHistogram:
+    """Rolling-window latency histogram made of ``slices`` time slices.
+
+    Each slice is a ``LatencyHistogram`` covering ``window_seconds / slices``
+    of monotonic time; slices that fall out of the window are dropped as new
+    ones start. A query merges the slices inside the window.
+    """
+
+    __slots__ = ("slice_seconds", "slices", "_ring")
+
+    def __init__(self, window_seconds: float, slices: int = 10):
+        self.slice_seconds = window_seconds / slices
+        self.slices = slices
+        self._ring: list[tuple[int, LatencyHistogram]] = []  # oldest first
+
+    def record(self, now: float, value_ms: float) -> None:
+        idx = int(now // self.slice_seconds)
+        ring = self._ring
+        if ring and ring[-1][0] > idx:
+            # An out-of-order write; take the slow, ordered path.
+            histogram = LatencyHistogram()
+            histogram.record(value_ms)
+            self.merge_slice(idx, histogram)
+            return
+        if not ring or ring[-1][0] < idx:
+            ring.append((idx, LatencyHistogram()))
+            while ring[0][0] <= idx - self.slices:
+                ring.pop(0)
+        ring[-1][1].record(value_ms)
+
+    def merge_slice(self, idx: int, histogram: LatencyHistogram) -> None:
+        """Merge a histogram into slice ``idx``, keeping slices ordered."""
+        ring = self._ring
+        if ring and idx <= ring[-1][0] - self.slices:
+            return
+        for pos, (slice_idx, existing) in enumerate(ring):
+            if slice_idx == idx:
+                existing.merge(histogram)
+                return
+            if slice_idx > idx:
+                ring.insert(pos, (idx, histogram.copy()))
+                return
+        ring.append((idx, histogram.copy()))
+        while ring[0][0] <= idx - self.slices:
+            ring.pop(0)
+
+    def items(self, now: float) -> list[tuple[int, LatencyHistogram]]:
+        """``(slice, histogram)`` pairs still inside the window, oldest first."""
+        idx = int(now // self.slice_seconds)
+        if self._ring:
+            idx = max(idx, self._ring[-1][0])
+        return [(i, h) for i, h in self._ring if i > idx - self.slices]
+
+    def snapshot(self, now: float, window_seconds: float | None = None) -> LatencyHistogram:
+        idx = int(now // self.slice_seconds)
+        if self._ring:
+            idx = max(idx, self._ring[-1][0])
+        n = self.slices
+        if window_seconds is not None:
+            n = min(self.slices, max(1, math.ceil(window_seconds / self.slice_seconds)))
+        merged = LatencyHistogram()
+        for slice_idx, histogram in self._ring:
+            if slice_idx > idx - n:
+                merged.merge(histogram)
+        return merged
+
+    def clear(self) -> None:
+        self._ring.clear()
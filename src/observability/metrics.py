@@ -1,57 +1,652 @@
+import math
 import threading
 import time
+from dataclasses import dataclass
 
+from src.observability.buckets import BucketRing, SparseBucketMap
+from src.observability.histogram import LatencyHistogram, WindowedHistogram
+from src.utils.sharding import ThreadShards
 
-class MetricsCollector:
-    """Collects and computes webhook delivery metrics with rolling windows."""
+Label = tuple[str | None, str | None]  # (event_type, url)
 
-    def __init__(self, window_seconds: float = 300):
-        self._window_seconds = window_seconds
-        self._successes: list[float] = []  # timestamps
-        self._failures: list[float] = []
+OVERFLOW_LABEL: Label = ("__overflow__", "__overflow__")
+
+# Buckets per window in the coarser tiers used for longer windows.
+_BUCKETS_PER_WINDOW = 100
+
+
+class _TierBuckets:
+    """Counts and latency slices for the windows sharing one bucket width."""
+
+    __slots__ = ("ring", "labels", "latency")
+
+    def __init__(self, span_seconds: float, bucket_seconds: float, latency_slices: int):
+        self.ring = BucketRing(span_seconds, bucket_seconds)
+        self.labels = SparseBucketMap(span_seconds, bucket_seconds)
+        self.latency = WindowedHistogram(span_seconds, latency_slices)
+
+    def clear(self) -> None:
+        self.ring.clear()
+        self.labels.clear()
+        self.latency.clear()
+
+
+class _LabelLatency:
+    """Per-label latency histograms for every tier, shared by all shards.
+
+    A label's histograms cost far more than its counts, so they are kept
+    once rather than per shard, and only for the first ``max_labels``
+    labels to record a latency; later labels record under
+    ``OVERFLOW_LABEL`` (id 0).
+    """
+
+    def __init__(self, layout: list[tuple[float, float, int]], max_labels: int):
+        self.lock = threading.Lock()
+        self.max_labels = max_labels
+        self.overflowed = False
+        self._layout = layout
+        self.tiers: list[dict[int, WindowedHistogram]] = [{} for _ in layout]
+
+    def histograms(self, label_id: int) -> list[WindowedHistogram]:
+        """The label's histogram in each tier, created if needed. Caller
+        must hold ``lock``."""
+        if label_id not in self.tiers[0]:
+            if label_id and len(self.tiers[0]) - (0 in self.tiers[0]) >= self.max_labels:
+                self.overflowed = True
+                return self.histograms(0)
+            for tier, (span, _, slices) in zip(self.tiers, self._layout):
+                tier[label_id] = WindowedHistogram(span, slices)
+        return [tier[label_id] for tier in self.tiers]
+
+    def clear(self) -> None:
+        with self.lock:
+            for tier in self.tiers:
+                tier.clear()
+            self.overflowed = False
+
+
+class _RecordShard:
+    """Bucketed counts recorded by the threads pinned to one shard."""
+
+    __slots__ = ("lock", "tiers", "totals", "label_totals")
+
+    def __init__(self, layout: list[tuple[float, float, int]]):
+        self.lock = threading.Lock()
+        self.tiers = [_TierBuckets(*tier) for tier in layout]
+        self.totals = [0, 0]  # lifetime successes, failures
+        self.label_totals: dict[int, list[int]] = {}
+
+
+class _LabelTable:
+    """Interns ``(event_type, url)`` label tuples to small ids.
+
+    Once ``max_label_sets`` distinct labels exist, new ones all map to
+    ``OVERFLOW_LABEL`` so cardinality, and memory, stay bounded. Labels are
+    never evicted individually; ``clear`` drops them all and bumps
+    ``generation``, so ids interned before it can be detected as stale.
+    """
+
+    def __init__(self, max_label_sets: int):
+        self.max_label_sets = max_label_sets
+        self.labels: list[Label] = [OVERFLOW_LABEL]
+        self._ids: dict[Label, int] = {OVERFLOW_LABEL: 0}
         self._lock = threading.Lock()
+        self.overflowed = False
+        self.generation = 0
 
-    def record_success(self, event_type: str | None = None) -> None:
+    def intern(self, label: Label) -> int:
+        idx = self._ids.get(label)
+        if idx is not None:
+            return idx
         with self._lock:
-            self._successes.append(time.monotonic())
+            idx = self._ids.get(label)
+            if idx is None:
+                if len(self.labels) > self.max_label_sets:
+                    self.overflowed = True
+                    return 0
+                idx = len(self.labels)
+                self.labels.append(label)
+                self._ids[label] = idx
+            return idx
+
+    def matching(self, event_type: str | None, url: str | None) -> list[int]:
+        """Ids of labels matching the filter; None matches any value."""
+        if event_type is not None and url is not None:
+            idx = self._ids.get((event_type, url))
+            return [] if idx is None else [idx]
+        return [
+            idx for idx, (e, u) in enumerate(list(self.labels))
+            if (event_type is None or e == event_type) and (url is None or u == url)
+        ]
 
-    def record_failure(self, event_type: str | None = None) -> None:
+    def clear(self) -> None:
         with self._lock:
-            self._failures.append(time.monotonic())
+            self.labels = [OVERFLOW_LABEL]
+            self._ids = {OVERFLOW_LABEL: 0}
+            self.overflowed = False
+            self.generation += 1
+
+
+@dataclass(frozen=True)
+class MetricsSnapshot:
+    """Window statistics taken together in one pass over the collector.
+
+    A snapshot filtered by label cannot see deliveries counted under
+    ``OVERFLOW_LABEL``. ``overflow`` is how many of those fell in the
+    window; it bounds what the filter may have missed, and is 0 when no
+    label has overflowed or the snapshot is unfiltered.
+    """
+
+    successes: int
+    failures: int
+    window_seconds: float
+    overflow: int = 0
 
-    def _prune(self, data: list[float], now: float) -> list[float]:
-        cutoff = now - self._window_seconds
-        return [t for t in data if t >= cutoff]
+    @property
+    def total(self) -> int:
+        return self.successes + self.failures
+
+    @property
+    def failure_rate(self) -> float:
+        """Failure rate in the window (0.0 to 1.0)."""
+        if self.total == 0:
+            return 0.0
+        return self.failures / self.total
+
+
+class MetricsCollector:
+    """Collects and computes webhook delivery metrics with rolling windows.
+
+    Counts are kept in a ring of fixed time buckets (``bucket_seconds`` wide,
+    by default 1s or 1/100 of the window if that is smaller), so memory is
+    constant and a query sums at most one ring per shard. Recording only
+    touches the calling thread's shard; queries sum all shards, so they see
+    every record call that returned before them.
+
+    Deliveries recorded with an ``event_type`` and/or ``url`` are also
+    counted per label, in sparse per-label buckets. At most
+    ``max_label_sets`` labels are tracked until ``reset``; further labels
+    are counted under ``OVERFLOW_LABEL`` and reported in the ``overflow``
+    field of filtered snapshots.
+
+    When a ``latency_ms`` is recorded it also goes into a log-linear latency
+    histogram, overall and per label, kept as time slices across the window
+    for rolling percentile queries. Per-label histograms are not sharded and
+    are kept for at most ``max_latency_label_sets`` labels; later labels'
+    latencies are recorded under ``OVERFLOW_LABEL``.
+
+    ``windows`` adds further rolling windows (for example 60s and 3600s next
+    to the default 300s). The shortest window uses ``bucket_seconds``; each
+    longer window gets its own tier of about 100 buckets (36s wide for an
+    hour), and latency slices to match, so a long window does not cost
+    thousands of fine buckets per shard and label. A query reads the
+    narrowest tier that covers it; ``snapshot_windows`` returns every window
+    from one pass.
+
+    Lifetime success/failure counters are kept next to the windows.
+    ``export_state`` turns everything into a JSON-serializable dict that
+    ``merge_state`` (or ``from_states``) folds into another collector, which
+    is how collectors in separate processes on one host are combined.
+    """
+
+    STATE_VERSION = 2
+
+    def __init__(
+        self,
+        window_seconds: float = 300,
+        shards: int = 16,
+        bucket_seconds: float | None = None,
+        max_label_sets: int = 50_000,
+        latency_slices: int = 10,
+        windows: tuple[float, ...] = (),
+        max_latency_label_sets: int = 5_000,
+    ):
+        self._window_seconds = window_seconds
+        self._latency_slices = latency_slices
+        self._windows = tuple(sorted({window_seconds, *windows}))
+        span = self._windows[-1]
+        if bucket_seconds is None:
+            bucket_seconds = min(1.0, self._windows[0] / _BUCKETS_PER_WINDOW)
+        self._bucket_seconds = bucket_seconds
+        self._span_seconds = span
+        self._layout = _tier_layout(self._windows, bucket_seconds, latency_slices)
+        self._shards = ThreadShards(shards, lambda: _RecordShard(self._layout))
+        self._labels = _LabelTable(max_label_sets)
+        self._label_latency = _LabelLatency(self._layout, max_latency_label_sets)
+
+    @property
+    def window_seconds(self) -> float:
+        return self._window_seconds
+
+    @property
+    def windows(self) -> tuple[float, ...]:
+        return self._windows
+
+    def record_success(
+        self,
+        event_type: str | None = None,
+        url: str | None = None,
+        latency_ms: float | None = None,
+    ) -> None:
+        self._record(True, event_type, url, latency_ms)
+
+    def record_failure(
+        self,
+        event_type: str | None = None,
+        url: str | None = None,
+        latency_ms: float | None = None,
+    ) -> None:
+        self._record(False, event_type, url, latency_ms)
+
+    def _record(
+        self,
+        success: bool,
+        event_type: str | None,
+        url: str | None,
+        latency_ms: float | None,
+    ) -> None:
+        now = time.monotonic()
+        label_id = None
+        labelled = event_type is not None or url is not None
+        if labelled:
+            generation = self._labels.generation
+            label_id = self._labels.intern((event_type, url))
+        shard = self._shards.local()
+        outcome = 0 if success else 1
+        with shard.lock:
+            if labelled and self._labels.generation != generation:
+                # reset() ran after interning; the id may now name another label.
+                label_id = self._labels.intern((event_type, url))
+            shard.totals[outcome] += 1
+            for tier in shard.tiers:
+                tier.ring.add(now, success)
+                if latency_ms is not None:
+                    tier.latency.record(now, latency_ms)
+                if label_id is not None:
+                    tier.labels.add(label_id, now, success)
+            if label_id is not None:
+                totals = shard.label_totals.get(label_id)
+                if totals is None:
+                    totals = shard.label_totals[label_id] = [0, 0]
+                totals[outcome] += 1
+                if latency_ms is not None:
+                    # Taken under the shard lock, so reset() cannot run in between.
+                    with self._label_latency.lock:
+                        for histogram in self._label_latency.histograms(label_id):
+                            histogram.record(now, latency_ms)
+
+    def _check_window(self, window_seconds: float | None) -> float:
+        if window_seconds is None:
+            return self._window_seconds
+        if window_seconds > self._span_seconds:
+            raise ValueError(
+                f"window {window_seconds}s exceeds the longest tracked window "
+                f"({self._span_seconds}s)"
+            )
+        return window_seconds
+
+    def _tier_for(self, window_seconds: float) -> int:
+        """Index of the narrowest tier whose span covers the window."""
+        for i, (span, _, _) in enumerate(self._layout):
+            if window_seconds <= span:
+                return i
+        return len(self._layout) - 1
+
+    def _collect(
+        self,
+        windows: tuple[float, ...],
+        event_type: str | None,
+        url: str | None,
+    ) -> dict[float, MetricsSnapshot]:
+        now = time.monotonic()
+        totals = {w: [0, 0, 0] for w in windows}
+        unlabelled = event_type is None and url is None
+        label_ids = [] if unlabelled else self._labels.matching(event_type, url)
+        overflowed = not unlabelled and self._labels.overflowed
+        tiers = {w: self._tier_for(w) for w in windows}
+        for shard in self._shards:
+            with shard.lock:
+                for w, counts in totals.items():
+                    tier = shard.tiers[tiers[w]]
+                    if unlabelled:
+                        s, f = tier.ring.counts(now, w)
+                        counts[0] += s
+                        counts[1] += f
+                        continue
+                    for label_id in label_ids:
+                        s, f = tier.labels.counts(label_id, now, w)
+                        counts[0] += s
+                        counts[1] += f
+                    if overflowed:
+                        counts[2] += sum(tier.labels.counts(0, now, w))
+        return {w: MetricsSnapshot(s, f, w, o) for w, (s, f, o) in totals.items()}
+
+    def snapshot(
+        self,
+        event_type: str | None = None,
+        url: str | None = None,
+        window_seconds: float | None = None,
+    ) -> MetricsSnapshot:
+        """All window statistics from a single pass over the shards.
+
+        Each shard lock is taken once, and every derived figure comes from
+        the same counts, so they always agree with each other. Passing
+        ``event_type`` and/or ``url`` restricts the counts to matching labels;
+        ``window_seconds`` picks a window other than the default one.
+        """
+        window = self._check_window(window_seconds)
+        return self._collect((window,), event_type, url)[window]
+
+    def snapshot_windows(
+        self, event_type: str | None = None, url: str | None = None,
+    ) -> dict[float, MetricsSnapshot]:
+        """Snapshots for every configured window, keyed by window length."""
+        return self._collect(self._windows, event_type, url)
+
+    def snapshot_by_label(self, window_seconds: float | None = None) -> dict[Label, MetricsSnapshot]:
+        """Window statistics for every tracked label, from one pass."""
+        window = self._check_window(window_seconds)
+        t = self._tier_for(window)
+        now = time.monotonic()
+        totals: dict[int, list[int]] = {}
+        for shard in self._shards:
+            with shard.lock:
+                buckets = shard.tiers[t].labels
+                for label_id in list(buckets.series):
+                    s, f = buckets.counts(label_id, now, window)
+                    if s or f:
+                        counts = totals.setdefault(label_id, [0, 0])
+                        counts[0] += s
+                        counts[1] += f
+        labels = self._labels.labels
+        return {
+            labels[label_id]: MetricsSnapshot(s, f, window)
+            for label_id, (s, f) in totals.items()
+        }
+
+    def latency_histogram(
+        self,
+        event_type: str | None = None,
+        url: str | None = None,
+        window_seconds: float | None = None,
+    ) -> LatencyHistogram:
+        """Latencies recorded in the window, merged across shards.
+
+        Filters work as in ``snapshot``. The result is a detached copy, so it
+        can be merged with histograms from other collectors.
+        """
+        window = self._check_window(window_seconds)
+        t = self._tier_for(window)
+        now = time.monotonic()
+        merged = LatencyHistogram()
+        if event_type is None and url is None:
+            for shard in self._shards:
+                with shard.lock:
+                    merged.merge(shard.tiers[t].latency.snapshot(now, window))
+            return merged
+
+        label_ids = self._labels.matching(event_type, url)
+        with self._label_latency.lock:
+            histograms = self._label_latency.tiers[t]
+            for label_id in label_ids:
+                histogram = histograms.get(label_id)
+                if histogram is not None:
+                    merged.merge(histogram.snapshot(now, window))
+        return merged
+
+    def totals(self) -> tuple[int, int]:
+        """Lifetime ``(successes, failures)``, not limited to any window."""
+        successes = failures = 0
+        for shard in self._shards:
+            with shard.lock:
+                successes += shard.totals[0]
+                failures += shard.totals[1]
+        return successes, failures
+
+    def totals_by_label(self) -> dict[Label, tuple[int, int]]:
+        """Lifetime ``(successes, failures)`` for every tracked label."""
+        totals: dict[int, list[int]] = {}
+        for shard in self._shards:
+            with shard.lock:
+                for label_id, (s, f) in shard.label_totals.items():
+                    counts = totals.setdefault(label_id, [0, 0])
+                    counts[0] += s
+                    counts[1] += f
+        labels = self._labels.labels
+        return {labels[label_id]: (s, f) for label_id, (s, f) in totals.items()}
+
+    def latency_by_label(self, window_seconds: float | None = None) -> dict[Label, LatencyHistogram]:
+        """Windowed latency histograms for every label that recorded one."""
+        window = self._check_window(window_seconds)
+        t = self._tier_for(window)
+        now = time.monotonic()
+        merged: dict[int, LatencyHistogram] = {}
+        with self._label_latency.lock:
+            for label_id, histogram in self._label_latency.tiers[t].items():
+                snap = histogram.snapshot(now, window)
+                if snap.count:
+                    merged[label_id] = snap
+        labels = self._labels.labels
+        return {labels[label_id]: histogram for label_id, histogram in merged.items()}
+
+    def export_state(self) -> dict:
+        """Serializable, mergeable copy of every counter, bucket and histogram.
+
+        Buckets are keyed by absolute ``time.monotonic()`` bucket index, so
+        states from processes sharing a host clock line up when merged. Each
+        tier is exported separately; both sides of a merge need the same
+        tier layout.
+        """
+        now = time.monotonic()
+        count = len(self._layout)
+        totals = [0, 0]
+        buckets: list[dict[int, list[int]]] = [{} for _ in range(count)]
+        latency: list[dict[int, LatencyHistogram]] = [{} for _ in range(count)]
+        labels: dict[int, dict] = {}
+
+        def label_entry(label_id: int) -> dict:
+            entry = labels.get(label_id)
+            if entry is None:
+                entry = labels[label_id] = {
+                    "totals": [0, 0],
+                    "buckets": [{} for _ in range(count)],
+                    "latency": [{} for _ in range(count)],
+                }
+            return entry
+
+        for shard in self._shards:
+            with shard.lock:
+                totals[0] += shard.totals[0]
+                totals[1] += shard.totals[1]
+                for t, tier in enumerate(shard.tiers):
+                    _merge_bucket_items(buckets[t], tier.ring.items(now))
+                    _merge_slice_items(latency[t], tier.latency.items(now))
+                for label_id, counts in shard.label_totals.items():
+                    entry = label_entry(label_id)
+                    entry["totals"][0] += counts[0]
+                    entry["totals"][1] += counts[1]
+                    for t, tier in enumerate(shard.tiers):
+                        _merge_bucket_items(entry["buckets"][t], tier.labels.items(label_id, now))
+        with self._label_latency.lock:
+            for t, histograms in enumerate(self._label_latency.tiers):
+                for label_id, histogram in histograms.items():
+                    _merge_slice_items(label_entry(label_id)["latency"][t], histogram.items(now))
+
+        label_names = self._labels.labels
+        return {
+            "version": self.STATE_VERSION,
+            "window_seconds": self._window_seconds,
+            "windows": list(self._windows),
+            "bucket_seconds": self._bucket_seconds,
+            "latency_slices": self._latency_slices,
+            "totals": totals,
+            "tiers": [
+                {
+                    "span_seconds": span,
+                    "bucket_seconds": width,
+                    "slice_seconds": span / slices,
+                    "buckets": _bucket_state(buckets[t]),
+                    "latency": _slice_state(latency[t]),
+                }
+                for t, (span, width, slices) in enumerate(self._layout)
+            ],
+            "labels": [
+                {
+                    "event_type": label_names[label_id][0],
+                    "url": label_names[label_id][1],
+                    "totals": entry["totals"],
+                    "tiers": [
+                        {
+                            "buckets": _bucket_state(entry["buckets"][t]),
+                            "latency": _slice_state(entry["latency"][t]),
+                        }
+                        for t in range(count)
+                    ],
+                }
+                for label_id, entry in labels.items()
+            ],
+        }
+
+    def merge_state(self, state: dict) -> None:
+        """Add the counts from ``export_state()`` of another collector."""
+        if state.get("version") != self.STATE_VERSION:
+            raise ValueError(f"Unsupported metrics state version: {state.get('version')}")
+        if len(state["tiers"]) != len(self._layout):
+            raise ValueError("Cannot merge metrics with different windows")
+        for tier, (span, width, slices) in zip(state["tiers"], self._layout):
+            if not math.isclose(tier["bucket_seconds"], width):
+                raise ValueError("Cannot merge metrics with a different bucket width")
+            if not math.isclose(tier["span_seconds"], span):
+                raise ValueError("Cannot merge metrics with different windows")
+            if not math.isclose(tier["slice_seconds"], span / slices):
+                raise ValueError("Cannot merge metrics with a different latency slice width")
+
+        shard = self._shards.local()
+        with shard.lock:
+            shard.totals[0] += state["totals"][0]
+            shard.totals[1] += state["totals"][1]
+            for tier, tier_state in zip(shard.tiers, state["tiers"]):
+                for idx, s, f in tier_state["buckets"]:
+                    tier.ring.add_bucket(idx, s, f)
+                for idx, histogram in tier_state["latency"]:
+                    tier.latency.merge_slice(idx, LatencyHistogram.from_state(histogram))
+        for entry in state["labels"]:
+            label_id = self._labels.intern((entry["event_type"], entry["url"]))
+            with shard.lock:
+                totals = shard.label_totals.setdefault(label_id, [0, 0])
+                totals[0] += entry["totals"][0]
+                totals[1] += entry["totals"][1]
+                for tier, tier_state in zip(shard.tiers, entry["tiers"]):
+                    for idx, s, f in tier_state["buckets"]:
+                        tier.labels.add_bucket(label_id, idx, s, f)
+                if any(tier_state["latency"] for tier_state in entry["tiers"]):
+                    with self._label_latency.lock:
+                        histograms = self._label_latency.histograms(label_id)
+                        for histogram, tier_state in zip(histograms, entry["tiers"]):
+                            for idx, hist_state in tier_state["latency"]:
+                                histogram.merge_slice(
+                                    idx, LatencyHistogram.from_state(hist_state),
+                                )
+
+    @classmethod
+    def from_states(cls, states: list[dict], **kwargs) -> "MetricsCollector":
+        """Build a collector configured like the first state and merge them all."""
+        if not states:
+            return cls(**kwargs)
+        first = states[0]
+        config = {
+            "window_seconds": first["window_seconds"],
+            "windows": tuple(first["windows"]),
+            "bucket_seconds": first["bucket_seconds"],
+            "latency_slices": first["latency_slices"],
+            **kwargs,
+        }
+        collector = cls(**config)
+        for state in states:
+            collector.merge_state(state)
+        return collector
 
     def failure_rate(self) -> float:
         """Failure rate in the current rolling window (0.0 to 1.0)."""
-        with self._lock:
-            now = time.monotonic()
-            successes = self._prune(self._successes, now)
-            failures = self._prune(self._failures, now)
-            total = len(successes) + len(failures)
-            if total == 0:
-                return 0.0
-            return len(failures) / total
+        return self.snapshot().failure_rate
 
     def total_in_window(self) -> int:
-        with self._lock:
-            now = time.monotonic()
-            successes = self._prune(self._successes, now)
-            failures = self._prune(self._failures, now)
-            return len(successes) + len(failures)
+        return self.snapshot().total
 
     def failure_count_in_window(self) -> int:
-        with self._lock:
-            now = time.monotonic()
-            return len(self._prune(self._failures, now))
+        return self.snapshot().failures
 
     def success_count_in_window(self) -> int:
-        with self._lock:
-            now = time.monotonic()
-            return len(self._prune(self._successes, now))
+        return self.snapshot().successes
 
     def reset(self) -> None:
-        with self._lock:
-            self._successes.clear()
-            self._failures.clear()
+        """Drop every count and label.
+
+        All shard locks are held together, so no recording lands between
+        clearing the shards and the label table; a recording that interned
+        its label before the reset re-interns it.
+        """
+        shards = list(self._shards)
+        for shard in shards:
+            shard.lock.acquire()
+        try:
+            for shard in shards:
+                for tier in shard.tiers:
+                    tier.clear()
+                shard.totals = [0, 0]
+                shard.label_totals.clear()
+            self._label_latency.clear()
+            self._labels.clear()
+        finally:
+            for shard in shards:
+                shard.lock.release()
+
+
+def _tier_layout(
+    windows: tuple[float, ...], bucket_seconds: float, latency_slices: int,
+) -> list[tuple[float, float, int]]:
+    """``(span_seconds, bucket_seconds, slices)`` per tier, narrowest first.
+
+    The shortest window sets the finest tier; a longer window joins the
+    previous tier when it would get the same bucket width, else starts a
+    coarser one. Slices are ``latency_slices`` per shortest window in a tier.
+    """
+    tiers: list[list[float]] = []  # [span, width, shortest window]
+    for window in windows:
+        width = bucket_seconds
+        if tiers:
+            width = max(bucket_seconds, window / _BUCKETS_PER_WINDOW)
+        if tiers and math.isclose(tiers[-1][1], width):
+            tiers[-1][0] = window
+        else:
+            tiers.append([window, width, window])
+    return [
+        (span, width, max(1, math.ceil(span * latency_slices / shortest)))
+        for span, width, shortest in tiers
+    ]
+
+
+def _merge_bucket_items(target: dict[int, list[int]], items: list[tuple[int, int, int]]) -> None:
+    for idx, s, f in items:
+        counts = target.setdefault(idx, [0, 0])
+        counts[0] += s
+        counts[1] += f
+
+
+def _merge_slice_items(
+    target: dict[int, LatencyHistogram], items: list[tuple[int, LatencyHistogram]],
+) -> None:
+    for idx, histogram in items:
+        existing = target.get(idx)
+        if existing is None:
+            target[idx] = histogram.copy()
+        else:
+            existing.merge(histogram)
+
+
+def _bucket_state(buckets: dict[int, list[int]]) -> list[list[int]]:
+    return [[idx, s, f] for idx, (s, f) in sorted(buckets.items())]
+
+
+def _slice_state(slices: dict[int, LatencyHistogram]) -> list[list]:
+    return [[idx, histogram.to_state()] for idx, histogram in sorted(slices.items())]
@@ -0,0 +1,232 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.observability.histogram import LatencyHistogram
+from src.observability.metrics import Label, MetricsCollector
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _escape(value: str | None) -> str:
+    if value is None:
+        return ""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class PrometheusRenderer:
+    """Renders a ``MetricsCollector`` in the Prometheus text format.
+
+    Exposed series:
+
+    - ``webhook_deliveries_total{outcome}`` and
+      ``webhook_label_deliveries_total{event_type,url,outcome}``: lifetime
+      counters.
+    - ``webhook_window_deliveries{window,outcome}`` and
+      ``webhook_window_failure_rate{window}``: every rolling window.
+    - ``webhook_label_failure_rate{event_type,url}``: default window.
+    - ``webhook_delivery_latency_seconds`` and
+      ``webhook_label_delivery_latency_seconds``: summaries (p50/p95/p99,
+      sum, count) over the default window.
+
+    The whole page is reused for ``min_interval`` seconds. Past that, every
+    render takes full snapshots of the collector; only the string formatting
+    is cached. Each label's escaped label set, and its counter and latency
+    lines, are kept and reused while its values are unchanged. Cache entries
+    for labels missing from a render are dropped, so the caches never
+    outgrow the collector's labels and empty out after its ``reset``.
+    """
+
+    def __init__(self, metrics: MetricsCollector, min_interval: float = 1.0):
+        self.metrics = metrics
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._text = ""
+        self._rendered_at: float | None = None
+        self._label_text: dict[Label, str] = {}
+        self._counter_lines: dict[Label, tuple[tuple[int, int], str]] = {}
+        self._latency_lines: dict[Label, tuple[tuple, str]] = {}
+
+    def render(self) -> str:
+        with self._lock:
+            now = time.monotonic()
+            if self._rendered_at is None or now - self._rendered_at >= self.min_interval:
+                self._text = self._render()
+                self._rendered_at = now
+            return self._text
+
+    def _labels(self, label: Label) -> str:
+        text = self._label_text.get(label)
+        if text is None:
+            text = self._label_text[label] = (
+                f'event_type="{_escape(label[0])}",url="{_escape(label[1])}"'
+            )
+        return text
+
+    def _render(self) -> str:
+        metrics = self.metrics
+        lines = []
+
+        successes, failures = metrics.totals()
+        lines += [
+            "# HELP webhook_deliveries_total Webhook deliveries since start.",
+            "# TYPE webhook_deliveries_total counter",
+            f'webhook_deliveries_total{{outcome="success"}} {successes}',
+            f'webhook_deliveries_total{{outcome="failure"}} {failures}',
+        ]
+
+        lines += [
+            "# HELP webhook_label_deliveries_total Webhook deliveries since start, by label.",
+            "# TYPE webhook_label_deliveries_total counter",
+        ]
+        totals_by_label = metrics.totals_by_label()
+        for label, counts in totals_by_label.items():
+            cached = self._counter_lines.get(label)
+            if cached is None or cached[0] != counts:
+                labels = self._labels(label)
+                name = "webhook_label_deliveries_total"
+                cached = self._counter_lines[label] = (counts, (
+                    f'{name}{{{labels},outcome="success"}} {counts[0]}\n'
+                    f'{name}{{{labels},outcome="failure"}} {counts[1]}'
+                ))
+            lines.append(cached[1])
+
+        windows = metrics.snapshot_windows()
+        lines += [
+            "# HELP webhook_window_deliveries Webhook deliveries in the rolling window.",
+            "# TYPE webhook_window_deliveries gauge",
+        ]
+        for window, snap in windows.items():
+            name = f'webhook_window_deliveries{{window="{window:g}"'
+            lines.append(f'{name},outcome="success"}} {snap.successes}')
+            lines.append(f'{name},outcome="failure"}} {snap.failures}')
+        lines += [
+            "# HELP webhook_window_failure_rate Failure rate in the rolling window.",
+            "# TYPE webhook_window_failure_rate gauge",
+        ]
+        for window, snap in windows.items():
+            rate = _number(snap.failure_rate)
+            lines.append(f'webhook_window_failure_rate{{window="{window:g}"}} {rate}')
+
+        lines += [
+            "# HELP webhook_label_failure_rate Failure rate in the default window, by label.",
+            "# TYPE webhook_label_failure_rate gauge",
+        ]
+        for label, snap in metrics.snapshot_by_label().items():
+            rate = _number(snap.failure_rate)
+            lines.append(f"webhook_label_failure_rate{{{self._labels(label)}}} {rate}")
+
+        lines += [
+            "# HELP webhook_delivery_latency_seconds Delivery latency in the default window.",
+            "# TYPE webhook_delivery_latency_seconds summary",
+        ]
+        lines.append(_summary("webhook_delivery_latency_seconds", "", metrics.latency_histogram()))
+
+        lines += [
+            "# HELP webhook_label_delivery_latency_seconds"
+            " Delivery latency in the default window, by label.",
+            "# TYPE webhook_label_delivery_latency_seconds summary",
+        ]
+        latency_by_label = metrics.latency_by_label()
+        for label, histogram in latency_by_label.items():
+            key = (histogram.count, histogram.total_ms, histogram.max_ms)
+            cached = self._latency_lines.get(label)
+            if cached is None or cached[0] != key:
+                name = "webhook_label_delivery_latency_seconds"
+                cached = self._latency_lines[label] = (
+                    key, _summary(name, self._labels(label), histogram)
+                )
+            lines.append(cached[1])
+
+        _prune(self._counter_lines, totals_by_label)
+        _prune(self._latency_lines, latency_by_label)
+        _prune(self._label_text, totals_by_label)
+        return "\n".join(lines) + "\n"
+
+    def invalidate(self) -> None:
+        """Drop every cached line, e.g. after ``MetricsCollector.reset``."""
+        with self._lock:
+            self._rendered_at = None
+            self._label_text.clear()
+            self._counter_lines.clear()
+            self._latency_lines.clear()
+
+
+def _prune(cache: dict, live: dict) -> None:
+    """Drop cache entries for labels not in ``live``."""
+    for label in [label for label in cache if label not in live]:
+        del cache[label]
+
+
+def _summary(name: str, labels: str, histogram: LatencyHistogram) -> str:
+    prefix = f"{labels}," if labels else ""
+    suffix = f"{{{labels}}}" if labels else ""
+    lines = [
+        f'{name}{{{prefix}quantile="{q:g}"}} {_number(histogram.percentile(q * 100) / 1000)}'
+        for q in QUANTILES
+    ]
+    lines.append(f"{name}_sum{suffix} {_number(histogram.total_ms / 1000)}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return "\n".join(lines)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the rendered metrics on GET /metrics."""
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = self.server.renderer.render().encode("utf-8")  # type: ignore[attr-defined]
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Suppress default request logging."""
+        pass
+
+
+class MetricsHTTPServer:
+    """Standalone HTTP server exposing ``/metrics`` for a collector."""
+
+    def __init__(
+        self,
+        metrics: MetricsCollector,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        min_interval: float = 1.0,
+    ):
+        self._host = host
+        self._port = port
+        self.renderer = PrometheusRenderer(metrics, min_interval=min_interval)
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._server = ThreadingHTTPServer((self._host, self._port), _MetricsHandler)
+        self._server.renderer = self.renderer  # type: ignore[attr-defined]
+        self._port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self._host}:{self._port}/metrics"
@@ -1,3 +1,14 @@
 from .manager import WebhookReplayManager
+from .jobs import ReplayJob, ReplayJobStatus
+from .pacing import ReplayProgress, ReplayRateController
+from .store import InMemoryEventStore, SQLiteEventStore
 
-__all__ = ["WebhookReplayManager"]
+__all__ = [
+    "WebhookReplayManager",
+    "ReplayJob",
+    "ReplayJobStatus",
+    "ReplayProgress",
+    "ReplayRateController",
+    "InMemoryEventStore",
+    "SQLiteEventStore",
+]
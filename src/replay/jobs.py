@@ -0,0 +1,302 @@
+import json
+import os
+import threading
+import uuid
+from collections.abc import Callable, Iterator
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+
+from src.models.delivery import DeliveryAttempt
+from src.models.webhook import WebhookEvent
+from src.replay.manager import WebhookReplayManager
+from src.replay.pacing import ReplayProgress, ReplayRateController
+
+
+class ReplayJobStatus(Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    PAUSED = "paused"
+    CANCELLED = "cancelled"
+    COMPLETED = "completed"
+
+
+class ReplayJob:
+    """A bulk replay whose progress is checkpointed to disk.
+
+    The job replays either explicit ``event_ids`` or every registered event
+    matching the ``replay_query`` filters. The checkpoint is an append-only
+    JSONL file: a header describing the job, then one line per finished
+    event and one per status change, flushed as they happen (and fsynced
+    with ``fsync=True``). ``ReplayJob.resume`` reopens a checkpoint, in this
+    process or a new one, and skips every event it records as finished.
+
+    ``pause`` and ``cancel`` take effect between events: in-flight
+    deliveries finish and are recorded. A paused job continues with another
+    ``run``; a cancelled or completed job cannot be run again. A run that
+    raises leaves the job paused, with the exception in ``error``.
+
+    A new job refuses to reuse an existing ``checkpoint_path``; use
+    ``resume`` for that. An event counts as ok unless its last attempt
+    ``failed``, as for the delivery logger.
+    """
+
+    def __init__(
+        self,
+        manager: WebhookReplayManager,
+        url: str,
+        checkpoint_path: str | Path,
+        event_ids: list[str] | None = None,
+        event_type: str | None = None,
+        merchant_id: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        job_id: str | None = None,
+        fsync: bool = False,
+    ):
+        if Path(checkpoint_path).exists():
+            raise FileExistsError(
+                f"{checkpoint_path} already exists; use ReplayJob.resume to continue it"
+            )
+        self._setup(
+            manager, url, checkpoint_path, event_ids, event_type, merchant_id, start, end,
+            job_id, fsync,
+        )
+        self._append({
+            "type": "job",
+            "job_id": self.job_id,
+            "url": url,
+            "event_ids": event_ids,
+            "filters": {
+                k: v.isoformat() if isinstance(v, datetime) else v
+                for k, v in self.filters.items()
+            },
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        })
+
+    def _setup(
+        self,
+        manager: WebhookReplayManager,
+        url: str,
+        checkpoint_path: str | Path,
+        event_ids: list[str] | None,
+        event_type: str | None,
+        merchant_id: str | None,
+        start: datetime | None,
+        end: datetime | None,
+        job_id: str | None,
+        fsync: bool,
+    ) -> None:
+        self.manager = manager
+        self.url = url
+        self.checkpoint_path = Path(checkpoint_path)
+        self.job_id = job_id or f"job_{uuid.uuid4().hex[:16]}"
+        self.event_ids = event_ids
+        self.filters = {
+            "event_type": event_type,
+            "merchant_id": merchant_id,
+            "start": start,
+            "end": end,
+        }
+        self.fsync = fsync
+        self.status = ReplayJobStatus.PENDING
+        self.results: dict[str, dict] = {}
+        self.error: BaseException | None = None
+        self._lock = threading.Lock()
+        self._stop_requested: ReplayJobStatus | None = None
+        self._thread: threading.Thread | None = None
+        self._file = None
+
+    @classmethod
+    def resume(
+        cls, manager: WebhookReplayManager, checkpoint_path: str | Path, fsync: bool = False,
+    ) -> "ReplayJob":
+        """Rebuild a job, with its finished events, from its checkpoint file.
+
+        A final line torn by a crash mid-write is dropped and cut from the
+        file, so new records start on a line of their own.
+        """
+        records = _read_checkpoint(Path(checkpoint_path))
+        if not records or records[0].get("type") != "job":
+            raise ValueError(f"{checkpoint_path} is not a replay job checkpoint")
+        header = records[0]
+        filters = {
+            k: datetime.fromisoformat(v) if k in ("start", "end") and v else v
+            for k, v in header["filters"].items()
+        }
+        job = cls.__new__(cls)
+        job._setup(
+            manager, header["url"], checkpoint_path, header["event_ids"],
+            filters["event_type"], filters["merchant_id"], filters["start"], filters["end"],
+            header["job_id"], fsync,
+        )
+        for record in records[1:]:
+            if record["type"] == "result":
+                job.results[record["event_id"]] = {
+                    "ok": record["ok"],
+                    "status_code": record["status_code"],
+                    "attempts": record["attempts"],
+                }
+            elif record["type"] == "status":
+                job.status = ReplayJobStatus(record["status"])
+        if job.status == ReplayJobStatus.RUNNING:
+            # The process died mid-run.
+            job.status = ReplayJobStatus.PAUSED
+        return job
+
+    def _append(self, record: dict) -> None:
+        with self._lock:
+            if self._file is None:
+                self._file = self.checkpoint_path.open("a", encoding="utf-8")
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def _set_status(self, status: ReplayJobStatus) -> None:
+        self.status = status
+        self._append({"type": "status", "status": status.value})
+
+    def _record(self, event: WebhookEvent, attempts: list[DeliveryAttempt]) -> None:
+        last = attempts[-1] if attempts else None
+        result = {
+            "ok": last is not None and not last.failed,
+            "status_code": last.status_code if last is not None else None,
+            "attempts": len(attempts),
+        }
+        self.results[event.event_id] = result
+        self._append({"type": "result", "event_id": event.event_id, **result})
+
+    def _pending_events(self) -> Iterator[WebhookEvent]:
+        if self.event_ids is not None:
+            events = (self.manager.get_event(e) for e in self.event_ids)
+        else:
+            events = self.manager.store.query(**self.filters)
+        for event in events:
+            if event is not None and event.event_id not in self.results:
+                yield event
+
+    def _pending_count(self) -> int:
+        if self.event_ids is not None:
+            total = len(self.event_ids)
+        else:
+            total = self.manager.store.count(**self.filters)
+        return max(0, total - len(self.results))
+
+    def run(
+        self,
+        concurrency: int = 1,
+        batch_size: int = 100,
+        rate: ReplayRateController | None = None,
+        progress: Callable[[ReplayProgress], None] | None = None,
+    ) -> ReplayJobStatus:
+        """Replay every unfinished event. Returns the status it stopped in."""
+        self._begin()
+        return self._execute(concurrency, batch_size, rate, progress)
+
+    def start(
+        self,
+        concurrency: int = 1,
+        batch_size: int = 100,
+        rate: ReplayRateController | None = None,
+        progress: Callable[[ReplayProgress], None] | None = None,
+    ) -> None:
+        """Like ``run``, but on a background thread; ``wait`` joins it."""
+        self._begin()
+        self._thread = threading.Thread(
+            target=self._execute,
+            args=(concurrency, batch_size, rate, progress),
+            name=f"replay-{self.job_id}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _begin(self) -> None:
+        if self.status in (ReplayJobStatus.CANCELLED, ReplayJobStatus.COMPLETED):
+            raise ValueError(f"Replay job {self.job_id} is already {self.status.value}")
+        self._stop_requested = None
+        self._set_status(ReplayJobStatus.RUNNING)
+
+    def _execute(
+        self,
+        concurrency: int,
+        batch_size: int,
+        rate: ReplayRateController | None,
+        progress: Callable[[ReplayProgress], None] | None,
+    ) -> ReplayJobStatus:
+        self.error = None
+        try:
+            self.manager._replay_many(
+                self._pending_events(),
+                self._pending_count(),
+                self.url,
+                concurrency,
+                rate,
+                progress,
+                batch_size,
+                on_result=self._record,
+                should_stop=lambda: self._stop_requested is not None,
+            )
+        except BaseException as e:
+            self.error = e
+            self._set_status(ReplayJobStatus.PAUSED)
+            raise
+        self._set_status(self._stop_requested or ReplayJobStatus.COMPLETED)
+        return self.status
+
+    def wait(self, timeout: float | None = None) -> ReplayJobStatus:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.status
+
+    def pause(self) -> None:
+        """Stop after the events in flight; ``run`` again to continue."""
+        self._request_stop(ReplayJobStatus.PAUSED)
+
+    def cancel(self) -> None:
+        """Stop after the events in flight; the job cannot be run again."""
+        self._request_stop(ReplayJobStatus.CANCELLED)
+
+    def _request_stop(self, status: ReplayJobStatus) -> None:
+        if self.status == ReplayJobStatus.RUNNING:
+            self._stop_requested = status
+        elif self.status in (ReplayJobStatus.PENDING, ReplayJobStatus.PAUSED):
+            self._set_status(status)
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for r in self.results.values() if r["ok"])
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for r in self.results.values() if not r["ok"])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _read_checkpoint(path: Path) -> list[dict]:
+    """Parse a checkpoint, truncating an unparsable final line."""
+    records = []
+    good_end = 0
+    with path.open("rb") as f:
+        lines = f.readlines()
+    for n, line in enumerate(lines):
+        try:
+            record = json.loads(line) if line.strip() else None
+        except ValueError:
+            if n < len(lines) - 1:
+                raise ValueError(f"{path} has a corrupt record on line {n + 1}") from None
+            break
+        if record is not None and not line.endswith(b"\n"):
+            break  # complete JSON but no newline: still torn
+        good_end += len(line)
+        if record is not None:
+            records.append(record)
+    if good_end < path.stat().st_size:
+        with path.open("r+b") as f:
+            f.truncate(good_end)
+    return records
@@ -1,59 +1,307 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
 from src.models.webhook import WebhookEvent
+from src.replay.pacing import ReplayProgress, ReplayRateController
+from src.replay.store import InMemoryEventStore, SQLiteEventStore
 from src.webhook_simulator.engine import WebhookDeliveryEngine
 from src.webhook_simulator.logger import DeliveryLogger
 from src.models.delivery import DeliveryAttempt
 
 
 class WebhookReplayManager:
-    """Replays previously delivered webhook events."""
+    """Replays previously delivered webhook events.
+
+    Registered events live in ``store``: in memory by default, or a
+    ``SQLiteEventStore`` to keep them across restarts without holding them
+    all in RAM.
+
+    Retention is enforced on every registration. Events older than
+    ``max_age_seconds`` (by event timestamp), then the oldest beyond
+    ``max_events``, leave ``store``: they move to ``cold_store`` when one is
+    given, where ``replay_event`` and ``replay_failed`` still find them, and
+    are deleted otherwise. Events are copied to ``cold_store`` before they
+    are removed, so a failed copy leaves them in ``store``. Queries only
+    cover ``store``.
 
-    def __init__(self, engine: WebhookDeliveryEngine, logger: DeliveryLogger):
+    The encoded body and signature of replayed events are cached, for up to
+    ``encoded_cache_size`` events, so replaying an event again resends the
+    same bytes without encoding and signing its payload. Registering an
+    event drops its cached encoding.
+    """
+
+    def __init__(
+        self,
+        engine: WebhookDeliveryEngine,
+        logger: DeliveryLogger,
+        store: InMemoryEventStore | SQLiteEventStore | None = None,
+        max_events: int | None = None,
+        max_age_seconds: float | None = None,
+        cold_store: InMemoryEventStore | SQLiteEventStore | None = None,
+        encoded_cache_size: int = 10_000,
+    ):
+        if max_events is not None and max_events <= 0:
+            raise ValueError("max_events must be positive")
+        if max_age_seconds is not None and max_age_seconds <= 0:
+            raise ValueError("max_age_seconds must be positive")
+        if encoded_cache_size < 0:
+            raise ValueError("encoded_cache_size must not be negative")
         self.engine = engine
         self.logger = logger
-        self._events: dict[str, WebhookEvent] = {}
+        self.store = store if store is not None else InMemoryEventStore()
+        self.max_events = max_events
+        self.max_age_seconds = max_age_seconds
+        self.cold_store = cold_store
+        self.encoded_cache_size = encoded_cache_size
+        # event_id -> (body, signature), oldest first.
+        self._encoded: dict[str, tuple[bytes, str]] = {}
+        self._encoded_lock = threading.Lock()
 
-    def register_event(self, event: WebhookEvent) -> None:
+    def register_event(self, event: WebhookEvent, merchant_id: str | None = None) -> None:
         """Store an event for potential replay."""
-        self._events[event.event_id] = event
+        self.store.put(event, merchant_id)
+        self._forget_encoded([event])
+        self.enforce_retention()
+
+    def register_events(self, events: list[WebhookEvent], merchant_id: str | None = None) -> int:
+        """Store many events at once (one transaction on disk-backed stores)."""
+        events = list(events)
+        count = self.store.put_many(events, merchant_id)
+        self._forget_encoded(events)
+        self.enforce_retention()
+        return count
+
+    def enforce_retention(self) -> int:
+        """Evict events past the retention limits. Returns how many left ``store``.
+
+        Runs on every registration; call it periodically to also age out
+        events when nothing new is registered.
+        """
+        if self.max_events is None and self.max_age_seconds is None:
+            return 0
+        before = None
+        if self.max_age_seconds is not None:
+            before = datetime.now(timezone.utc) - timedelta(seconds=self.max_age_seconds)
+        archive = self._archive if self.cold_store is not None else None
+        return len(self.store.evict(max_events=self.max_events, before=before, archive=archive))
+
+    def _archive(self, evicted: list[tuple[WebhookEvent, str | None]]) -> None:
+        """Copy events about to be evicted into ``cold_store``."""
+        by_merchant: dict[str | None, list[WebhookEvent]] = {}
+        for event, merchant_id in evicted:
+            by_merchant.setdefault(merchant_id, []).append(event)
+        for merchant_id, events in by_merchant.items():
+            self.cold_store.put_many(events, merchant_id)
+
+    def get_event(self, event_id: str) -> WebhookEvent | None:
+        """A registered event from ``store``, or else ``cold_store``."""
+        event = self.store.get(event_id)
+        if event is None and self.cold_store is not None:
+            event = self.cold_store.get(event_id)
+        return event
 
     def replay_event(self, event_id: str, url: str) -> list[DeliveryAttempt]:
         """Replay a specific event by ID to the given URL.
 
-        The replayed delivery is marked in the payload with replay=True.
+        The replayed delivery carries an ``X-Webhook-Replay: true`` header;
+        the payload is sent exactly as registered.
         """
-        event = self._events.get(event_id)
+        event = self.get_event(event_id)
         if event is None:
             raise ValueError(f"Event {event_id} not found for replay")
+        return self._replay(event, url)
 
-        # Create a replay copy with replay marker
-        replay_payload = dict(event.payload)
-        replay_payload["_replay"] = True
-
-        replay_event = WebhookEvent(
-            event_id=event.event_id,
-            payment_id=event.payment_id,
-            event_type=event.event_type,
-            timestamp=event.timestamp,
-            payload=replay_payload,
-            signature="",
+    def _replay(self, event: WebhookEvent, url: str) -> list[DeliveryAttempt]:
+        return self.engine.deliver_with_retry(
+            event, url, delay_factor=0, replay=True, encoded=self._encode(event)
         )
 
-        return self.engine.deliver_with_retry(replay_event, url, delay_factor=0)
+    def _encode(self, event: WebhookEvent) -> tuple[bytes, str]:
+        """The event's body and signature, encoded on its first replay only."""
+        with self._encoded_lock:
+            encoded = self._encoded.get(event.event_id)
+        if encoded is not None:
+            return encoded
+        encoded = self.engine.signer.encode(event.payload)
+        if self.encoded_cache_size > 0:
+            with self._encoded_lock:
+                self._encoded[event.event_id] = encoded
+                while len(self._encoded) > self.encoded_cache_size:
+                    del self._encoded[next(iter(self._encoded))]
+        return encoded
+
+    def _forget_encoded(self, events: list[WebhookEvent]) -> None:
+        with self._encoded_lock:
+            for event in events:
+                self._encoded.pop(event.event_id, None)
+
+    def replay_failed(
+        self,
+        url: str,
+        concurrency: int = 1,
+        rate: ReplayRateController | None = None,
+        progress: Callable[[ReplayProgress], None] | None = None,
+    ) -> dict[str, list[DeliveryAttempt]]:
+        """Replay every event whose most recent delivery attempt failed.
 
-    def replay_failed(self, url: str) -> dict[str, list[DeliveryAttempt]]:
-        """Replay all events that had failed deliveries.
+        Events that failed and were later delivered, for example by a
+        retry, are not replayed. Events are grouped by payment and each
+        payment's events are replayed oldest first, one at a time, with
+        events sharing a timestamp taken in registration order; up to
+        ``concurrency`` payments are replayed at once. With a ``rate``
+        controller, sends are paced by it and it ramps up while replays
+        succeed and backs off when they fail. ``progress`` is called after
+        each event finishes.
 
         Returns a dict mapping event_id to list of delivery attempts.
         """
-        failed_attempts = self.logger.get_failed_attempts()
-        failed_event_ids = {a.event_id for a in failed_attempts}
+        keyed = []
+        for event_id in self.logger.outstanding_event_ids():
+            # Events evicted to cold_store were registered before any with the
+            # same timestamp still in store, so they sort first among ties.
+            for tier, store in ((1, self.store), (0, self.cold_store)):
+                key = store.sort_key(event_id) if store is not None else None
+                if key is not None:
+                    keyed.append(((key[0], tier, key[1]), event_id, store))
+                    break
+        keyed.sort(key=lambda entry: entry[0])
+        events = [store.get(event_id) for _, event_id, store in keyed]
+        events = [e for e in events if e is not None]
+        # Every event is already in memory, so none need wait to be read.
+        return self._replay_many(
+            events, len(events), url, concurrency, rate, progress, batch_size=max(1, len(events))
+        )
+
+    def replay_query(
+        self,
+        url: str,
+        event_type: str | None = None,
+        merchant_id: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        batch_size: int = 100,
+        concurrency: int = 1,
+        rate: ReplayRateController | None = None,
+        progress: Callable[[ReplayProgress], None] | None = None,
+    ) -> dict[str, list[DeliveryAttempt]]:
+        """Replay the registered events matching the filters, oldest first.
+
+        ``start`` is inclusive and ``end`` exclusive. Matches stream from
+        the store's indexes, and at most ``batch_size`` of them are held in
+        memory waiting to be replayed. Pacing, concurrency, progress
+        and per-payment ordering work as in ``replay_failed``.
+        """
+        filters = {"event_type": event_type, "merchant_id": merchant_id, "start": start, "end": end}
+        total = self.store.count(**filters)
+        events = self.store.query(**filters, batch_size=batch_size)
+        return self._replay_many(events, total, url, concurrency, rate, progress, batch_size)
+
+    def _replay_many(
+        self,
+        events: Iterable[WebhookEvent],
+        total: int,
+        url: str,
+        concurrency: int,
+        rate: ReplayRateController | None,
+        progress: Callable[[ReplayProgress], None] | None,
+        batch_size: int = 100,
+        on_result: Callable[[WebhookEvent, list[DeliveryAttempt]], None] | None = None,
+        should_stop: Callable[[], bool] | None = None,
+    ) -> dict[str, list[DeliveryAttempt]]:
+        """Replay ``events`` in the order given for each payment.
+
+        Concurrently, events are read as workers free up, with at most
+        ``batch_size`` (or ``concurrency``, if larger) read but unfinished.
+        Each payment's events queue up behind one worker, so a payment never
+        has two replays in flight, while other payments keep the pool busy.
+        """
+        results: dict[str, list[DeliveryAttempt]] = {}
+        counts = {"succeeded": 0, "failed": 0}
+        lock = threading.Lock()
+        started = time.monotonic()
+
+        def stopped() -> bool:
+            return should_stop is not None and should_stop()
+
+        def replay_one(event: WebhookEvent) -> None:
+            if stopped():
+                return
+            if rate is not None:
+                rate.acquire()
+            attempts = self._replay(event, url)
+            ok = bool(attempts) and not attempts[-1].failed
+            if rate is not None:
+                if ok:
+                    rate.on_success()
+                else:
+                    rate.on_failure()
+            with lock:
+                results[event.event_id] = attempts
+                counts["succeeded" if ok else "failed"] += 1
+                report = ReplayProgress(
+                    total=total,
+                    completed=len(results),
+                    succeeded=counts["succeeded"],
+                    failed=counts["failed"],
+                    rate=rate.rate if rate is not None else None,
+                    elapsed_seconds=time.monotonic() - started,
+                )
+            if on_result is not None:
+                on_result(event, attempts)
+            if progress is not None:
+                progress(report)
+
+        if concurrency <= 1:
+            for event in events:
+                if stopped():
+                    break
+                replay_one(event)
+            return results
+
+        window = threading.Semaphore(max(batch_size, concurrency))
+        queued: dict[str, deque[WebhookEvent]] = {}
+        failures: list[BaseException] = []
 
-        results = {}
-        for event_id in failed_event_ids:
-            if event_id in self._events:
-                results[event_id] = self.replay_event(event_id, url)
+        def drain(payment_id: str) -> None:
+            while True:
+                with lock:
+                    waiting = queued[payment_id]
+                    if not waiting or failures:
+                        del queued[payment_id]
+                        for _ in waiting:
+                            window.release()
+                        return
+                    event = waiting.popleft()
+                try:
+                    replay_one(event)
+                except BaseException as e:
+                    with lock:
+                        failures.append(e)
+                finally:
+                    window.release()
 
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay") as pool:
+            iterator = iter(events)
+            while True:
+                window.acquire()
+                event = None if stopped() or failures else next(iterator, None)
+                if event is None:
+                    window.release()
+                    break
+                with lock:
+                    waiting = queued.get(event.payment_id)
+                    if waiting is not None:
+                        waiting.append(event)
+                        continue
+                    queued[event.payment_id] = deque((event,))
+                pool.submit(drain, event.payment_id)
+        if failures:
+            raise failures[0]
         return results
 
     def get_registered_events(self) -> dict[str, WebhookEvent]:
-        return dict(self._events)
+        return {event.event_id: event for event in self.store.iter_events()}
@@ -0,0 +1,69 @@
+import threading
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ReplayProgress:
+    """Progress of a bulk replay, reported after every finished event."""
+
+    total: int
+    completed: int
+    succeeded: int
+    failed: int
+    rate: float | None
+    elapsed_seconds: float
+
+    @property
+    def remaining(self) -> int:
+        return self.total - self.completed
+
+
+class ReplayRateController:
+    """Paces replay sends with a slow-start, AIMD-style rate.
+
+    Sends start at ``initial_rate`` per second. While the merchant keeps
+    accepting, every successful event adds 1/s, so the rate doubles about
+    once a second (slow start). The first failure halves the rate
+    (``decrease_factor``) and switches to additive increase of
+    ``increase`` per second of successes. The rate stays within
+    ``[min_rate, max_rate]``.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = 5.0,
+        max_rate: float = 1000.0,
+        min_rate: float = 1.0,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+    ):
+        if not 0 < min_rate <= initial_rate <= max_rate:
+            raise ValueError("rates must satisfy 0 < min_rate <= initial_rate <= max_rate")
+        self.rate = initial_rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.slow_start = True
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until the next send is allowed at the current rate."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+
+    def on_success(self) -> None:
+        with self._lock:
+            step = 1.0 if self.slow_start else self.increase / self.rate
+            self.rate = min(self.max_rate, self.rate + step)
+
+    def on_failure(self) -> None:
+        with self._lock:
+            self.slow_start = False
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
@@ -0,0 +1,521 @@
+import bisect
+import itertools
+import json
+import sqlite3
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from src.models.webhook import WebhookEvent
+
+_Evicted = list[tuple[WebhookEvent, str | None]]
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _timestamp_us(timestamp: datetime) -> int:
+    """UTC microseconds; a naive timestamp is taken as UTC wall-clock time,
+    as in ``ColumnarAttemptStore``, whatever the host's timezone."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+class InMemoryEventStore:
+    """Registered events held in memory, indexed by event id, payment id,
+    event type and merchant.
+
+    The default store for ``WebhookReplayManager``; nothing survives a
+    restart. ``SQLiteEventStore`` has the same interface on disk. A list of
+    ``(timestamp, seq, event_id)`` kept sorted lets ``query`` stream events
+    in time order without sorting its matches, and ``evict`` take the
+    oldest events from its front.
+    """
+
+    def __init__(self):
+        self._events: dict[str, tuple[WebhookEvent, str | None, tuple[int, int, str]]] = {}
+        # Index values are insertion-ordered sets of event ids.
+        self._by_payment: dict[str, dict[str, None]] = {}
+        self._by_type: dict[str, dict[str, None]] = {}
+        self._by_merchant: dict[str | None, dict[str, None]] = {}
+        self._by_time: list[tuple[int, int, str]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def put(self, event: WebhookEvent, merchant_id: str | None = None) -> None:
+        self.put_many([event], merchant_id)
+
+    def put_many(self, events: Iterable[WebhookEvent], merchant_id: str | None = None) -> int:
+        count = 0
+        with self._lock:
+            for event in events:
+                if event.event_id in self._events:
+                    self._unindex(event.event_id)
+                key = (_timestamp_us(event.timestamp), next(self._seq), event.event_id)
+                self._events[event.event_id] = (event, merchant_id, key)
+                self._by_payment.setdefault(event.payment_id, {})[event.event_id] = None
+                self._by_type.setdefault(event.event_type, {})[event.event_id] = None
+                self._by_merchant.setdefault(merchant_id, {})[event.event_id] = None
+                if not self._by_time or self._by_time[-1] < key:
+                    self._by_time.append(key)
+                else:
+                    bisect.insort(self._by_time, key)
+                count += 1
+        return count
+
+    def _unindex(self, event_id: str, timed: bool = True) -> tuple[WebhookEvent, str | None]:
+        """Drop an event from the map and indexes, and from ``_by_time``
+        unless ``timed`` is false. Caller must hold ``_lock``."""
+        event, merchant_id, key = self._events.pop(event_id)
+        for index, index_key in (
+            (self._by_payment, event.payment_id),
+            (self._by_type, event.event_type),
+            (self._by_merchant, merchant_id),
+        ):
+            ids = index[index_key]
+            del ids[event_id]
+            if not ids:
+                del index[index_key]
+        if timed:
+            del self._by_time[bisect.bisect_left(self._by_time, key)]
+        return event, merchant_id
+
+    def evict(
+        self,
+        max_events: int | None = None,
+        before: datetime | None = None,
+        archive: Callable[[_Evicted], None] | None = None,
+    ) -> _Evicted:
+        """Remove events older than ``before``, then the oldest beyond
+        ``max_events``. Returns the removed ``(event, merchant_id)`` pairs,
+        oldest first.
+
+        ``archive`` is called with them before anything is removed; if it
+        raises, the store is left unchanged.
+        """
+        with self._lock:
+            n = 0
+            if before is not None:
+                n = bisect.bisect_left(self._by_time, (_timestamp_us(before),))
+            if max_events is not None:
+                n = max(n, len(self._by_time) - max_events)
+            if n <= 0:
+                return []
+            keys = self._by_time[:n]
+            evicted = [self._events[key[2]][:2] for key in keys]
+            if archive is not None:
+                archive(evicted)
+            del self._by_time[:n]
+            for key in keys:
+                self._unindex(key[2], timed=False)
+        return evicted
+
+    def get(self, event_id: str) -> WebhookEvent | None:
+        entry = self._events.get(event_id)
+        return entry[0] if entry is not None else None
+
+    def sort_key(self, event_id: str) -> tuple[int, int] | None:
+        """``(timestamp in microseconds, registration seq)`` of an event, the
+        order ``query`` yields events in."""
+        entry = self._events.get(event_id)
+        return entry[2][:2] if entry is not None else None
+
+    def by_payment(self, payment_id: str) -> list[WebhookEvent]:
+        with self._lock:
+            return [self._events[e][0] for e in self._by_payment.get(payment_id, ())]
+
+    def iter_events(self, batch_size: int = 500) -> Iterator[WebhookEvent]:
+        """All events in registration order."""
+        with self._lock:
+            events = [entry[0] for entry in self._events.values()]
+        yield from events
+
+    def _bounds(self, start: datetime | None, end: datetime | None) -> tuple[int, int]:
+        """Slice of ``_by_time`` inside ``[start, end)``. Caller must hold ``_lock``."""
+        lo = 0 if start is None else bisect.bisect_left(self._by_time, (_timestamp_us(start),))
+        hi = len(self._by_time)
+        if end is not None:
+            hi = bisect.bisect_left(self._by_time, (_timestamp_us(end),))
+        return lo, hi
+
+    def _matches(
+        self, event_id: str, event_type: str | None, merchant_id: str | None,
+    ) -> bool:
+        event, merchant, _ = self._events[event_id]
+        return (event_type is None or event.event_type == event_type) and (
+            merchant_id is None or merchant == merchant_id
+        )
+
+    def _candidates(
+        self, event_type: str | None, merchant_id: str | None,
+    ) -> dict[str, None] | None:
+        """The smaller of the event-type and merchant indexes the filters
+        pick, or None without filters. Caller must hold ``_lock``."""
+        candidates = self._by_type.get(event_type, {}) if event_type is not None else None
+        if merchant_id is not None:
+            by_merchant = self._by_merchant.get(merchant_id, {})
+            if candidates is None or len(by_merchant) < len(candidates):
+                candidates = by_merchant
+        return candidates
+
+    def query(
+        self,
+        event_type: str | None = None,
+        merchant_id: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        batch_size: int = 500,
+    ) -> Iterator[WebhookEvent]:
+        """Events matching every given filter, oldest first.
+
+        ``start`` is inclusive and ``end`` exclusive. As in ``count``, the
+        smaller of the time range and the event-type/merchant index is
+        read. The time-ordered index is read ``batch_size`` matches at a
+        time, each page continuing after the last ``(timestamp, seq)`` seen;
+        a smaller index has its keys in the range copied and sorted once.
+        The lock is released between pages.
+        """
+        keys = None
+        with self._lock:
+            lo, hi = self._bounds(start, end)
+            candidates = self._candidates(event_type, merchant_id)
+            if candidates is not None and len(candidates) < hi - lo:
+                keys = self._keys_in_range(candidates, lo, hi)
+        if keys is not None:
+            keys.sort()
+            yield from self._query_keys(keys, event_type, merchant_id, batch_size)
+            return
+        last: tuple[int, int, str] | None = None
+        while True:
+            page = []
+            done = True
+            with self._lock:
+                lo, hi = self._bounds(start, end)
+                if last is not None:
+                    lo = max(lo, bisect.bisect_right(self._by_time, last))
+                for i in range(lo, hi):
+                    last = self._by_time[i]
+                    if self._matches(last[2], event_type, merchant_id):
+                        page.append(self._events[last[2]][0])
+                        if len(page) >= batch_size:
+                            done = i + 1 >= hi
+                            break
+            yield from page
+            if done:
+                return
+
+    def _keys_in_range(
+        self, event_ids: Iterable[str], lo: int, hi: int,
+    ) -> list[tuple[int, int, str]]:
+        """Keys of ``event_ids`` inside ``_by_time[lo:hi]``. Caller must hold ``_lock``."""
+        first = self._by_time[lo] if lo < len(self._by_time) else None
+        limit = self._by_time[hi] if hi < len(self._by_time) else None
+        keys = [self._events[event_id][2] for event_id in event_ids]
+        return [
+            key for key in keys
+            if (first is None or key >= first) and (limit is None or key < limit)
+        ]
+
+    def _query_keys(
+        self,
+        keys: list[tuple[int, int, str]],
+        event_type: str | None,
+        merchant_id: str | None,
+        batch_size: int,
+    ) -> Iterator[WebhookEvent]:
+        """Events for sorted ``keys`` still stored and matching, a page at a time."""
+        for i in range(0, len(keys), batch_size):
+            page = []
+            with self._lock:
+                for key in keys[i:i + batch_size]:
+                    entry = self._events.get(key[2])
+                    if entry is not None and entry[2] == key and self._matches(
+                        key[2], event_type, merchant_id,
+                    ):
+                        page.append(entry[0])
+            yield from page
+
+    def count(
+        self,
+        event_type: str | None = None,
+        merchant_id: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> int:
+        """How many events ``query`` would yield.
+
+        A time range alone is two bisections; with filters, the smaller of
+        the time range and the event-type/merchant index is scanned.
+        """
+        with self._lock:
+            lo, hi = self._bounds(start, end)
+            candidates = self._candidates(event_type, merchant_id)
+            if candidates is None:
+                return hi - lo
+            if len(candidates) >= hi - lo:
+                return sum(
+                    1 for i in range(lo, hi)
+                    if self._matches(self._by_time[i][2], event_type, merchant_id)
+                )
+            return sum(
+                self._matches(key[2], event_type, merchant_id)
+                for key in self._keys_in_range(candidates, lo, hi)
+            )
+
+    def __contains__(self, event_id: str) -> bool:
+        return event_id in self._events
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteEventStore:
+    """Registered events persisted in a SQLite database.
+
+    Events are indexed by ``event_id`` (primary key), ``payment_id``, event
+    type, merchant and timestamp, so lookups do not load the whole store.
+    ``put_many`` inserts in one transaction and ``iter_events`` streams rows
+    in ``batch_size`` pages, so a replay over days of events never holds
+    them all in memory. Pass ``":memory:"`` for a throwaway database.
+
+    The row count is read once on open and kept up to date by this store's
+    writes, so ``len`` and ``evict`` never scan the table; it does not see
+    rows written to the same file through another connection.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS events (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id TEXT NOT NULL UNIQUE,
+            payment_id TEXT NOT NULL,
+            event_type TEXT NOT NULL,
+            merchant_id TEXT,
+            ts_us INTEGER NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS events_payment ON events (payment_id);
+        CREATE INDEX IF NOT EXISTS events_type_ts ON events (event_type, ts_us);
+        CREATE INDEX IF NOT EXISTS events_merchant_ts ON events (merchant_id, ts_us);
+        CREATE INDEX IF NOT EXISTS events_ts ON events (ts_us);
+    """
+
+    def __init__(self, path: str | Path = ":memory:"):
+        self.path = str(path)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self._SCHEMA)
+            (self._count,) = self._conn.execute("SELECT COUNT(*) FROM events").fetchone()
+
+    @staticmethod
+    def _row(event: WebhookEvent, merchant_id: str | None) -> tuple:
+        return (
+            event.event_id,
+            event.payment_id,
+            event.event_type,
+            merchant_id,
+            _timestamp_us(event.timestamp),
+            json.dumps(event.to_dict(), default=str),
+        )
+
+    def put(self, event: WebhookEvent, merchant_id: str | None = None) -> None:
+        self.put_many([event], merchant_id)
+
+    def put_many(self, events: Iterable[WebhookEvent], merchant_id: str | None = None) -> int:
+        """Insert or replace events in one transaction. Returns how many."""
+        rows = [self._row(event, merchant_id) for event in events]
+        with self._lock, self._conn:
+            added = len({row[0] for row in rows}) - self._existing([row[0] for row in rows])
+            self._conn.executemany(
+                "INSERT INTO events (event_id, payment_id, event_type, merchant_id, ts_us, data) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (event_id) DO UPDATE SET payment_id = excluded.payment_id, "
+                "event_type = excluded.event_type, merchant_id = excluded.merchant_id, "
+                "ts_us = excluded.ts_us, data = excluded.data",
+                rows,
+            )
+            self._count += added
+        return len(rows)
+
+    def _existing(self, event_ids: list[str]) -> int:
+        """How many distinct ``event_ids`` are stored. Caller must hold ``_lock``."""
+        found = set()
+        for i in range(0, len(event_ids), 500):
+            chunk = event_ids[i:i + 500]
+            found.update(
+                event_id for (event_id,) in self._conn.execute(
+                    "SELECT event_id FROM events WHERE event_id IN "
+                    f"({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+            )
+        return len(found)
+
+    def _fetch(self, sql: str, params: tuple) -> list[WebhookEvent]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [WebhookEvent.from_dict(json.loads(data)) for (data,) in rows]
+
+    def get(self, event_id: str) -> WebhookEvent | None:
+        events = self._fetch("SELECT data FROM events WHERE event_id = ?", (event_id,))
+        return events[0] if events else None
+
+    def sort_key(self, event_id: str) -> tuple[int, int] | None:
+        """``(timestamp in microseconds, registration seq)`` of an event, the
+        order ``query`` yields events in."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ts_us, seq FROM events WHERE event_id = ?", (event_id,)
+            ).fetchone()
+        return tuple(row) if row is not None else None
+
+    def by_payment(self, payment_id: str) -> list[WebhookEvent]:
+        return self._fetch(
+            "SELECT data FROM events WHERE payment_id = ? ORDER BY seq", (payment_id,)
+        )
+
+    def iter_events(self, batch_size: int = 500) -> Iterator[WebhookEvent]:
+        """All events in registration order, read ``batch_size`` rows at a time."""
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT seq, data FROM events WHERE seq > ? ORDER BY seq LIMIT ?",
+                    (last, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            for _, data in rows:
+                yield WebhookEvent.from_dict(json.loads(data))
+
+    @staticmethod
+    def _where(
+        event_type: str | None,
+        merchant_id: str | None,
+        start: datetime | None,
+        end: datetime | None,
+    ) -> tuple[list[str], list]:
+        clauses, params = [], []
+        if event_type is not None:
+            clauses.append("event_type = ?")
+            params.append(event_type)
+        if merchant_id is not None:
+            clauses.append("merchant_id = ?")
+            params.append(merchant_id)
+        if start is not None:
+            clauses.append("ts_us >= ?")
+            params.append(_timestamp_us(start))
+        if end is not None:
+            clauses.append("ts_us < ?")
+            params.append(_timestamp_us(end))
+        return clauses, params
+
+    def query(
+        self,
+        event_type: str | None = None,
+        merchant_id: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        batch_size: int = 500,
+    ) -> Iterator[WebhookEvent]:
+        """Events matching every given filter, oldest first.
+
+        ``start`` is inclusive and ``end`` exclusive. Rows are read through
+        the type/merchant/timestamp indexes ``batch_size`` at a time, each
+        page continuing after the last ``(timestamp, seq)`` seen.
+        """
+        clauses, params = self._where(event_type, merchant_id, start, end)
+        last: tuple[int, int] | None = None
+        while True:
+            page_clauses, page_params = list(clauses), list(params)
+            if last is not None:
+                page_clauses.append("(ts_us > ? OR (ts_us = ? AND seq > ?))")
+                page_params.extend((last[0], last[0], last[1]))
+            where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ""
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT ts_us, seq, data FROM events {where} ORDER BY ts_us, seq LIMIT ?",
+                    (*page_params, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0], rows[-1][1]
+            for _, _, data in rows:
+                yield WebhookEvent.from_dict(json.loads(data))
+
+    def count(
+        self,
+        event_type: str | None = None,
+        merchant_id: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> int:
+        clauses, params = self._where(event_type, merchant_id, start, end)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM events {where}", params).fetchone()[0]
+
+    def evict(
+        self,
+        max_events: int | None = None,
+        before: datetime | None = None,
+        archive: Callable[[_Evicted], None] | None = None,
+    ) -> _Evicted:
+        """Delete events older than ``before``, then the oldest beyond
+        ``max_events``, in one transaction. Returns the deleted
+        ``(event, merchant_id)`` pairs, oldest first.
+
+        ``archive`` is called with them before the delete; if it raises,
+        the transaction is rolled back and nothing is deleted.
+        """
+        floor = _timestamp_us(before) if before is not None else None
+        with self._lock, self._conn:
+            rows = []
+            if floor is not None:
+                rows = self._conn.execute(
+                    "SELECT seq, merchant_id, data FROM events WHERE ts_us < ? "
+                    "ORDER BY ts_us, seq",
+                    (floor,),
+                ).fetchall()
+            if max_events is not None:
+                excess = self._count - len(rows) - max_events
+                if excess > 0:
+                    rows += self._conn.execute(
+                        "SELECT seq, merchant_id, data FROM events WHERE ts_us >= ? "
+                        "ORDER BY ts_us, seq LIMIT ?",
+                        (floor if floor is not None else -(2**63), excess),
+                    ).fetchall()
+            if not rows:
+                return []
+            evicted = [
+                (WebhookEvent.from_dict(json.loads(data)), merchant) for _, merchant, data in rows
+            ]
+            if archive is not None:
+                archive(evicted)
+            self._conn.executemany(
+                "DELETE FROM events WHERE seq = ?", [(seq,) for seq, _, _ in rows]
+            )
+            self._count -= len(rows)
+        return evicted
+
+    def __contains__(self, event_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM events WHERE event_id = ?", (event_id,)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
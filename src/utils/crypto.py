@@ -3,14 +3,19 @@ import hmac
 import json
 
 
+def canonical_json(payload: dict) -> bytes:
+    """The encoding signatures are computed over: sorted keys, UTF-8."""
+    return json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+
+
+def sign_message(message: bytes, secret: str) -> str:
+    """HMAC-SHA256 of already-encoded bytes, as hex."""
+    return hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
 def generate_signature(payload: dict, secret: str) -> str:
     """Generate HMAC-SHA256 signature for a webhook payload."""
-    message = json.dumps(payload, sort_keys=True, default=str)
-    return hmac.new(
-        secret.encode("utf-8"),
-        message.encode("utf-8"),
-        hashlib.sha256,
-    ).hexdigest()
+    return sign_message(canonical_json(payload), secret)
 
 
 def verify_signature(payload: dict, secret: str, signature: str) -> bool:
@@ -0,0 +1,36 @@
+import itertools
+import threading
+from collections.abc import Callable, Iterator
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class ThreadShards(Generic[T]):
+    """A fixed set of shards with each writer thread pinned to one of them.
+
+    Threads are assigned round-robin the first time they ask for a shard, so
+    with at least as many shards as writer threads no two writers share one.
+    Readers iterate over every shard to merge their contents.
+    """
+
+    def __init__(self, count: int, factory: Callable[[], T]):
+        if count <= 0:
+            raise ValueError("shard count must be positive")
+        self._shards = [factory() for _ in range(count)]
+        self._local = threading.local()
+        self._next = itertools.count()
+
+    def local(self) -> T:
+        """Return the calling thread's shard."""
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._shards[next(self._next) % len(self._shards)]
+            self._local.shard = shard
+        return shard
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._shards)
+
+    def __len__(self) -> int:
+        return len(self._shards)
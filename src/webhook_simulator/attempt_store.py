@@ -0,0 +1,187 @@
+import math
+from array import array
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from itertools import compress
+
+from src.models.delivery import DeliveryAttempt
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_NO_STATUS = -1
+
+
+def percentiles_of(values: Iterable[float], percentiles: Iterable[float]) -> dict[float, float]:
+    """Nearest-rank percentiles of ``values``; empty input yields 0.0 for each."""
+    ordered = sorted(values)
+    result = {}
+    for p in percentiles:
+        if not ordered:
+            result[p] = 0.0
+            continue
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        result[p] = ordered[min(rank, len(ordered)) - 1]
+    return result
+
+
+class _InternTable:
+    """Maps repeated strings (or None) to small integer ids."""
+
+    def __init__(self):
+        self.values: list[str | None] = []
+        self._ids: dict[str | None, int] = {}
+
+    def intern(self, value: str | None) -> int:
+        idx = self._ids.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self._ids[value] = idx
+            self.values.append(value)
+        return idx
+
+    def lookup(self, value: str | None) -> int | None:
+        return self._ids.get(value)
+
+    def compact(self, column: array) -> array:
+        """Drop values no longer referenced by ``column`` and return it remapped."""
+        old_values = self.values
+        self.values = []
+        self._ids = {}
+        return array(column.typecode, [self.intern(old_values[i]) for i in column])
+
+    def clear(self) -> None:
+        self.values.clear()
+        self._ids.clear()
+
+
+class ColumnarAttemptStore:
+    """Array-backed store of delivery attempts.
+
+    Status code, response time and timestamp live in parallel typed arrays;
+    event ids, URLs and errors are interned and stored as integer ids. Rows
+    are only turned back into ``DeliveryAttempt`` objects when read, and
+    aggregations scan the arrays directly.
+
+    Rows are removed from the front with ``popleft``; the dead prefix is
+    compacted away once it outgrows the live rows, so eviction is amortized
+    O(1). Timestamps are kept as UTC microseconds; naive timestamps are
+    taken as UTC wall-clock time and come back naive. Aware timestamps come
+    back in UTC.
+    """
+
+    def __init__(self):
+        self._attempt_ids: list[str] = []
+        self._event_idx = array("I")
+        self._url_idx = array("I")
+        self._error_idx = array("I")
+        self._status = array("i")
+        self._failed = array("B")
+        self._response_ms = array("d")
+        self._timestamp_us = array("q")
+        self._naive = array("B")
+        self._event_ids = _InternTable()
+        self._urls = _InternTable()
+        self._errors = _InternTable()
+        self._start = 0
+
+    def append(self, attempt: DeliveryAttempt) -> None:
+        status = attempt.status_code
+        timestamp = attempt.timestamp
+        naive = timestamp.tzinfo is None
+        if naive:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        self._attempt_ids.append(attempt.attempt_id)
+        self._event_idx.append(self._event_ids.intern(attempt.event_id))
+        self._url_idx.append(self._urls.intern(attempt.url))
+        self._error_idx.append(self._errors.intern(attempt.error))
+        self._status.append(_NO_STATUS if status is None else status)
+        self._failed.append(attempt.failed)
+        self._response_ms.append(attempt.response_time_ms)
+        self._timestamp_us.append((timestamp - _EPOCH) // _MICROSECOND)
+        self._naive.append(naive)
+
+    def __len__(self) -> int:
+        return len(self._status) - self._start
+
+    def _row(self, i: int) -> DeliveryAttempt:
+        status = self._status[i]
+        timestamp = _EPOCH + timedelta(microseconds=self._timestamp_us[i])
+        if self._naive[i]:
+            timestamp = timestamp.replace(tzinfo=None)
+        return DeliveryAttempt(
+            attempt_id=self._attempt_ids[i],
+            event_id=self._event_ids.values[self._event_idx[i]],
+            url=self._urls.values[self._url_idx[i]],
+            status_code=None if status == _NO_STATUS else status,
+            timestamp=timestamp,
+            response_time_ms=self._response_ms[i],
+            error=self._errors.values[self._error_idx[i]],
+        )
+
+    def __getitem__(self, index: int) -> DeliveryAttempt:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("attempt index out of range")
+        return self._row(self._start + index)
+
+    def __iter__(self) -> Iterator[DeliveryAttempt]:
+        for i in range(self._start, len(self._status)):
+            yield self._row(i)
+
+    def popleft(self) -> DeliveryAttempt:
+        if not len(self):
+            raise IndexError("pop from an empty store")
+        attempt = self._row(self._start)
+        self._start += 1
+        if self._start * 2 >= len(self._status):
+            self._compact()
+        return attempt
+
+    def _compact(self) -> None:
+        start = self._start
+        for column in (
+            self._attempt_ids, self._status, self._failed,
+            self._response_ms, self._timestamp_us, self._naive,
+        ):
+            del column[:start]
+        self._event_idx = self._event_ids.compact(self._event_idx[start:])
+        self._url_idx = self._urls.compact(self._url_idx[start:])
+        self._error_idx = self._errors.compact(self._error_idx[start:])
+        self._start = 0
+
+    def rows_for_event(self, event_id: str) -> list[DeliveryAttempt]:
+        idx = self._event_ids.lookup(event_id)
+        if idx is None:
+            return []
+        live = self._event_idx[self._start:]
+        matches = compress(range(self._start, len(self._status)), map(idx.__eq__, live))
+        return [self._row(i) for i in matches]
+
+    def failed_rows(self) -> list[DeliveryAttempt]:
+        live = self._failed[self._start:]
+        return [self._row(i) for i in compress(range(self._start, len(self._status)), live)]
+
+    def failure_count(self) -> int:
+        return self._failed[self._start:].count(1)
+
+    def response_times(self) -> array:
+        """Copy of the live response-time column, in milliseconds."""
+        return self._response_ms[self._start:]
+
+    def latency_percentiles(
+        self, percentiles: Iterable[float] = (50, 95, 99),
+    ) -> dict[float, float]:
+        return percentiles_of(self.response_times(), percentiles)
+
+    def clear(self) -> None:
+        for column in (
+            self._attempt_ids, self._event_idx, self._url_idx, self._error_idx,
+            self._status, self._failed, self._response_ms, self._timestamp_us, self._naive,
+        ):
+            del column[:]
+        self._event_ids.clear()
+        self._urls.clear()
+        self._errors.clear()
+        self._start = 0
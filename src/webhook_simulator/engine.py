@@ -1,4 +1,3 @@
-import json
 import time
 import uuid
 from datetime import datetime, timezone
@@ -7,6 +6,7 @@ import requests
 
 from src.models.delivery import DeliveryAttempt
 from src.models.webhook import WebhookEvent
+from src.observability.metrics import MetricsCollector
 from src.webhook_simulator.logger import DeliveryLogger
 from src.webhook_simulator.retry import RetryManager
 from src.webhook_simulator.signer import WebhookSigner
@@ -21,22 +21,34 @@ class WebhookDeliveryEngine:
         retry_manager: RetryManager,
         logger: DeliveryLogger,
         timeout_seconds: float = 30,
+        metrics: MetricsCollector | None = None,
     ):
         self.signer = signer
         self.retry_manager = retry_manager
         self.logger = logger
         self.timeout_seconds = timeout_seconds
+        self.metrics = metrics
 
-    def deliver(self, event: WebhookEvent, url: str) -> DeliveryAttempt:
-        """Deliver a single webhook event. Returns the delivery attempt result."""
-        payload = event.payload
-        signature = self.signer.sign(payload)
+    def deliver(self, event: WebhookEvent, url: str, replay: bool = False) -> DeliveryAttempt:
+        """Deliver a single webhook event. Returns the delivery attempt result.
+
+        With ``replay=True`` the request carries ``X-Webhook-Replay: true``;
+        the payload is sent unchanged.
+        """
+        body, signature = self.signer.encode(event.payload)
+        return self._send(event, url, body, signature, replay)
+
+    def _send(
+        self, event: WebhookEvent, url: str, body: bytes, signature: str, replay: bool,
+    ) -> DeliveryAttempt:
         headers = {
             "Content-Type": "application/json",
             "X-Webhook-Signature": signature,
             "X-Event-ID": event.event_id,
             "X-Event-Type": event.event_type,
         }
+        if replay:
+            headers["X-Webhook-Replay"] = "true"
 
         start = time.monotonic()
         status_code = None
@@ -45,7 +57,7 @@ class WebhookDeliveryEngine:
         try:
             resp = requests.post(
                 url,
-                data=json.dumps(payload, default=str),
+                data=body,
                 headers=headers,
                 timeout=self.timeout_seconds,
             )
@@ -69,6 +81,13 @@ class WebhookDeliveryEngine:
             error=error,
         )
         self.logger.log(attempt)
+
+        if self.metrics is not None:
+            if not attempt.failed:
+                self.metrics.record_success(event.event_type, url, latency_ms=elapsed_ms)
+            else:
+                self.metrics.record_failure(event.event_type, url, latency_ms=elapsed_ms)
+
         return attempt
 
     def deliver_with_retry(
@@ -76,26 +95,34 @@ class WebhookDeliveryEngine:
         event: WebhookEvent,
         url: str,
         delay_factor: float = 1.0,
+        replay: bool = False,
+        encoded: tuple[bytes, str] | None = None,
     ) -> list[DeliveryAttempt]:
         """Deliver with automatic retries on failure.
 
+        The payload is encoded and signed once; retries resend the same bytes.
+
         Args:
             event: The webhook event to deliver.
             url: The merchant endpoint URL.
             delay_factor: Multiplier for retry delays (use 0 in tests to skip waits).
+            replay: Mark every attempt with the ``X-Webhook-Replay`` header.
+            encoded: ``(body, signature)`` from ``signer.encode(event.payload)``,
+                to send instead of encoding the payload again.
 
         Returns:
             List of all delivery attempts made.
         """
         attempts = []
         retry_count = 0
+        body, signature = encoded if encoded is not None else self.signer.encode(event.payload)
 
         while True:
-            attempt = self.deliver(event, url)
+            attempt = self._send(event, url, body, signature, replay)
             attempts.append(attempt)
 
-            # Success
-            if attempt.status_code is not None and 200 <= attempt.status_code < 300:
+            # Success, by the same rule as the logger and replay jobs
+            if not attempt.failed:
                 break
 
             # Check if we should retry
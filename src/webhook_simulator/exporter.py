@@ -0,0 +1,228 @@
+import json
+import queue
+import struct
+import threading
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from src.models.delivery import DeliveryAttempt
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Binary record: timestamp (UTC microseconds), response time (ms), status code
+# (-1 for none), a naive-timestamp flag, then attempt_id, event_id, url and
+# error as u32 length-prefixed UTF-8. A length of 0xFFFFFFFF encodes a
+# missing error. Naive timestamps are taken as UTC wall-clock time, as in
+# ``ColumnarAttemptStore``, and read back naive.
+_HEADER = struct.Struct("<qdiB")
+_LENGTH = struct.Struct("<I")
+_NONE_LENGTH = 0xFFFFFFFF
+
+_STOP = object()
+
+
+def _encode_binary(attempt: DeliveryAttempt) -> bytes:
+    timestamp = attempt.timestamp
+    naive = timestamp.tzinfo is None
+    if naive:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    status = -1 if attempt.status_code is None else attempt.status_code
+    timestamp_us = (timestamp - _EPOCH) // _MICROSECOND
+    parts = [_HEADER.pack(timestamp_us, attempt.response_time_ms, status, naive)]
+    for value in (attempt.attempt_id, attempt.event_id, attempt.url, attempt.error):
+        if value is None:
+            parts.append(_LENGTH.pack(_NONE_LENGTH))
+            continue
+        encoded = value.encode("utf-8")
+        parts.append(_LENGTH.pack(len(encoded)))
+        parts.append(encoded)
+    return b"".join(parts)
+
+
+def _decode_binary(data: bytes) -> Iterator[DeliveryAttempt]:
+    pos = 0
+    while pos < len(data):
+        timestamp_us, response_ms, status, naive = _HEADER.unpack_from(data, pos)
+        pos += _HEADER.size
+        fields = []
+        for _ in range(4):
+            (length,) = _LENGTH.unpack_from(data, pos)
+            pos += _LENGTH.size
+            if length == _NONE_LENGTH:
+                fields.append(None)
+                continue
+            fields.append(data[pos:pos + length].decode("utf-8"))
+            pos += length
+        attempt_id, event_id, url, error = fields
+        timestamp = _EPOCH + timedelta(microseconds=timestamp_us)
+        if naive:
+            timestamp = timestamp.replace(tzinfo=None)
+        yield DeliveryAttempt(
+            attempt_id=attempt_id,
+            event_id=event_id,
+            url=url,
+            status_code=None if status == -1 else status,
+            timestamp=timestamp,
+            response_time_ms=response_ms,
+            error=error,
+        )
+
+
+def read_export(path: str | Path, file_format: str = "jsonl") -> Iterator[DeliveryAttempt]:
+    """Read attempts back from a file written by ``AttemptExporter``."""
+    if file_format == "jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield DeliveryAttempt.from_dict(json.loads(line))
+    elif file_format == "binary":
+        with open(path, "rb") as f:
+            yield from _decode_binary(f.read())
+    else:
+        raise ValueError(f"Unknown export format: {file_format}")
+
+
+class AttemptExporter:
+    """Streams delivery attempts to a file from a background writer thread.
+
+    ``submit`` only enqueues; encoding and file I/O happen on the writer,
+    which drains the queue in batches of up to ``batch_size``. When the
+    bounded queue is full, ``overflow="drop"`` discards the attempt (counted
+    in ``dropped``) and ``overflow="block"`` waits for room. ``close`` writes
+    everything still queued before returning.
+
+    An attempt that cannot be encoded is skipped and counted in ``failed``.
+    If writing to the file fails, the exporter keeps the error in ``error``,
+    stops writing and discards whatever it receives (counted in ``failed``).
+    ``submit`` then returns False, and neither it nor ``close`` can hang on
+    a writer that has stopped.
+    """
+
+    FORMATS = ("jsonl", "binary")
+    OVERFLOW_POLICIES = ("drop", "block")
+
+    def __init__(
+        self,
+        path: str | Path,
+        file_format: str = "jsonl",
+        batch_size: int = 500,
+        max_queue: int = 10_000,
+        overflow: str = "drop",
+    ):
+        if file_format not in self.FORMATS:
+            raise ValueError(f"Unknown export format: {file_format}")
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.path = Path(path)
+        self.file_format = file_format
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._dropped = 0
+        self._exported = 0
+        self._failed = 0
+        self.error: Exception | None = None
+        self._closed = False
+        self._counter_lock = threading.Lock()
+        # Held while enqueuing, so nothing is queued behind _STOP.
+        self._submit_lock = threading.Lock()
+        if file_format == "binary":
+            self._file = self.path.open("ab")
+        else:
+            self._file = self.path.open("a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="attempt-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, attempt: DeliveryAttempt) -> bool:
+        """Queue an attempt for export. Returns False if it was dropped."""
+        with self._submit_lock:
+            if self._closed or self.error is not None:
+                return False
+            if self.overflow == "block":
+                # The writer never stops draining before _STOP, so this
+                # wait always ends.
+                self._queue.put(attempt)
+                return True
+            try:
+                self._queue.put_nowait(attempt)
+            except queue.Full:
+                with self._counter_lock:
+                    self._dropped += 1
+                return False
+            return True
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = []
+            stop = item is _STOP
+            if not stop:
+                batch.append(item)
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+            if batch:
+                self._write(batch)
+            if stop:
+                try:
+                    self._file.close()
+                except Exception as e:
+                    self.error = self.error or e
+                return
+
+    def _encode(self, attempt: DeliveryAttempt) -> bytes | str:
+        if self.file_format == "binary":
+            return _encode_binary(attempt)
+        return json.dumps(attempt.to_dict()) + "\n"
+
+    def _write(self, batch: list[DeliveryAttempt]) -> None:
+        if self.error is not None:
+            with self._counter_lock:
+                self._failed += len(batch)
+            return
+        records = []
+        for attempt in batch:
+            try:
+                records.append(self._encode(attempt))
+            except Exception:
+                with self._counter_lock:
+                    self._failed += 1
+        if not records:
+            return
+        try:
+            self._file.write((b"" if self.file_format == "binary" else "").join(records))
+            self._file.flush()
+        except Exception as e:
+            self.error = e
+            with self._counter_lock:
+                self._failed += len(records)
+            return
+        self._exported += len(records)
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    @property
+    def exported(self) -> int:
+        return self._exported
+
+    @property
+    def failed(self) -> int:
+        return self._failed
+
+    def close(self, timeout: float | None = None) -> None:
+        """Flush queued attempts, stop the writer and close the file."""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
@@ -1,33 +1,274 @@
+import itertools
 import threading
-from datetime import datetime
+import time
+from collections.abc import Callable, Iterable, Iterator
+from operator import itemgetter
+from pathlib import Path
 
 from src.models.delivery import DeliveryAttempt
+from src.utils.sharding import ThreadShards
+from src.webhook_simulator.attempt_store import ColumnarAttemptStore, percentiles_of
+from src.webhook_simulator.exporter import AttemptExporter
+from src.webhook_simulator.spill import AttemptSpillLog
 
 
-class DeliveryLogger:
-    """Thread-safe logger for tracking webhook delivery attempts."""
+class _PendingShard:
+    """Attempts logged by the threads pinned to one shard, not yet merged."""
+
+    __slots__ = ("lock", "pending")
 
     def __init__(self):
-        self._attempts: list[DeliveryAttempt] = []
+        self.lock = threading.Lock()
+        self.pending: list[tuple[int, DeliveryAttempt]] = []
+
+
+class DeliveryLogger:
+    """Thread-safe logger for tracking webhook delivery attempts.
+
+    By default every attempt is kept in memory. Pass ``capacity`` to bound the
+    in-memory ring: once it is full the oldest attempt is evicted, either to
+    append-only segment files under ``spill_dir`` or, without one, dropped.
+    Queries read the spilled segments and the ring as one history.
+
+    In memory, attempts are held column-wise in a ``ColumnarAttemptStore``
+    and materialized as ``DeliveryAttempt`` objects only when returned.
+
+    ``log`` only appends to the calling thread's shard buffer, so concurrent
+    deliveries do not queue on one lock. Every read first merges the shard
+    buffers in sequence order, so a reader sees every attempt whose ``log``
+    call returned before the read began. The sequence number is taken before
+    the shard append, so ordering is exact only within one merge: an attempt
+    whose ``log`` overlapped a merge can be stored after attempts logged
+    just after it. Offsets follow storage order.
+
+    Every stored attempt gets a monotonically increasing offset. Pollers pass
+    the last offset they saw + 1 to ``iter_since`` to read only newer entries,
+    or block on ``wait_for`` until a matching attempt is logged.
+
+    Events whose latest attempt failed are kept in an outstanding set,
+    updated as attempts are merged, so ``outstanding_event_ids`` costs
+    O(outstanding) rather than a scan of the history.
+
+    An optional ``exporter`` receives every logged attempt; it encodes and
+    writes them on its own thread, so ``log`` only pays for a queue put.
+    """
+
+    MERGE_THRESHOLD = 1024
+
+    def __init__(
+        self,
+        capacity: int | None = None,
+        spill_dir: str | Path | None = None,
+        segment_max_records: int = 10_000,
+        shards: int = 16,
+        exporter: AttemptExporter | None = None,
+    ):
+        if capacity is not None and capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._capacity = capacity
+        self._attempts = ColumnarAttemptStore()
+        self._spill = (
+            AttemptSpillLog(spill_dir, segment_max_records)
+            if spill_dir is not None else None
+        )
+        self._shards = ThreadShards(shards, _PendingShard)
+        self._exporter = exporter
+        self._seq = itertools.count()
         self._lock = threading.Lock()
+        self._next_offset = len(self._spill) if self._spill is not None else 0
+        # Insertion-ordered set of event ids whose latest attempt failed.
+        self._outstanding: dict[str, None] = {}
+        if self._spill is not None:
+            for attempt in self._spill:
+                self._track_outcome(attempt)
+        self._new_data = threading.Condition()
+        self._waiters = 0
+        self._notifications = 0
 
     def log(self, attempt: DeliveryAttempt) -> None:
+        seq = next(self._seq)
+        shard = self._shards.local()
+        with shard.lock:
+            shard.pending.append((seq, attempt))
+            backlog = len(shard.pending)
+        if self._exporter is not None:
+            self._exporter.submit(attempt)
+        # Keep shard buffers short when nobody is reading, without ever
+        # making a writer wait on the merge lock.
+        if backlog >= self.MERGE_THRESHOLD and self._lock.acquire(blocking=False):
+            try:
+                self._merge_pending()
+            finally:
+                self._lock.release()
+        if self._waiters:
+            with self._new_data:
+                self._notifications += 1
+                self._new_data.notify_all()
+
+    def _merge_pending(self) -> None:
+        """Move buffered attempts into the ring. Caller must hold ``_lock``."""
+        batch: list[tuple[int, DeliveryAttempt]] = []
+        for shard in self._shards:
+            if shard.pending:
+                with shard.lock:
+                    pending, shard.pending = shard.pending, []
+                batch.extend(pending)
+        if not batch:
+            return
+        batch.sort(key=itemgetter(0))
+        for _, attempt in batch:
+            self._store(attempt)
+
+    def _track_outcome(self, attempt: DeliveryAttempt) -> None:
+        if attempt.failed:
+            self._outstanding[attempt.event_id] = None
+        else:
+            self._outstanding.pop(attempt.event_id, None)
+
+    def _store(self, attempt: DeliveryAttempt) -> None:
+        self._track_outcome(attempt)
+        self._attempts.append(attempt)
+        self._next_offset += 1
+        if self._capacity is not None and len(self._attempts) > self._capacity:
+            evicted = self._attempts.popleft()
+            if self._spill is not None:
+                self._spill.append(evicted)
+
+    def _iter_all(self) -> Iterator[DeliveryAttempt]:
+        if self._spill is not None:
+            yield from self._spill
+        yield from self._attempts
+
+    def iter_since(self, cursor: int = 0) -> Iterator[tuple[int, DeliveryAttempt]]:
+        """Yield ``(offset, attempt)`` for every attempt at or after ``cursor``.
+
+        Resume with the last offset seen + 1. Offsets that were evicted
+        without a spill directory are skipped. Only the new entries are
+        materialized; spilled segments entirely before ``cursor`` are not read.
+        """
         with self._lock:
-            self._attempts.append(attempt)
+            self._merge_pending()
+            memory_base = self._next_offset - len(self._attempts)
+            start = max(cursor, memory_base)
+            rows = [
+                (offset, self._attempts[offset - memory_base])
+                for offset in range(start, self._next_offset)
+            ]
+            spilled = []
+            if self._spill is not None and cursor < memory_base:
+                spill_base = memory_base - len(self._spill)
+                first = max(cursor, spill_base)
+                spilled = list(enumerate(self._spill.iter_from(first - spill_base), first))
+        yield from spilled
+        yield from rows
+
+    def end_cursor(self) -> int:
+        """Offset the next logged attempt will receive."""
+        with self._lock:
+            self._merge_pending()
+            return self._next_offset
+
+    def wait_for(
+        self,
+        predicate: Callable[[DeliveryAttempt], bool],
+        timeout: float | None = None,
+        cursor: int = 0,
+    ) -> DeliveryAttempt | None:
+        """Block until an attempt at or after ``cursor`` satisfies ``predicate``.
+
+        Returns the first matching attempt, or None once ``timeout`` seconds
+        have passed. Each wake-up only scans attempts logged since the last one.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._new_data:
+            self._waiters += 1
+        try:
+            while True:
+                with self._new_data:
+                    seen = self._notifications
+                for offset, attempt in self.iter_since(cursor):
+                    if predicate(attempt):
+                        return attempt
+                    cursor = offset + 1
+                with self._new_data:
+                    if self._notifications != seen:
+                        continue
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    self._new_data.wait(remaining)
+        finally:
+            with self._new_data:
+                self._waiters -= 1
 
     def get_attempts(self, event_id: str | None = None) -> list[DeliveryAttempt]:
         with self._lock:
+            self._merge_pending()
             if event_id is None:
-                return list(self._attempts)
-            return [a for a in self._attempts if a.event_id == event_id]
+                return list(self._iter_all())
+            rows = self._spill.rows_for_event(event_id) if self._spill is not None else []
+            return rows + self._attempts.rows_for_event(event_id)
 
     def get_failed_attempts(self) -> list[DeliveryAttempt]:
         with self._lock:
-            return [
-                a for a in self._attempts
-                if a.status_code is None or a.status_code >= 400
-            ]
+            self._merge_pending()
+            rows = self._spill.failed_rows() if self._spill is not None else []
+            return rows + self._attempts.failed_rows()
+
+    def outstanding_event_ids(self) -> list[str]:
+        """Event ids whose most recent attempt failed, in order of failure."""
+        with self._lock:
+            self._merge_pending()
+            return list(self._outstanding)
+
+    def outstanding_count(self) -> int:
+        with self._lock:
+            self._merge_pending()
+            return len(self._outstanding)
+
+    def failure_count(self) -> int:
+        """Number of failed attempts (no status code, or 4xx/5xx) in the history."""
+        with self._lock:
+            self._merge_pending()
+            spilled = self._spill.failure_count() if self._spill is not None else 0
+            return self._attempts.failure_count() + spilled
+
+    def latency_percentiles(
+        self, percentiles: Iterable[float] = (50, 95, 99),
+    ) -> dict[float, float]:
+        """Nearest-rank response-time percentiles, in milliseconds."""
+        with self._lock:
+            self._merge_pending()
+            times = self._attempts.response_times()
+            if self._spill is not None:
+                times.extend(self._spill.response_times())
+            return percentiles_of(times, percentiles)
+
+    def memory_count(self) -> int:
+        """Number of attempts currently held in the in-memory ring."""
+        with self._lock:
+            self._merge_pending()
+            return len(self._attempts)
+
+    def spilled_count(self) -> int:
+        """Number of attempts evicted to disk segments."""
+        with self._lock:
+            self._merge_pending()
+            return len(self._spill) if self._spill is not None else 0
 
     def clear(self) -> None:
         with self._lock:
+            self._merge_pending()
             self._attempts.clear()
+            self._outstanding.clear()
+            if self._spill is not None:
+                self._spill.clear()
+
+    def close(self) -> None:
+        """Close the open spill segment and flush the exporter, if any."""
+        with self._lock:
+            self._merge_pending()
+            if self._spill is not None:
+                self._spill.close()
+        if self._exporter is not None:
+            self._exporter.close()
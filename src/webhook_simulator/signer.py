@@ -1,4 +1,4 @@
-from src.utils.crypto import generate_signature, verify_signature
+from src.utils.crypto import canonical_json, generate_signature, sign_message, verify_signature
 
 
 class WebhookSigner:
@@ -10,5 +10,14 @@ class WebhookSigner:
     def sign(self, payload: dict) -> str:
         return generate_signature(payload, self.secret)
 
+    def encode(self, payload: dict) -> tuple[bytes, str]:
+        """Encode ``payload`` once and sign those bytes.
+
+        Returns the request body and its signature; the body is the
+        canonical encoding, so the signature matches ``sign(payload)``.
+        """
+        body = canonical_json(payload)
+        return body, sign_message(body, self.secret)
+
     def verify(self, payload: dict, signature: str) -> bool:
         return verify_signature(payload, self.secret, signature)
@@ -0,0 +1,156 @@
+import json
+from array import array
+from collections.abc import Iterator
+from pathlib import Path
+
+from src.models.delivery import DeliveryAttempt
+
+
+class AttemptSpillLog:
+    """Append-only, rotated JSONL segments for attempts evicted from memory.
+
+    Segments are named after the position of their first record, so reading
+    them back in name order yields attempts in the order they were spilled.
+    Segments already present in ``directory`` are picked up and appended to.
+
+    Spilled attempts are not kept in memory. Each segment keeps only its
+    record and failure counts, plus a ``.latency`` sidecar file holding its
+    response-time column as packed doubles, so failure counts and latency
+    percentiles do not parse the JSON. Row queries stream the segments from
+    disk.
+    """
+
+    SEGMENT_GLOB = "attempts-*.jsonl"
+
+    def __init__(self, directory: str | Path, segment_max_records: int = 10_000):
+        if segment_max_records <= 0:
+            raise ValueError("segment_max_records must be positive")
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._segment_max_records = segment_max_records
+        self._segments: list[list] = []  # [path, record_count, failure_count]
+        self._handle = None
+        self._latency_handle = None
+        self._count = 0
+
+        for path in sorted(self._dir.glob(self.SEGMENT_GLOB)):
+            records = failures = 0
+            times = array("d")
+            with path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    attempt = DeliveryAttempt.from_dict(json.loads(line))
+                    records += 1
+                    failures += attempt.failed
+                    times.append(attempt.response_time_ms)
+            # Rebuild the sidecar so it always matches its segment.
+            with _latency_path(path).open("wb") as f:
+                times.tofile(f)
+            self._segments.append([path, records, failures])
+            self._count += records
+
+    def append(self, attempt: DeliveryAttempt) -> None:
+        if self._handle is None or self._segments[-1][1] >= self._segment_max_records:
+            self._rotate()
+        self._handle.write(json.dumps(attempt.to_dict()) + "\n")
+        array("d", (attempt.response_time_ms,)).tofile(self._latency_handle)
+        segment = self._segments[-1]
+        segment[1] += 1
+        segment[2] += attempt.failed
+        self._count += 1
+
+    def _rotate(self) -> None:
+        self.close()
+        path = self._dir / f"attempts-{self._count:012d}.jsonl"
+        self._handle = path.open("a", encoding="utf-8")
+        self._latency_handle = _latency_path(path).open("ab")
+        if not self._segments or self._segments[-1][0] != path:
+            self._segments.append([path, 0, 0])
+
+    def _flush(self) -> None:
+        if self._handle is not None:
+            self._handle.flush()
+            self._latency_handle.flush()
+
+    def __iter__(self) -> Iterator[DeliveryAttempt]:
+        return self.iter_from(0)
+
+    def iter_from(self, start: int) -> Iterator[DeliveryAttempt]:
+        """Yield spilled attempts from position ``start`` on, skipping whole
+        segments that end before it."""
+        self._flush()
+        position = 0
+        for path, records, _ in list(self._segments):
+            if position + records <= start:
+                position += records
+                continue
+            with path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    if position >= start:
+                        yield DeliveryAttempt.from_dict(json.loads(line))
+                    position += 1
+
+    def rows_for_event(self, event_id: str) -> list[DeliveryAttempt]:
+        """Spilled attempts for one event, read from disk, oldest first."""
+        self._flush()
+        rows = []
+        for path, _, _ in list(self._segments):
+            with path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    # Only lines mentioning the id are worth parsing.
+                    if event_id in line:
+                        attempt = DeliveryAttempt.from_dict(json.loads(line))
+                        if attempt.event_id == event_id:
+                            rows.append(attempt)
+        return rows
+
+    def failed_rows(self) -> list[DeliveryAttempt]:
+        """Spilled failed attempts, read from disk, skipping segments without any."""
+        self._flush()
+        rows = []
+        for path, _, failures in list(self._segments):
+            if not failures:
+                continue
+            with path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    attempt = DeliveryAttempt.from_dict(json.loads(line))
+                    if attempt.failed:
+                        rows.append(attempt)
+        return rows
+
+    def failure_count(self) -> int:
+        return sum(failures for _, _, failures in self._segments)
+
+    def response_times(self) -> array:
+        """The spilled response-time column, in milliseconds, read from the sidecars."""
+        self._flush()
+        times = array("d")
+        for path, records, _ in self._segments:
+            with _latency_path(path).open("rb") as f:
+                times.fromfile(f, records)
+        return times
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def segment_paths(self) -> list[Path]:
+        return [path for path, _, _ in self._segments]
+
+    def clear(self) -> None:
+        self.close()
+        for path, _, _ in self._segments:
+            path.unlink(missing_ok=True)
+            _latency_path(path).unlink(missing_ok=True)
+        self._segments.clear()
+        self._count = 0
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._latency_handle.close()
+            self._handle = None
+            self._latency_handle = None
+
+
+def _latency_path(segment: Path) -> Path:
+    return segment.with_suffix(".latency")
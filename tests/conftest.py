@@ -1,5 +1,8 @@
+from datetime import datetime, timedelta, timezone
+
 import pytest
 
+from src.models.delivery import DeliveryAttempt
 from src.webhook_simulator.signer import WebhookSigner
 from src.webhook_simulator.retry import RetryManager
 from src.webhook_simulator.logger import DeliveryLogger
@@ -84,3 +87,24 @@ def payment_factory():
 @pytest.fixture
 def webhook_factory():
     return WebhookFactory
+
+
+@pytest.fixture
+def attempt_factory():
+    """Builds the ``n``-th delivery attempt; no status code means a timeout."""
+
+    def create(
+        n: int, status_code: int | None = 200, event_id: str | None = None,
+    ) -> DeliveryAttempt:
+        return DeliveryAttempt(
+            attempt_id=f"att_{n:04d}",
+            event_id=event_id or f"evt_{n:04d}",
+            url="http://merchant.test/webhook",
+            status_code=status_code,
+            timestamp=datetime(2026, 1, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+            + timedelta(seconds=n),
+            response_time_ms=float(n),
+            error=None if status_code else "timeout",
+        )
+
+    return create
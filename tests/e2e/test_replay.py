@@ -18,8 +18,8 @@ class TestReplay:
         self, engine, webhook_factory, replay_manager, logger,
     ):
         """Register event, deliver to failing merchant (500), then replay to
-        working merchant. Replayed payload matches original fields and has
-        _replay: True marker."""
+        working merchant. Replayed payload is the original, unchanged, and the
+        delivery carries the replay header."""
         event = webhook_factory.create_event(
             "payment.authorized", payment_id="pay_replay_original_001",
         )
@@ -55,8 +55,10 @@ class TestReplay:
             assert replayed_payload["event_type"] == event.payload["event_type"]
             assert replayed_payload["status"] == event.payload["status"]
 
-            # Replay marker present
-            assert replayed_payload["_replay"] is True
+            # Marked as a replay by header, not in the payload
+            assert replayed_payload == event.payload
+            assert received[0]["replay"] is True
+            assert received[0]["headers"]["X-Webhook-Replay"] == "true"
         finally:
             working_server.stop()
 
@@ -64,7 +66,7 @@ class TestReplay:
         self, engine, webhook_factory, replay_manager, logger, merchant_server,
     ):
         """Replay an event and verify delivery attempts exist in the logger,
-        and that the merchant received payload contains _replay: True."""
+        and that the merchant saw the delivery marked as a replay."""
         event = webhook_factory.create_event("payment.captured")
         replay_manager.register_event(event)
 
@@ -76,10 +78,10 @@ class TestReplay:
         assert len(logged) >= 1
         assert logged[-1].status_code == 200
 
-        # Merchant received the replayed event with _replay flag
+        # Merchant received the replayed event with the replay flag
         received = merchant_server.get_received_events()
         assert len(received) == 1
-        assert received[0]["payload"]["_replay"] is True
+        assert received[0]["replay"] is True
 
     def test_replay_specific_event_by_id(
         self, engine, webhook_factory, replay_manager, merchant_server,
@@ -107,7 +109,7 @@ class TestReplay:
         assert len(received) == 1
         assert received[0]["payload"]["payment_id"] == "pay_specific_b"
         assert received[0]["payload"]["event_type"] == "payment.captured"
-        assert received[0]["payload"]["_replay"] is True
+        assert received[0]["replay"] is True
 
     def test_replay_failed_deliveries_only(
         self, signer, logger, webhook_factory,
@@ -176,6 +178,42 @@ class TestReplay:
         finally:
             replay_server.stop()
 
+    def test_replay_failed_skips_events_delivered_by_retry(
+        self, signer, logger, webhook_factory,
+    ):
+        """An event that failed once and then succeeded on a later attempt is
+        no longer outstanding, so replay_failed leaves it alone."""
+        from src.webhook_simulator.retry import RetryManager
+        from src.webhook_simulator.engine import WebhookDeliveryEngine
+        from src.replay.manager import WebhookReplayManager
+
+        eng = WebhookDeliveryEngine(
+            signer=signer, retry_manager=RetryManager(max_retries=0), logger=logger,
+            timeout_seconds=5,
+        )
+        replay_mgr = WebhookReplayManager(engine=eng, logger=logger)
+        recovered = webhook_factory.create_event("payment.captured", payment_id="pay_recovered")
+        stuck = webhook_factory.create_event("payment.captured", payment_id="pay_stuck")
+        for ev in [recovered, stuck]:
+            replay_mgr.register_event(ev)
+
+        server = MerchantWebhookServer(secret=WEBHOOK_SECRET)
+        server.set_response_code(500)
+        server.start()
+        try:
+            eng.deliver(recovered, server.url)
+            eng.deliver(stuck, server.url)
+            server.set_response_code(200)
+            eng.deliver(recovered, server.url)
+            server.clear_events()
+
+            results = replay_mgr.replay_failed(server.url)
+            assert list(results) == [stuck.event_id]
+            received = server.get_received_events()
+            assert [e["payload"]["payment_id"] for e in received] == ["pay_stuck"]
+        finally:
+            server.stop()
+
     def test_replay_respects_current_merchant_url(
         self, engine, webhook_factory, replay_manager, logger,
     ):
@@ -210,11 +248,171 @@ class TestReplay:
             received_2 = server_2.get_received_events()
             assert len(received_2) == 1
             assert received_2[0]["payload"]["payment_id"] == "pay_url_switch"
-            assert received_2[0]["payload"]["_replay"] is True
+            assert received_2[0]["replay"] is True
 
             # Confirm server_1 never got the replay (only original failed attempts)
             received_1 = server_1.get_received_events()
             for ev in received_1:
-                assert "_replay" not in ev["payload"]
+                assert ev["replay"] is False
         finally:
             server_2.stop()
+
+    def test_replay_failed_concurrently_with_rate_and_progress(
+        self, signer, logger, webhook_factory,
+    ):
+        """Replay many failed events with several workers and a rate
+        controller. Every event is re-delivered once and progress is
+        reported for each."""
+        from src.webhook_simulator.retry import RetryManager
+        from src.webhook_simulator.engine import WebhookDeliveryEngine
+        from src.replay.manager import WebhookReplayManager
+        from src.replay.pacing import ReplayRateController
+
+        eng = WebhookDeliveryEngine(
+            signer=signer, retry_manager=RetryManager(max_retries=0), logger=logger,
+            timeout_seconds=5,
+        )
+        replay_mgr = WebhookReplayManager(engine=eng, logger=logger)
+        events = [
+            webhook_factory.create_event("payment.captured", payment_id=f"pay_bulk_{n}")
+            for n in range(20)
+        ]
+
+        fail_server = MerchantWebhookServer(secret=WEBHOOK_SECRET)
+        fail_server.set_response_code(500)
+        fail_server.start()
+        try:
+            for ev in events:
+                replay_mgr.register_event(ev)
+                eng.deliver(ev, fail_server.url)
+        finally:
+            fail_server.stop()
+
+        reports = []
+        rate = ReplayRateController(initial_rate=50, max_rate=500)
+        replay_server = MerchantWebhookServer(secret=WEBHOOK_SECRET)
+        replay_server.start()
+        try:
+            results = replay_mgr.replay_failed(
+                replay_server.url, concurrency=8, rate=rate, progress=reports.append,
+            )
+            assert set(results) == {ev.event_id for ev in events}
+            assert replay_server.get_processed_count() == 20
+        finally:
+            replay_server.stop()
+
+        assert len(reports) == 20
+        assert max(r.completed for r in reports) == 20
+        assert sum(1 for r in reports if r.completed == 20 and r.succeeded == 20) == 1
+        assert rate.rate > 50
+
+    def test_replay_from_persistent_store_after_restart(
+        self, engine, logger, webhook_factory, merchant_server, tmp_path,
+    ):
+        """Events registered with a SQLite store can be replayed by a new
+        manager opened on the same database."""
+        from src.replay.manager import WebhookReplayManager
+        from src.replay.store import SQLiteEventStore
+
+        event = webhook_factory.create_event("payment.captured", payment_id="pay_persisted")
+        first = WebhookReplayManager(engine, logger, store=SQLiteEventStore(tmp_path / "ev.db"))
+        first.register_events([event], merchant_id="merch_1")
+        first.store.close()
+
+        restarted = WebhookReplayManager(engine, logger, store=SQLiteEventStore(tmp_path / "ev.db"))
+        try:
+            attempts = restarted.replay_event(event.event_id, merchant_server.url)
+            assert attempts[-1].status_code == 200
+            received = merchant_server.get_received_events()
+            assert received[0]["payload"]["payment_id"] == "pay_persisted"
+        finally:
+            restarted.store.close()
+
+    def test_replay_query_by_type_merchant_and_window(
+        self, engine, logger, webhook_factory, merchant_server,
+    ):
+        """Replay only one merchant's settled events inside a time window,
+        fed to the engine in batches."""
+        from datetime import datetime, timezone
+
+        from src.replay.manager import WebhookReplayManager
+        from src.replay.store import SQLiteEventStore
+
+        def at(hour, event_type="payment.settled"):
+            ev = webhook_factory.create_event(event_type)
+            ev.timestamp = datetime(2026, 3, 1, hour, tzinfo=timezone.utc)
+            return ev
+
+        inside = [at(2), at(3), at(5)]
+        replay_mgr = WebhookReplayManager(engine, logger, store=SQLiteEventStore())
+        replay_mgr.register_events(inside + [at(7)], merchant_id="merch_x")
+        replay_mgr.register_events([at(3)], merchant_id="merch_y")
+        replay_mgr.register_events([at(3, "payment.captured")], merchant_id="merch_x")
+
+        reports = []
+        results = replay_mgr.replay_query(
+            merchant_server.url,
+            event_type="payment.settled",
+            merchant_id="merch_x",
+            start=datetime(2026, 3, 1, 2, tzinfo=timezone.utc),
+            end=datetime(2026, 3, 1, 6, tzinfo=timezone.utc),
+            batch_size=2,
+            concurrency=2,
+            progress=reports.append,
+        )
+
+        assert set(results) == {ev.event_id for ev in inside}
+        assert merchant_server.get_processed_count() == 3
+        assert reports[-1].total == 3
+        replay_mgr.store.close()
+
+    def test_replay_failed_keeps_each_payments_events_in_order(
+        self, signer, logger, webhook_factory,
+    ):
+        """Events that failed out of order are replayed concurrently across
+        payments but oldest first within each payment."""
+        from datetime import datetime, timedelta, timezone
+
+        from src.webhook_simulator.retry import RetryManager
+        from src.webhook_simulator.engine import WebhookDeliveryEngine
+        from src.replay.manager import WebhookReplayManager
+
+        eng = WebhookDeliveryEngine(
+            signer=signer, retry_manager=RetryManager(max_retries=0), logger=logger,
+            timeout_seconds=5,
+        )
+        replay_mgr = WebhookReplayManager(engine=eng, logger=logger)
+        lifecycle = ["payment.authorized", "payment.captured", "payment.settled"]
+        base = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        events = []
+        for n in range(6):
+            for step, event_type in enumerate(lifecycle):
+                ev = webhook_factory.create_event(event_type, payment_id=f"pay_order_{n}")
+                ev.timestamp = base + timedelta(minutes=step)
+                events.append(ev)
+
+        fail_server = MerchantWebhookServer(secret=WEBHOOK_SECRET)
+        fail_server.set_response_code(500)
+        fail_server.start()
+        try:
+            for ev in reversed(events):
+                replay_mgr.register_event(ev)
+                eng.deliver(ev, fail_server.url)
+        finally:
+            fail_server.stop()
+
+        replay_server = MerchantWebhookServer(secret=WEBHOOK_SECRET)
+        replay_server.start()
+        try:
+            replay_mgr.replay_failed(replay_server.url, concurrency=4)
+            received = replay_server.get_received_events()
+        finally:
+            replay_server.stop()
+
+        assert len(received) == len(events)
+        by_payment: dict[str, list[str]] = {}
+        for record in received:
+            payload = record["payload"]
+            by_payment.setdefault(payload["payment_id"], []).append(payload["event_type"])
+        assert len(by_payment) == 6
+        assert all(types == lifecycle for types in by_payment.values())
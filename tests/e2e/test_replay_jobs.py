@@ -0,0 +1,142 @@
+"""E2E tests for checkpointed, resumable replay jobs."""
+
+import pytest
+
+from src.replay.jobs import ReplayJob, ReplayJobStatus
+from src.replay.manager import WebhookReplayManager
+from src.replay.store import SQLiteEventStore
+
+
+pytestmark = pytest.mark.e2e
+
+
+@pytest.fixture
+def stored_events(webhook_factory, tmp_path):
+    events = [
+        webhook_factory.create_event("payment.settled", payment_id=f"pay_job_{n}")
+        for n in range(10)
+    ]
+    store = SQLiteEventStore(tmp_path / "events.db")
+    store.put_many(events, merchant_id="merch_x")
+    store.close()
+    return events
+
+
+class TestReplayJobs:
+    """Test that replay jobs checkpoint progress and resume without re-sending."""
+
+    def test_paused_job_resumes_in_new_manager_without_resending(
+        self, engine, logger, merchant_server, stored_events, tmp_path,
+    ):
+        """Pause after a few events, rebuild the job from its checkpoint with
+        a fresh manager and store, and finish: every event arrives once."""
+        checkpoint = tmp_path / "job.jsonl"
+        store = SQLiteEventStore(tmp_path / "events.db")
+        job = ReplayJob(
+            WebhookReplayManager(engine, logger, store=store),
+            merchant_server.url,
+            checkpoint,
+            merchant_id="merch_x",
+        )
+
+        def pause_after_three(progress):
+            if progress.completed == 3:
+                job.pause()
+
+        assert job.run(progress=pause_after_three) == ReplayJobStatus.PAUSED
+        assert len(job.results) == 3
+        job.close()
+        store.close()
+
+        store = SQLiteEventStore(tmp_path / "events.db")
+        resumed = ReplayJob.resume(WebhookReplayManager(engine, logger, store=store), checkpoint)
+        assert resumed.status == ReplayJobStatus.PAUSED
+        assert len(resumed.results) == 3
+        assert resumed.run(concurrency=4) == ReplayJobStatus.COMPLETED
+        resumed.close()
+        store.close()
+
+        received = [e["payload"]["payment_id"] for e in merchant_server.get_received_events()]
+        assert sorted(received) == sorted(e.payment_id for e in stored_events)
+        assert resumed.succeeded == 10
+
+    def test_completed_job_cannot_rerun(self, engine, logger, merchant_server, stored_events, tmp_path):
+        """A finished job replays nothing more, even after reloading."""
+        store = SQLiteEventStore(tmp_path / "events.db")
+        manager = WebhookReplayManager(engine, logger, store=store)
+        ids = [e.event_id for e in stored_events[:2]]
+        job = ReplayJob(manager, merchant_server.url, tmp_path / "job.jsonl", event_ids=ids)
+        job.start()
+        assert job.wait(timeout=10) == ReplayJobStatus.COMPLETED
+        job.close()
+
+        reloaded = ReplayJob.resume(manager, tmp_path / "job.jsonl")
+        assert reloaded.status == ReplayJobStatus.COMPLETED
+        with pytest.raises(ValueError):
+            reloaded.run()
+        assert merchant_server.get_processed_count() == 2
+        store.close()
+
+    def test_cancelled_before_start(self, engine, logger, merchant_server, stored_events, tmp_path):
+        """Cancelling a pending job records it and sends nothing."""
+        store = SQLiteEventStore(tmp_path / "events.db")
+        job = ReplayJob(
+            WebhookReplayManager(engine, logger, store=store),
+            merchant_server.url,
+            tmp_path / "job.jsonl",
+        )
+        job.cancel()
+        job.close()
+        assert ReplayJob.resume(job.manager, tmp_path / "job.jsonl").status == ReplayJobStatus.CANCELLED
+        assert merchant_server.get_processed_count() == 0
+        store.close()
+
+    def test_resume_drops_torn_last_line(self, engine, logger, merchant_server, stored_events, tmp_path):
+        """A half-written final record is cut off and the job still resumes."""
+        checkpoint = tmp_path / "job.jsonl"
+        store = SQLiteEventStore(tmp_path / "events.db")
+        manager = WebhookReplayManager(engine, logger, store=store)
+        ids = [e.event_id for e in stored_events[:3]]
+        job = ReplayJob(manager, merchant_server.url, checkpoint, event_ids=ids)
+        job.pause()
+        job.close()
+        with open(checkpoint, "a", encoding="utf-8") as f:
+            f.write('{"type": "result", "event_id": "evt_')
+
+        resumed = ReplayJob.resume(manager, checkpoint)
+        assert resumed.status == ReplayJobStatus.PAUSED
+        assert resumed.run() == ReplayJobStatus.COMPLETED
+        resumed.close()
+        assert ReplayJob.resume(manager, checkpoint).succeeded == 3
+        store.close()
+
+    def test_new_job_refuses_existing_checkpoint(
+        self, engine, logger, merchant_server, stored_events, tmp_path,
+    ):
+        """Only ``resume`` may reopen a checkpoint file."""
+        store = SQLiteEventStore(tmp_path / "events.db")
+        manager = WebhookReplayManager(engine, logger, store=store)
+        ReplayJob(manager, merchant_server.url, tmp_path / "job.jsonl").close()
+        with pytest.raises(FileExistsError):
+            ReplayJob(manager, merchant_server.url, tmp_path / "job.jsonl")
+        store.close()
+
+    def test_failed_run_leaves_job_paused(
+        self, engine, logger, merchant_server, stored_events, tmp_path, monkeypatch,
+    ):
+        """An exception during a run pauses the job instead of leaving it running."""
+        store = SQLiteEventStore(tmp_path / "events.db")
+        manager = WebhookReplayManager(engine, logger, store=store)
+        job = ReplayJob(manager, merchant_server.url, tmp_path / "job.jsonl")
+
+        def broken(event, url):
+            raise RuntimeError("engine down")
+
+        monkeypatch.setattr(manager, "_replay", broken)
+        with pytest.raises(RuntimeError):
+            job.run()
+        assert job.status == ReplayJobStatus.PAUSED
+        assert isinstance(job.error, RuntimeError)
+        job.close()
+        assert ReplayJob.resume(manager, tmp_path / "job.jsonl").status == ReplayJobStatus.PAUSED
+        store.close()
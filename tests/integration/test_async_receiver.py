@@ -0,0 +1,161 @@
+"""Integration tests for the asyncio merchant server backend."""
+
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from src.merchant_receiver.async_server import AsyncMerchantWebhookServer
+from src.observability.metrics import MetricsCollector
+from src.utils.factories import WebhookFactory
+
+
+pytestmark = pytest.mark.integration
+
+
+WEBHOOK_SECRET = "test-secret-key-for-hmac"
+
+
+@pytest.fixture
+def async_server():
+    server = AsyncMerchantWebhookServer(secret=WEBHOOK_SECRET)
+    server.start()
+    yield server
+    server.stop()
+
+
+class TestAsyncMerchantServer:
+    """Test that the asyncio backend behaves like the threaded server."""
+
+    def test_engine_delivery_is_recorded(self, engine, async_server):
+        """A signed delivery from the engine is accepted and recorded with its headers."""
+        event = WebhookFactory.create_event("payment.captured")
+        attempt = engine.deliver(event, async_server.url)
+
+        assert attempt.status_code == 200
+        received = async_server.get_received_events()
+        assert len(received) == 1
+        assert received[0]["event_id"] == event.event_id
+        assert received[0]["payload"] == event.payload
+        assert received[0]["headers"]["X-Event-Type"] == "payment.captured"
+        assert received[0]["replay"] is False
+
+    def test_rejects_bad_signature_and_invalid_json(self, async_server):
+        """Validation errors return the same codes as the threaded server."""
+        resp = requests.post(async_server.url, data=b"not json", timeout=5)
+        assert resp.status_code == 400
+
+        event = WebhookFactory.create_event()
+        resp = requests.post(
+            async_server.url, json=event.payload,
+            headers={"X-Webhook-Signature": "bad"}, timeout=5,
+        )
+        assert resp.status_code == 401
+        assert resp.json() == {"error": "invalid signature"}
+        assert async_server.get_processed_count() == 0
+
+    def test_response_code_and_idempotency(self, engine, async_server):
+        """set_response_code and enable_idempotency apply to the async backend."""
+        event = WebhookFactory.create_event()
+        async_server.set_response_code(503)
+        assert engine.deliver(event, async_server.url).status_code == 503
+
+        async_server.set_response_code(200).enable_idempotency()
+        assert engine.deliver(event, async_server.url).status_code == 200
+        assert engine.deliver(event, async_server.url).status_code == 200
+        assert async_server.get_processed_count() == 1
+
+    def test_response_delay_does_not_block_other_connections(self, signer, async_server):
+        """A delayed response is awaited, so concurrent requests overlap."""
+        async_server.set_response_delay(0.3)
+        body, signature = signer.encode(WebhookFactory.create_event().payload)
+        headers = {"X-Webhook-Signature": signature}
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            codes = list(pool.map(
+                lambda _: requests.post(async_server.url, data=body, headers=headers, timeout=5).status_code,
+                range(10),
+            ))
+        assert codes == [200] * 10
+        assert time.monotonic() - started < 2.0
+
+    def test_pipelined_requests_on_one_connection(self, signer, async_server):
+        """Several requests written back to back on one socket each get a response."""
+        event = WebhookFactory.create_event()
+        body, signature = signer.encode(event.payload)
+        request = (
+            f"POST /webhook HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Length: {len(body)}\r\nX-Webhook-Signature: {signature}\r\n\r\n"
+        ).encode() + body
+
+        with socket.create_connection(("127.0.0.1", async_server.port), timeout=5) as conn:
+            conn.sendall(request * 5)
+            data = b""
+            while data.count(b"HTTP/1.1 200") < 5:
+                chunk = conn.recv(65536)
+                assert chunk
+                data += chunk
+        assert async_server.get_processed_count() == 5
+
+    def test_metrics_endpoint(self, async_server):
+        """enable_metrics_endpoint serves Prometheus text on the async backend."""
+        metrics = MetricsCollector(window_seconds=300)
+        metrics.record_success("payment.captured", async_server.url, latency_ms=5)
+        async_server.enable_metrics_endpoint(metrics, min_interval=0)
+
+        resp = requests.get(async_server.metrics_url, timeout=5)
+        assert resp.status_code == 200
+        assert 'webhook_deliveries_total{outcome="success"} 1' in resp.text
+
+
+def _exchange(server, request: bytes) -> bytes:
+    """Send raw bytes and read until the server closes or a response head arrives."""
+    with socket.create_connection(("127.0.0.1", server.port), timeout=5) as conn:
+        conn.sendall(request)
+        data = b""
+        while b"\r\n\r\n" not in data:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return data
+
+
+class TestAsyncRequestLimits:
+    """Test that malformed, oversized and stalled requests are refused."""
+
+    def test_negative_content_length_is_rejected(self, async_server):
+        """A negative Content-Length gets 400 instead of an unhandled error."""
+        data = _exchange(
+            async_server, b"POST /webhook HTTP/1.1\r\nHost: x\r\nContent-Length: -5\r\n\r\n",
+        )
+        assert data.startswith(b"HTTP/1.1 400")
+
+    def test_oversized_body_is_rejected_unread(self, async_server):
+        """A Content-Length past the limit gets 413 without waiting for the body."""
+        data = _exchange(
+            async_server,
+            b"POST /webhook HTTP/1.1\r\nHost: x\r\nContent-Length: 1073741824\r\n\r\n",
+        )
+        assert data.startswith(b"HTTP/1.1 413")
+        assert async_server.get_processed_count() == 0
+
+    def test_stalled_body_times_out(self, async_server):
+        """A body that never arrives gets 408 after the idle timeout."""
+        async_server.set_keep_alive(idle_timeout=0.2)
+        started = time.monotonic()
+        data = _exchange(
+            async_server, b"POST /webhook HTTP/1.1\r\nHost: x\r\nContent-Length: 10\r\n\r\nabc",
+        )
+        assert data.startswith(b"HTTP/1.1 408")
+        assert time.monotonic() - started < 2.0
+
+    def test_http10_keep_alive_is_announced(self, async_server):
+        """An HTTP/1.0 client asking for keep-alive is told the connection stays open."""
+        data = _exchange(
+            async_server,
+            b"GET /missing HTTP/1.0\r\nConnection: keep-alive\r\n\r\n",
+        )
+        assert b"Connection: keep-alive" in data
@@ -0,0 +1,55 @@
+"""Integration tests for delivery metrics recorded by the engine."""
+
+import pytest
+
+from src.observability.metrics import MetricsCollector
+from src.utils.factories import WebhookFactory
+from src.webhook_simulator.engine import WebhookDeliveryEngine
+
+
+pytestmark = pytest.mark.integration
+
+
+class TestDeliveryMetrics:
+    """Test that the engine feeds MetricsCollector when given one."""
+
+    def test_success_and_failure_recorded_with_labels_and_latency(
+        self, signer, retry_manager, logger, merchant_server_no_auth,
+    ):
+        """Each delivery is counted under its event type and URL with its latency."""
+        metrics = MetricsCollector(window_seconds=300)
+        eng = WebhookDeliveryEngine(
+            signer=signer, retry_manager=retry_manager, logger=logger,
+            timeout_seconds=5, metrics=metrics,
+        )
+        url = merchant_server_no_auth.url
+
+        eng.deliver(WebhookFactory.create_event("payment.captured"), url)
+        merchant_server_no_auth.set_response_code(500)
+        eng.deliver(WebhookFactory.create_event("payment.chargeback"), url)
+
+        assert metrics.snapshot().total == 2
+        chargeback = metrics.snapshot(event_type="payment.chargeback", url=url)
+        assert chargeback.failures == 1
+        assert chargeback.successes == 0
+        latency = metrics.latency_histogram(url=url)
+        assert latency.count == 2
+        assert latency.max_ms > 0
+
+    def test_redirect_status_counts_as_delivered(
+        self, signer, retry_manager, logger, merchant_server_no_auth,
+    ):
+        """A 3xx is a success for metrics and retries, as it is for the logger."""
+        metrics = MetricsCollector(window_seconds=300)
+        eng = WebhookDeliveryEngine(
+            signer=signer, retry_manager=retry_manager, logger=logger,
+            timeout_seconds=5, metrics=metrics,
+        )
+        merchant_server_no_auth.set_response_code(304)
+        event = WebhookFactory.create_event("payment.captured")
+
+        attempts = eng.deliver_with_retry(event, merchant_server_no_auth.url, delay_factor=0)
+
+        assert [a.status_code for a in attempts] == [304]
+        assert metrics.snapshot().successes == 1
+        assert logger.outstanding_event_ids() == []
@@ -0,0 +1,133 @@
+"""Integration tests for combining metrics from several worker processes."""
+
+import json
+import multiprocessing
+import time
+from multiprocessing.connection import Client
+
+import pytest
+
+from src.observability.aggregation import MetricsAggregator, MetricsPublisher
+from src.observability.metrics import MetricsCollector
+
+
+pytestmark = pytest.mark.integration
+
+
+def _worker(address, worker_id: str, failures: int) -> None:
+    metrics = MetricsCollector(window_seconds=300)
+    publisher = MetricsPublisher(metrics, address, worker_id, interval=60)
+    for _ in range(10):
+        metrics.record_success("payment.captured", "http://merchant.test", latency_ms=20.0)
+    for _ in range(failures):
+        metrics.record_failure("payment.captured", "http://merchant.test", latency_ms=900.0)
+    publisher.close()
+
+
+class TestMetricsAggregation:
+    """Test that an aggregator merges the collectors of separate processes."""
+
+    def test_global_view_across_processes(self):
+        """Counts, labels and latency from every worker show up in one collector."""
+        aggregator = MetricsAggregator()
+        try:
+            procs = [
+                multiprocessing.Process(target=_worker, args=(aggregator.address, f"w{n}", n))
+                for n in range(3)
+            ]
+            for p in procs:
+                p.start()
+            for p in procs:
+                p.join(timeout=30)
+                assert p.exitcode == 0
+
+            deadline = time.monotonic() + 5
+            while len(aggregator.workers()) < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            merged = aggregator.collector()
+        finally:
+            aggregator.close()
+
+        snap = merged.snapshot(url="http://merchant.test")
+        assert snap.successes == 30
+        assert snap.failures == 3
+        assert merged.totals() == (30, 3)
+        assert merged.latency_histogram().max_ms == 900.0
+
+    def test_republish_replaces_previous_state(self):
+        """A worker's newer state supersedes its older one rather than adding to it."""
+        aggregator = MetricsAggregator()
+        metrics = MetricsCollector(window_seconds=300)
+        publisher = MetricsPublisher(metrics, aggregator.address, "w0", interval=60)
+        try:
+            metrics.record_success()
+            publisher.publish()
+            metrics.record_failure()
+            publisher.close()
+            deadline = time.monotonic() + 5
+            while aggregator.collector().totals() != (1, 1) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert aggregator.collector().totals() == (1, 1)
+        finally:
+            publisher.close()
+            aggregator.close()
+
+    def test_wrong_authkey_is_rejected(self):
+        """A TCP client without the right key cannot connect, and the listener keeps serving."""
+        aggregator = MetricsAggregator(authkey=b"secret")
+        try:
+            with pytest.raises(multiprocessing.AuthenticationError):
+                Client(aggregator.address, authkey=b"wrong")
+            metrics = MetricsCollector(window_seconds=300)
+            metrics.record_success()
+            MetricsPublisher(metrics, aggregator.address, "w0", authkey=b"secret").close()
+            deadline = time.monotonic() + 5
+            while not aggregator.workers() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert aggregator.workers() == ["w0"]
+        finally:
+            aggregator.close()
+
+    def test_malformed_message_is_dropped(self):
+        """Bad messages are skipped without closing the worker's connection."""
+        aggregator = MetricsAggregator()
+        conn = Client(aggregator.address, authkey=bytes(multiprocessing.current_process().authkey))
+        try:
+            conn.send_bytes(b"not json")
+            conn.send_bytes(b'{"worker_id": "w0"}')
+            conn.send_bytes(b'{"worker_id": "w0", "state": {"version": 0}}')
+            state = MetricsCollector(window_seconds=300).export_state()
+            conn.send_bytes(json.dumps({"worker_id": "w1", "state": state}).encode("utf-8"))
+            deadline = time.monotonic() + 5
+            while not aggregator.workers() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert aggregator.workers() == ["w1"]
+        finally:
+            conn.close()
+            aggregator.close()
+
+    def test_incompatible_layout_is_dropped(self):
+        """A state with another window layout, or without tiers, never reaches the merge."""
+        aggregator = MetricsAggregator()
+        conn = Client(aggregator.address, authkey=bytes(multiprocessing.current_process().authkey))
+        try:
+            first = MetricsCollector(window_seconds=300)
+            first.record_success()
+            conn.send_bytes(json.dumps({"worker_id": "w0", "state": first.export_state()}).encode())
+            other = MetricsCollector(window_seconds=60).export_state()
+            conn.send_bytes(json.dumps({"worker_id": "w1", "state": other}).encode())
+            broken = {k: v for k, v in first.export_state().items() if k != "tiers"}
+            conn.send_bytes(json.dumps({"worker_id": "w2", "state": broken}).encode())
+            last = MetricsCollector(window_seconds=300)
+            last.record_failure()
+            conn.send_bytes(json.dumps({"worker_id": "w3", "state": last.export_state()}).encode())
+            deadline = time.monotonic() + 5
+            while len(aggregator.workers()) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert aggregator.workers() == ["w0", "w3"]
+            assert aggregator.collector().totals() == (1, 1)
+            with pytest.raises(ValueError):
+                aggregator.update("w1", other)
+        finally:
+            conn.close()
+            aggregator.close()
@@ -0,0 +1,51 @@
+"""Integration tests for scraping delivery metrics over HTTP."""
+
+import pytest
+import requests
+
+from src.observability.metrics import MetricsCollector
+from src.observability.prometheus import MetricsHTTPServer
+from src.utils.factories import WebhookFactory
+from src.webhook_simulator.engine import WebhookDeliveryEngine
+
+
+pytestmark = pytest.mark.integration
+
+
+class TestMetricsEndpoint:
+    """Test the opt-in Prometheus endpoint on the merchant server and standalone."""
+
+    def test_merchant_server_route_reflects_deliveries(
+        self, signer, retry_manager, logger, merchant_server_no_auth,
+    ):
+        """Deliveries made by the engine show up on the merchant server's /metrics."""
+        metrics = MetricsCollector(window_seconds=300)
+        merchant_server_no_auth.enable_metrics_endpoint(metrics, min_interval=0)
+        eng = WebhookDeliveryEngine(
+            signer=signer, retry_manager=retry_manager, logger=logger,
+            timeout_seconds=5, metrics=metrics,
+        )
+        eng.deliver(WebhookFactory.create_event("payment.captured"), merchant_server_no_auth.url)
+
+        resp = requests.get(merchant_server_no_auth.metrics_url, timeout=5)
+        assert resp.status_code == 200
+        assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert 'webhook_deliveries_total{outcome="success"} 1' in resp.text
+        assert 'event_type="payment.captured"' in resp.text
+
+    def test_route_disabled_by_default(self, merchant_server_no_auth):
+        """Without enable_metrics_endpoint, GET /metrics is a 404."""
+        resp = requests.get(merchant_server_no_auth.metrics_url, timeout=5)
+        assert resp.status_code == 404
+
+    def test_standalone_server(self):
+        """MetricsHTTPServer exposes a collector without a merchant server."""
+        metrics = MetricsCollector(window_seconds=300)
+        metrics.record_failure()
+        server = MetricsHTTPServer(metrics)
+        server.start()
+        try:
+            resp = requests.get(server.url, timeout=5)
+        finally:
+            server.stop()
+        assert 'webhook_deliveries_total{outcome="failure"} 1' in resp.text
@@ -0,0 +1,125 @@
+"""Integration tests for persistent connections on both merchant server backends."""
+
+import socket
+import time
+
+import pytest
+import requests
+
+from src.merchant_receiver.async_server import AsyncMerchantWebhookServer
+from src.merchant_receiver.server import MerchantWebhookServer
+from src.utils.factories import WebhookFactory
+
+
+pytestmark = pytest.mark.integration
+
+
+WEBHOOK_SECRET = "test-secret-key-for-hmac"
+
+
+@pytest.fixture(params=[MerchantWebhookServer, AsyncMerchantWebhookServer], ids=["threaded", "asyncio"])
+def server(request):
+    server = request.param(secret=WEBHOOK_SECRET)
+    server.start()
+    yield server
+    server.stop()
+
+
+def _signed(signer) -> tuple[bytes, dict]:
+    body, signature = signer.encode(WebhookFactory.create_event().payload)
+    return body, {"Content-Type": "application/json", "X-Webhook-Signature": signature}
+
+
+class TestKeepAlive:
+    """Test connection reuse, limits and counters."""
+
+    def test_session_reuses_one_connection(self, signer, server):
+        """A pooled client sends every webhook over a single connection."""
+        body, headers = _signed(signer)
+        with requests.Session() as session:
+            for _ in range(5):
+                resp = session.post(server.url, data=body, headers=headers, timeout=5)
+                assert resp.status_code == 200
+                assert resp.headers["Content-Length"] == str(len(resp.content))
+
+        assert server.get_connection_stats() == {"connections": 1, "requests": 5, "reused": 4}
+
+    def test_failure_responses_are_framed(self, signer, server):
+        """Non-2xx responses without a body still keep the connection usable."""
+        server.set_response_code(500)
+        body, headers = _signed(signer)
+        with requests.Session() as session:
+            for _ in range(3):
+                resp = session.post(server.url, data=body, headers=headers, timeout=5)
+                assert resp.status_code == 500
+                assert resp.headers["Content-Length"] == "0"
+            assert session.get(server.url, timeout=5).status_code == 404
+
+        assert server.get_connection_stats()["connections"] == 1
+
+    def test_max_requests_per_connection(self, signer, server):
+        """The capped request is answered with Connection: close and the client reconnects."""
+        server.set_keep_alive(max_requests=2)
+        body, headers = _signed(signer)
+        with requests.Session() as session:
+            responses = [
+                session.post(server.url, data=body, headers=headers, timeout=5) for _ in range(4)
+            ]
+
+        assert [r.headers.get("Connection") for r in responses][1::2] == ["close", "close"]
+        assert server.get_connection_stats() == {"connections": 2, "requests": 4, "reused": 2}
+
+    def test_idle_connection_is_closed(self, server):
+        """A connection left idle past the timeout is closed by the server."""
+        server.set_keep_alive(idle_timeout=0.2)
+        with socket.create_connection(("127.0.0.1", server.port), timeout=5) as conn:
+            started = time.monotonic()
+            assert conn.recv(1024) == b""
+            assert time.monotonic() - started < 3
+
+    def test_keep_alive_disabled(self, signer, server):
+        """idle_timeout=0 closes the connection after every response."""
+        server.set_keep_alive(idle_timeout=0)
+        body, headers = _signed(signer)
+        with requests.Session() as session:
+            for _ in range(3):
+                resp = session.post(server.url, data=body, headers=headers, timeout=5)
+                assert resp.headers["Connection"] == "close"
+
+        assert server.get_connection_stats() == {"connections": 3, "requests": 3, "reused": 0}
+
+
+def _until_closed(server, request: bytes) -> bytes:
+    """Send raw bytes and read everything until the server closes the connection."""
+    with socket.create_connection(("127.0.0.1", server.port), timeout=5) as conn:
+        conn.sendall(request)
+        data = b""
+        while chunk := conn.recv(65536):
+            data += chunk
+    return data
+
+
+class TestRequestFraming:
+    """Test that bodies the server cannot frame end the connection."""
+
+    def test_chunked_body_is_refused_and_closed(self, server):
+        """A chunked POST gets 411, and its chunks are never parsed as a request."""
+        data = _until_closed(
+            server,
+            b"POST /webhook HTTP/1.1\r\nHost: x\r\nTransfer-Encoding: chunked\r\n\r\n"
+            b"7\r\n{\"a\":1}\r\n0\r\n\r\n",
+        )
+        assert data.startswith(b"HTTP/1.1 411")
+        assert b"Connection: close" in data
+        assert data.count(b"HTTP/1.1") == 1
+
+    @pytest.mark.parametrize("length", [b"abc", b"-1"])
+    def test_invalid_content_length_is_refused_and_closed(self, server, length):
+        """A malformed Content-Length gets 400 and the connection is closed."""
+        data = _until_closed(
+            server,
+            b"POST /webhook HTTP/1.1\r\nHost: x\r\nContent-Length: " + length + b"\r\n\r\n{}",
+        )
+        assert data.startswith(b"HTTP/1.1 400")
+        assert b"Connection: close" in data
+        assert server.get_processed_count() == 0
@@ -0,0 +1,98 @@
+# Lock-contention benchmark for the delivery write path.
+#
+# How to run:
+#   python -m tests.load.bench_contention
+#   python -m tests.load.bench_contention --ops 20000 --threads 1 4 16 64
+#
+# Each thread performs what WebhookDeliveryEngine does per delivery after the
+# HTTP call returns: DeliveryLogger.log() plus one MetricsCollector.record_*().
+# Every thread count is run twice: with shards=1, which behaves like the old
+# single global lock, and with the default shard count. With --reader, a
+# dashboard-style thread polls failure_rate() and failure_count() throughout
+# the run, which is where writers used to queue behind a long read.
+
+import argparse
+import threading
+import time
+from datetime import datetime, timezone
+
+from src.models.delivery import DeliveryAttempt
+from src.observability.metrics import MetricsCollector
+from src.webhook_simulator.logger import DeliveryLogger
+
+DEFAULT_THREADS = [1, 2, 4, 8, 16, 32, 64]
+
+
+def _worker(logger: DeliveryLogger, metrics: MetricsCollector, ops: int, barrier: threading.Barrier) -> None:
+    attempt = DeliveryAttempt(
+        attempt_id="att_bench",
+        event_id="evt_bench",
+        url="http://127.0.0.1/webhook",
+        status_code=200,
+        timestamp=datetime.now(timezone.utc),
+        response_time_ms=1.0,
+    )
+    barrier.wait()
+    for i in range(ops):
+        logger.log(attempt)
+        if i % 10:
+            metrics.record_success("payment.authorized")
+        else:
+            metrics.record_failure("payment.authorized")
+
+
+def _reader(logger: DeliveryLogger, metrics: MetricsCollector, stop: threading.Event) -> None:
+    while not stop.is_set():
+        metrics.failure_rate()
+        logger.failure_count()
+        time.sleep(0.001)
+
+
+def run(threads: int, ops: int, shards: int, reader: bool = False) -> float:
+    """Return write throughput in deliveries per second."""
+    logger = DeliveryLogger(shards=shards)
+    metrics = MetricsCollector(window_seconds=300, shards=shards)
+    barrier = threading.Barrier(threads + 1)
+    workers = [
+        threading.Thread(target=_worker, args=(logger, metrics, ops, barrier))
+        for _ in range(threads)
+    ]
+    stop = threading.Event()
+    poller = threading.Thread(target=_reader, args=(logger, metrics, stop))
+    for w in workers:
+        w.start()
+    if reader:
+        poller.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    if reader:
+        poller.join()
+
+    assert logger.memory_count() == threads * ops
+    assert metrics.total_in_window() == threads * ops
+    return threads * ops / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare delivery write throughput with one shard and with many.",
+    )
+    parser.add_argument("--ops", type=int, default=20_000, help="deliveries per thread")
+    parser.add_argument("--threads", type=int, nargs="+", default=DEFAULT_THREADS)
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--reader", action="store_true", help="poll reads during the run")
+    args = parser.parse_args()
+
+    print(f"{'threads':>8} {'global lock/s':>15} {f'{args.shards} shards/s':>15} {'speedup':>8}")
+    for threads in args.threads:
+        single = run(threads, args.ops, shards=1, reader=args.reader)
+        sharded = run(threads, args.ops, shards=args.shards, reader=args.reader)
+        print(f"{threads:>8} {single:>15,.0f} {sharded:>15,.0f} {sharded / single:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,10 @@
 # How to run:
 #   locust -f tests/load/locustfile.py --headless -u 50 -r 10 --run-time 30s --host http://127.0.0.1:8080
 #
-# The test automatically starts a MerchantWebhookServer on port 8080 via
-# on_test_start/on_test_stop events, so no external server is needed.
+# The test automatically starts an AsyncMerchantWebhookServer on port 8080 via
+# on_test_start/on_test_stop events, so no external server is needed. The
+# asyncio receiver keeps up with the senders, so the run measures delivery
+# rather than the stand-in merchant.
 #
 # Throughput target: ~1000 payments/min (50 users * ~20 req/s with short waits).
 
@@ -14,7 +16,7 @@ import threading
 
 from locust import HttpUser, between, events, task
 
-from src.merchant_receiver.server import MerchantWebhookServer
+from src.merchant_receiver.async_server import AsyncMerchantWebhookServer
 from src.utils.factories import WebhookFactory
 from src.webhook_simulator.signer import WebhookSigner
 
@@ -31,7 +33,7 @@ _success_count: int = 0
 _failure_count: int = 0
 
 # Server instance managed by test lifecycle events
-_server: MerchantWebhookServer | None = None
+_server: AsyncMerchantWebhookServer | None = None
 
 # Event types to rotate through
 EVENT_TYPES = [
@@ -66,7 +68,7 @@ def _increment_failure() -> None:
 # ---------------------------------------------------------------------------
 @events.test_start.add_listener
 def on_test_start(environment, **kwargs):
-    """Start a MerchantWebhookServer on port 8080 before the load test begins."""
+    """Start an AsyncMerchantWebhookServer on port 8080 before the load test begins."""
     global _server, _sent_count, _success_count, _failure_count
 
     # Reset counters
@@ -75,18 +77,18 @@ def on_test_start(environment, **kwargs):
         _success_count = 0
         _failure_count = 0
 
-    _server = MerchantWebhookServer(
+    _server = AsyncMerchantWebhookServer(
         host="127.0.0.1",
         port=8080,
         secret=WEBHOOK_SECRET,
     )
     _server.start()
-    logger.info("MerchantWebhookServer started on port 8080")
+    logger.info("AsyncMerchantWebhookServer started on port 8080")
 
 
 @events.test_stop.add_listener
 def on_test_stop(environment, **kwargs):
-    """Stop the MerchantWebhookServer and report delivery stats."""
+    """Stop the AsyncMerchantWebhookServer and report delivery stats."""
     global _server
 
     received = 0
@@ -95,7 +97,7 @@ def on_test_stop(environment, **kwargs):
         received = _server.get_processed_count()
         _server.stop()
         _server = None
-        logger.info("MerchantWebhookServer stopped")
+        logger.info("AsyncMerchantWebhookServer stopped")
 
     with _stats_lock:
         total_sent = _sent_count
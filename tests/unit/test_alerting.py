@@ -1,6 +1,16 @@
+import time
+
 import pytest
 
-from src.observability.alerting import AlertManager
+from src.observability.alerting import (
+    AlertManager,
+    AlertRule,
+    BurnRateRule,
+    FailureRateRule,
+    LatencyPercentileRule,
+    MetricsView,
+    VolumeDropRule,
+)
 from src.observability.metrics import MetricsCollector
 
 
@@ -76,3 +86,271 @@ class TestAlertCheck:
         alert_manager.reset()
         refired = alert_manager.check()
         assert refired is not None
+
+    @pytest.mark.unit
+    def test_check_reads_one_snapshot(self, metrics, alert_manager, monkeypatch):
+        metrics.record_failure()
+        calls = []
+        original = metrics.snapshot
+        monkeypatch.setattr(metrics, "snapshot", lambda: calls.append(1) or original())
+        monkeypatch.setattr(metrics, "failure_rate", lambda: pytest.fail("separate scan"))
+        assert alert_manager.check() is not None
+        assert calls == [1]
+
+
+class TestLatencyAlert:
+    """Tests for AlertManager.check_latency()."""
+
+    @pytest.mark.unit
+    def test_fires_once_when_tail_latency_exceeds_threshold(self):
+        mc = MetricsCollector(window_seconds=300)
+        am = AlertManager(metrics=mc, latency_threshold_ms=500, latency_percentile=95)
+        for _ in range(90):
+            mc.record_success(latency_ms=20.0)
+        for _ in range(10):
+            mc.record_success(latency_ms=1500.0)
+
+        alert = am.check_latency()
+        assert alert is not None
+        assert alert["type"] == "webhook_latency"
+        assert alert["latency_ms"] == pytest.approx(1500.0, rel=0.02)
+        assert alert["total_deliveries"] == 100
+        assert am.check_latency() is None
+
+    @pytest.mark.unit
+    def test_no_latency_alert_without_threshold(self, metrics, alert_manager):
+        metrics.record_success(latency_ms=10_000.0)
+        assert alert_manager.check_latency() is None
+
+
+class TestAlertRules:
+    """Tests for rule-based evaluation with hysteresis."""
+
+    @pytest.mark.unit
+    def test_failure_rate_rule_hysteresis(self, metrics):
+        rule = FailureRateRule(threshold=0.5, resolve_threshold=0.2)
+        am = AlertManager(metrics=metrics, rules=[rule])
+        metrics.record_failure()
+        assert [a["state"] for a in am.evaluate()] == ["firing"]
+        # 1/3 is below the firing threshold but above the resolve threshold
+        metrics.record_success()
+        metrics.record_success()
+        assert am.evaluate() == []
+        for _ in range(3):
+            metrics.record_success()
+        resolved = am.evaluate()
+        assert [a["state"] for a in resolved] == ["resolved"]
+        assert resolved[0]["type"] == "webhook_failure_rate"
+
+    @pytest.mark.unit
+    def test_for_checks_requires_consecutive_breaches(self, metrics):
+        am = AlertManager(metrics=metrics, rules=[FailureRateRule(threshold=0.1, for_checks=3)])
+        metrics.record_failure()
+        assert am.evaluate() == []
+        assert am.evaluate() == []
+        assert len(am.evaluate()) == 1
+
+    @pytest.mark.unit
+    def test_per_label_rule_fires_per_endpoint(self, metrics):
+        rule = FailureRateRule(threshold=0.5, per_label=True)
+        am = AlertManager(metrics=metrics, rules=[rule])
+        metrics.record_failure("payment.captured", "http://bad.test")
+        metrics.record_success("payment.captured", "http://good.test")
+        alerts = am.evaluate()
+        assert [a["url"] for a in alerts] == ["http://bad.test"]
+        assert rule.firing() == [("payment.captured", "http://bad.test")]
+
+    @pytest.mark.unit
+    def test_filtered_rules_share_one_read(self, metrics, monkeypatch):
+        for n in range(50):
+            metrics.record_failure("payment.captured", f"http://m{n}.test")
+        reads = []
+        original = metrics.snapshot_by_label
+        monkeypatch.setattr(
+            metrics, "snapshot_by_label", lambda w=None: reads.append(w) or original(w)
+        )
+        rules = [FailureRateRule(threshold=0.5, url=f"http://m{n}.test") for n in range(50)]
+        am = AlertManager(metrics=metrics, rules=rules)
+        assert len(am.evaluate()) == 50
+        assert reads == [None]
+
+    @pytest.mark.unit
+    def test_latency_rule(self, metrics):
+        am = AlertManager(metrics=metrics, rules=[LatencyPercentileRule(threshold_ms=500)])
+        for _ in range(10):
+            metrics.record_success(url="http://a.test", latency_ms=900.0)
+        alert = am.evaluate()[0]
+        assert alert["type"] == "webhook_latency"
+        assert alert["value"] == pytest.approx(900.0, rel=0.02)
+
+    @pytest.mark.unit
+    def test_volume_drop_rule(self):
+        mc = MetricsCollector(window_seconds=0.2, windows=(2.0,))
+        rule = VolumeDropRule(window_seconds=0.2, baseline_window_seconds=2.0, min_ratio=0.5)
+        am = AlertManager(metrics=mc, rules=[rule])
+        for _ in range(20):
+            mc.record_success()
+        assert am.evaluate() == []
+        time.sleep(0.3)
+        alert = am.evaluate()[0]
+        assert alert["type"] == "webhook_volume_drop"
+        assert alert["recent_deliveries"] == 0
+
+    @pytest.mark.unit
+    def test_rule_resolves_when_data_disappears(self):
+        mc = MetricsCollector(window_seconds=0.1)
+        am = AlertManager(metrics=mc, rules=[FailureRateRule(threshold=0.1)])
+        mc.record_failure()
+        assert am.evaluate()[0]["state"] == "firing"
+        time.sleep(0.15)
+        assert am.evaluate()[0]["state"] == "resolved"
+
+    @pytest.mark.unit
+    def test_background_loop_evaluates_rules(self, metrics):
+        received = []
+        am = AlertManager(
+            metrics=metrics, callback=received.append, rules=[FailureRateRule(threshold=0.1)],
+        )
+        metrics.record_failure()
+        am.start(interval=0.01)
+        try:
+            deadline = time.monotonic() + 2
+            while not received and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            am.stop()
+        assert received[0]["state"] == "firing"
+
+    @pytest.mark.unit
+    def test_view_partial_filter(self, metrics):
+        metrics.record_failure("payment.captured", "http://a.test")
+        metrics.record_success("payment.captured", "http://b.test")
+        view = MetricsView(metrics)
+        assert view.snapshot(event_type="payment.captured").total == 2
+        assert view.snapshot(url="http://a.test").failures == 1
+        assert view.snapshot(url="http://missing.test").total == 0
+
+    @pytest.mark.unit
+    def test_view_matches_collector_when_label_parts_are_none(self, metrics):
+        metrics.record_failure("payment.captured", None)
+        metrics.record_success(None, "http://a.test")
+        metrics.record_failure("payment.captured", "http://a.test")
+        view = MetricsView(metrics)
+        for event_type, url in [
+            ("payment.captured", None), (None, "http://a.test"),
+            ("payment.captured", "http://a.test"),
+        ]:
+            expected = metrics.snapshot(event_type=event_type, url=url)
+            assert view.snapshot(event_type, url) == expected
+
+    @pytest.mark.unit
+    def test_view_latency_matches_collector(self, metrics):
+        metrics.record_success("payment.captured", "http://a.test", latency_ms=10.0)
+        metrics.record_success("payment.captured", "http://b.test", latency_ms=200.0)
+        metrics.record_failure("payment.refunded", "http://a.test", latency_ms=900.0)
+        view = MetricsView(metrics)
+        for event_type, url in [
+            ("payment.captured", None), (None, "http://a.test"),
+            ("payment.refunded", "http://a.test"), (None, None), (None, "http://missing.test"),
+        ]:
+            expected = metrics.latency_histogram(event_type=event_type, url=url)
+            histogram = view.latency(event_type, url)
+            assert histogram.to_state() == expected.to_state()
+
+    @pytest.mark.unit
+    def test_rules_are_abstract(self):
+        with pytest.raises(TypeError):
+            AlertRule()
+
+    @pytest.mark.unit
+    def test_failing_rule_and_callback_do_not_stop_others(self, metrics):
+        class BrokenRule(FailureRateRule):
+            def measure(self, view):
+                raise RuntimeError("broken")
+
+        received = []
+
+        def callback(alert):
+            received.append(alert)
+            if alert["rule"] == "first":
+                raise RuntimeError("callback failed")
+
+        am = AlertManager(metrics=metrics, callback=callback, rules=[
+            BrokenRule(name="broken"),
+            FailureRateRule(name="first", threshold=0.1),
+            FailureRateRule(name="second", threshold=0.1),
+        ])
+        metrics.record_failure()
+        am.start(interval=0.01)
+        try:
+            deadline = time.monotonic() + 2
+            while len(received) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            am.stop()
+        assert [a["rule"] for a in received] == ["first", "second"]
+
+
+class TestBurnRateRule:
+    """Tests for multi-window SLO burn-rate alerts."""
+
+    @pytest.mark.unit
+    def test_fires_when_both_windows_burn(self):
+        mc = MetricsCollector(window_seconds=300, windows=(3600,))
+        rule = BurnRateRule(slo_target=0.99, short_window_seconds=300, long_window_seconds=3600)
+        am = AlertManager(metrics=mc, rules=[rule])
+        # 20% failures against a 1% budget burns at 20x
+        for _ in range(8):
+            mc.record_success()
+        for _ in range(2):
+            mc.record_failure()
+        alert = am.evaluate()[0]
+        assert alert["type"] == "webhook_burn_rate"
+        assert alert["short_burn_rate"] == pytest.approx(20.0)
+        assert alert["long_burn_rate"] == pytest.approx(20.0)
+
+    @pytest.mark.unit
+    def test_below_burn_rate_does_not_fire(self):
+        mc = MetricsCollector(window_seconds=300, windows=(3600,))
+        am = AlertManager(metrics=mc, rules=[BurnRateRule(slo_target=0.9)])
+        # 10% failures is ten times a 99.9% budget but only 1x a 90% one
+        for _ in range(9):
+            mc.record_success()
+        mc.record_failure()
+        assert am.evaluate() == []
+
+    @pytest.mark.unit
+    def test_clears_when_short_window_recovers(self):
+        mc = MetricsCollector(window_seconds=0.1, windows=(5.0,))
+        rule = BurnRateRule(slo_target=0.99, short_window_seconds=0.1, long_window_seconds=5.0)
+        am = AlertManager(metrics=mc, rules=[rule])
+        mc.record_failure()
+        assert am.evaluate()[0]["state"] == "firing"
+        time.sleep(0.15)
+        mc.record_success()
+        resolved = am.evaluate()[0]
+        assert resolved["state"] == "resolved"
+        assert resolved["short_burn_rate"] == 0.0
+        assert resolved["long_burn_rate"] == pytest.approx(50.0)
+
+    @pytest.mark.unit
+    def test_reads_shared_window_snapshots(self, monkeypatch):
+        mc = MetricsCollector(window_seconds=300, windows=(3600,))
+        mc.record_failure()
+        monkeypatch.setattr(mc, "snapshot", lambda *a, **k: pytest.fail("separate scan"))
+        rules = [BurnRateRule(slo_target=0.99, name=f"slo-{n}") for n in range(10)]
+        assert len(AlertManager(metrics=mc, rules=rules).evaluate()) == 10
+
+    @pytest.mark.unit
+    def test_untracked_window_rejected_when_added(self, metrics):
+        am = AlertManager(metrics=metrics)
+        with pytest.raises(ValueError, match="3600s window"):
+            am.add_rule(BurnRateRule())
+        with pytest.raises(ValueError):
+            AlertManager(metrics=metrics, rules=[VolumeDropRule(60, baseline_window_seconds=900)])
+        assert am.rules == []
+
+    @pytest.mark.unit
+    def test_invalid_slo_rejected(self):
+        with pytest.raises(ValueError):
+            BurnRateRule(slo_target=1.0)
@@ -0,0 +1,76 @@
+import pytest
+
+from src.webhook_simulator.attempt_store import ColumnarAttemptStore, percentiles_of
+
+
+class TestColumnarStorage:
+    """Tests for row round-tripping and eviction."""
+
+    @pytest.mark.unit
+    def test_rows_materialize_equal_to_input(self, attempt_factory):
+        store = ColumnarAttemptStore()
+        originals = [
+            attempt_factory(1),
+            attempt_factory(2, status_code=None),
+            attempt_factory(3, status_code=503),
+        ]
+        for a in originals:
+            store.append(a)
+        assert list(store) == originals
+        assert store[-1] == originals[-1]
+
+    @pytest.mark.unit
+    def test_naive_timestamps_stay_naive(self, attempt_factory):
+        store = ColumnarAttemptStore()
+        naive = attempt_factory(1)
+        naive.timestamp = naive.timestamp.replace(tzinfo=None)
+        store.append(naive)
+        store.append(attempt_factory(2))
+        assert store[0].timestamp == naive.timestamp
+        assert store[0].timestamp.tzinfo is None
+        assert store[1].timestamp.tzinfo is not None
+
+    @pytest.mark.unit
+    def test_popleft_compacts_and_keeps_order(self, attempt_factory):
+        store = ColumnarAttemptStore()
+        for n in range(100):
+            store.append(attempt_factory(n, event_id=f"evt_{n}"))
+        popped = [store.popleft() for _ in range(70)]
+        assert [a.attempt_id for a in popped] == [f"att_{n:04d}" for n in range(70)]
+        assert len(store) == 30
+        assert store[0].attempt_id == "att_0070"
+        assert store.rows_for_event("evt_5") == []
+        assert store.rows_for_event("evt_80")[0].attempt_id == "att_0080"
+
+    @pytest.mark.unit
+    def test_rows_for_event_filters_by_interned_id(self, attempt_factory):
+        store = ColumnarAttemptStore()
+        store.append(attempt_factory(1, event_id="evt_a"))
+        store.append(attempt_factory(2, event_id="evt_b"))
+        store.append(attempt_factory(3, event_id="evt_a"))
+        assert [a.attempt_id for a in store.rows_for_event("evt_a")] == ["att_0001", "att_0003"]
+        assert store.rows_for_event("evt_missing") == []
+
+
+class TestAggregations:
+    """Tests for column scans."""
+
+    @pytest.mark.unit
+    def test_failure_count_and_failed_rows(self, attempt_factory):
+        store = ColumnarAttemptStore()
+        for n, code in enumerate([200, 500, None, 201, 404]):
+            store.append(attempt_factory(n, status_code=code))
+        assert store.failure_count() == 3
+        assert [a.status_code for a in store.failed_rows()] == [500, None, 404]
+
+    @pytest.mark.unit
+    def test_latency_percentiles_nearest_rank(self, attempt_factory):
+        store = ColumnarAttemptStore()
+        for n in range(1, 101):
+            store.append(attempt_factory(n))
+        result = store.latency_percentiles((50, 95, 99, 100))
+        assert result == {50: 50.0, 95: 95.0, 99: 99.0, 100: 100.0}
+
+    @pytest.mark.unit
+    def test_percentiles_of_empty_is_zero(self):
+        assert percentiles_of([], (50, 99)) == {50: 0.0, 99: 0.0}
@@ -0,0 +1,79 @@
+import pytest
+
+from src.observability.buckets import BucketRing, SparseBucketMap
+
+
+class TestBucketRing:
+    """Tests for the fixed-bucket rolling counter ring."""
+
+    @pytest.mark.unit
+    def test_counts_within_span(self):
+        ring = BucketRing(span_seconds=10, bucket_seconds=1)
+        ring.add(100.2, True)
+        ring.add(103.5, False)
+        ring.add(109.9, True)
+        assert ring.counts(109.9) == (2, 1)
+
+    @pytest.mark.unit
+    def test_old_buckets_expire_as_time_advances(self):
+        ring = BucketRing(span_seconds=10, bucket_seconds=1)
+        ring.add(100.0, False)
+        ring.add(105.0, True)
+        assert ring.counts(110.0) == (1, 0)
+        assert ring.counts(115.0) == (0, 0)
+
+    @pytest.mark.unit
+    def test_gap_longer_than_span_clears_ring(self):
+        ring = BucketRing(span_seconds=5, bucket_seconds=1)
+        for t in range(5):
+            ring.add(float(t), True)
+        ring.add(1000.0, False)
+        assert ring.counts(1000.0) == (0, 1)
+
+    @pytest.mark.unit
+    def test_shorter_window_sums_fewer_buckets(self):
+        ring = BucketRing(span_seconds=60, bucket_seconds=1)
+        ring.add(10.0, True)
+        ring.add(50.0, True)
+        ring.add(59.0, False)
+        assert ring.counts(59.0, window_seconds=10) == (1, 1)
+        assert ring.counts(59.0) == (2, 1)
+
+    @pytest.mark.unit
+    def test_memory_constant_regardless_of_volume(self):
+        ring = BucketRing(span_seconds=3, bucket_seconds=1)
+        for i in range(10_000):
+            ring.add(i / 1000, True)
+        assert len(ring.successes) == 3
+        assert sum(ring.counts(9.999)) == 3000
+
+
+class TestSparseBucketMap:
+    """Tests for sparse per-label bucket series."""
+
+    @pytest.mark.unit
+    def test_only_active_buckets_are_stored(self):
+        buckets = SparseBucketMap(span_seconds=300, bucket_seconds=1)
+        buckets.add(7, 10.0, True)
+        buckets.add(7, 10.5, False)
+        buckets.add(7, 70.0, True)
+        assert len(buckets.series[7]) == 6
+        assert buckets.counts(7, 70.0) == (2, 1)
+        assert buckets.counts(7, 70.0, window_seconds=30) == (1, 0)
+
+    @pytest.mark.unit
+    def test_expired_buckets_are_trimmed_on_write(self):
+        buckets = SparseBucketMap(span_seconds=10, bucket_seconds=1)
+        for t in range(30):
+            buckets.add(1, float(t), False)
+        assert len(buckets.series[1]) <= 3 * 11
+        assert buckets.counts(1, 29.0) == (0, 10)
+        assert buckets.counts(2, 29.0) == (0, 0)
+
+    @pytest.mark.unit
+    def test_out_of_order_buckets_stay_ordered(self):
+        buckets = SparseBucketMap(span_seconds=300, bucket_seconds=1)
+        buckets.add(1, 50.0, True)
+        buckets.add_bucket(1, 20, 0, 2)
+        buckets.add(1, 30.0, True)
+        assert buckets.items(1, 50.0) == [(20, 0, 2), (30, 1, 0), (50, 1, 0)]
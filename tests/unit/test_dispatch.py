@@ -0,0 +1,155 @@
+import threading
+import time
+
+import pytest
+
+from src.observability.alerting import AlertManager, FailureRateRule
+from src.observability.dispatch import AlertDispatcher
+
+
+def _alert(state: str = "firing", url: str = "http://a.test") -> dict:
+    return {"type": "webhook_failure_rate", "rule": "r", "state": state, "url": url}
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+class TestAlertDispatcher:
+    """Tests for background alert delivery."""
+
+    @pytest.mark.unit
+    def test_submit_does_not_wait_for_slow_callback(self):
+        release = threading.Event()
+        received = []
+        dispatcher = AlertDispatcher(lambda a: release.wait() and received.append(a))
+        start = time.perf_counter()
+        assert dispatcher.submit(_alert())
+        assert time.perf_counter() - start < 0.1
+        release.set()
+        _wait_for(lambda: received)
+        dispatcher.close()
+        assert len(received) == 1
+
+    @pytest.mark.unit
+    def test_failed_callback_retried(self):
+        calls = []
+
+        def flaky(alert):
+            calls.append(alert)
+            if len(calls) < 3:
+                raise RuntimeError("pager down")
+
+        dispatcher = AlertDispatcher(flaky, retries=3, retry_backoff=0.001)
+        dispatcher.submit(_alert())
+        _wait_for(lambda: dispatcher.dispatched)
+        dispatcher.close()
+        assert len(calls) == 3
+        assert dispatcher.failed == 0
+
+    @pytest.mark.unit
+    def test_timed_out_call_is_not_resent(self):
+        release = threading.Event()
+        calls = []
+
+        def hanging(alert):
+            calls.append(alert)
+            release.wait()
+
+        dispatcher = AlertDispatcher(
+            hanging, timeout=0.05, retries=2, retry_backoff=0.001, max_workers=1,
+        )
+        dispatcher.submit(_alert())
+        _wait_for(lambda: dispatcher.abandoned)
+        assert dispatcher.failed == 0
+        release.set()
+        _wait_for(lambda: dispatcher.dispatched)
+        dispatcher.close()
+        assert len(calls) == 1
+        assert (dispatcher.dispatched, dispatcher.failed, dispatcher.abandoned) == (1, 0, 0)
+
+    @pytest.mark.unit
+    def test_abandoned_call_that_raises_counts_as_failed(self):
+        release = threading.Event()
+
+        def hanging(alert):
+            release.wait()
+            raise RuntimeError("pager down")
+
+        dispatcher = AlertDispatcher(hanging, timeout=0.01, retries=1, retry_backoff=0.001)
+        dispatcher.submit(_alert())
+        _wait_for(lambda: dispatcher.abandoned)
+        release.set()
+        _wait_for(lambda: dispatcher.failed)
+        dispatcher.close()
+        assert (dispatcher.dispatched, dispatcher.failed) == (0, 1)
+
+    @pytest.mark.unit
+    def test_saturated_pool_fails_without_queueing(self):
+        release = threading.Event()
+        calls = []
+
+        def hanging(alert):
+            calls.append(alert)
+            release.wait()
+
+        dispatcher = AlertDispatcher(
+            hanging, timeout=0.02, retries=1, retry_backoff=0.001, max_workers=1,
+        )
+        dispatcher.submit(_alert(url="http://a.test"))
+        dispatcher.submit(_alert(url="http://b.test"))
+        _wait_for(lambda: dispatcher.failed)
+        assert dispatcher._pool._work_queue.qsize() == 0
+        release.set()
+        _wait_for(lambda: dispatcher.dispatched)
+        dispatcher.close()
+        assert len(calls) == 1
+        assert (dispatcher.dispatched, dispatcher.failed) == (1, 1)
+
+    @pytest.mark.unit
+    def test_dedupe_by_alert_key(self):
+        received = []
+        dispatcher = AlertDispatcher(received.append, dedupe_seconds=60)
+        assert dispatcher.submit(_alert())
+        assert not dispatcher.submit(_alert())
+        assert dispatcher.submit(_alert(url="http://b.test"))
+        assert dispatcher.submit(_alert(state="resolved"))
+        dispatcher.close()
+        assert len(received) == 3
+        assert dispatcher.deduplicated == 1
+
+    @pytest.mark.unit
+    def test_refire_after_resolve_is_sent(self):
+        received = []
+        dispatcher = AlertDispatcher(received.append, dedupe_seconds=60)
+        assert dispatcher.submit(_alert())
+        assert dispatcher.submit(_alert(state="resolved"))
+        assert dispatcher.submit(_alert())
+        assert not dispatcher.submit(_alert())
+        dispatcher.close()
+        assert [a["state"] for a in received] == ["firing", "resolved", "firing"]
+
+    @pytest.mark.unit
+    def test_full_queue_drops(self):
+        release = threading.Event()
+        dispatcher = AlertDispatcher(lambda a: release.wait(), max_queue=1, dedupe_seconds=0)
+        results = [dispatcher.submit(_alert(url=f"http://{n}.test")) for n in range(5)]
+        release.set()
+        dispatcher.close()
+        assert not all(results)
+        assert dispatcher.dropped == results.count(False)
+
+    @pytest.mark.unit
+    def test_alert_manager_hands_alerts_to_dispatcher(self, metrics):
+        received = []
+        dispatcher = AlertDispatcher(received.append)
+        am = AlertManager(
+            metrics=metrics, rules=[FailureRateRule(threshold=0.1)], dispatcher=dispatcher,
+        )
+        metrics.record_failure()
+        assert am.check() is not None
+        am.evaluate()
+        dispatcher.close()
+        assert [a["type"] for a in received] == ["webhook_failure_rate", "webhook_failure_rate"]
@@ -0,0 +1,222 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.replay.store import InMemoryEventStore, SQLiteEventStore
+from src.utils.factories import WebhookFactory
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        s = InMemoryEventStore()
+    else:
+        s = SQLiteEventStore(tmp_path / "events.db")
+    yield s
+    s.close()
+
+
+class TestEventStore:
+    """Tests shared by the in-memory and SQLite event stores."""
+
+    @pytest.mark.unit
+    def test_put_and_get(self, store):
+        event = WebhookFactory.create_event("payment.captured")
+        store.put(event, merchant_id="merch_1")
+        loaded = store.get(event.event_id)
+        assert loaded.event_id == event.event_id
+        assert loaded.payload == event.payload
+        assert loaded.timestamp == event.timestamp
+        assert event.event_id in store
+        assert store.get("evt_missing") is None
+
+    @pytest.mark.unit
+    def test_bulk_insert_and_streaming_order(self, store):
+        events = [WebhookFactory.create_event("payment.authorized") for _ in range(25)]
+        assert store.put_many(events) == 25
+        assert len(store) == 25
+        streamed = [e.event_id for e in store.iter_events(batch_size=7)]
+        assert streamed == [e.event_id for e in events]
+
+    @pytest.mark.unit
+    def test_by_payment(self, store):
+        auth = WebhookFactory.create_event("payment.authorized", payment_id="pay_1")
+        capture = WebhookFactory.create_event("payment.captured", payment_id="pay_1")
+        other = WebhookFactory.create_event("payment.captured", payment_id="pay_2")
+        store.put_many([auth, capture, other])
+        assert [e.event_id for e in store.by_payment("pay_1")] == [auth.event_id, capture.event_id]
+
+    @pytest.mark.unit
+    def test_reregistering_replaces(self, store):
+        event = WebhookFactory.create_event("payment.captured")
+        store.put(event)
+        store.put(event)
+        assert len(store) == 1
+
+
+class TestEventQuery:
+    """Tests for filtered, time-ordered queries."""
+
+    @staticmethod
+    def _event(event_type: str, hour: int):
+        event = WebhookFactory.create_event(event_type)
+        event.timestamp = datetime(2026, 3, 1, hour, tzinfo=timezone.utc)
+        return event
+
+    @pytest.mark.unit
+    def test_filters_by_type_merchant_and_time(self, store):
+        settled = [self._event("payment.settled", h) for h in (5, 1, 3, 7)]
+        store.put_many(settled, merchant_id="merch_x")
+        store.put(self._event("payment.settled", 4), merchant_id="merch_y")
+        store.put(self._event("payment.captured", 4), merchant_id="merch_x")
+
+        matches = list(store.query(
+            event_type="payment.settled",
+            merchant_id="merch_x",
+            start=datetime(2026, 3, 1, 2, tzinfo=timezone.utc),
+            end=datetime(2026, 3, 1, 6, tzinfo=timezone.utc),
+            batch_size=1,
+        ))
+        assert [e.timestamp.hour for e in matches] == [3, 5]
+        assert store.count(event_type="payment.settled", merchant_id="merch_x") == 4
+        assert store.count(merchant_id="merch_y") == 1
+
+    @pytest.mark.unit
+    def test_paging_keeps_events_with_equal_timestamps(self, store):
+        events = [self._event("payment.captured", 2) for _ in range(5)]
+        store.put_many(events)
+        assert len(list(store.query(batch_size=2))) == 5
+
+    @pytest.mark.unit
+    def test_count_matches_query(self, store):
+        store.put_many([self._event("payment.settled", h) for h in (6, 2, 4)], merchant_id="m1")
+        store.put_many([self._event("payment.captured", h) for h in (3, 5)], merchant_id="m2")
+        start = datetime(2026, 3, 1, 3, tzinfo=timezone.utc)
+        end = datetime(2026, 3, 1, 6, tzinfo=timezone.utc)
+        for filters in (
+            {}, {"start": start}, {"start": start, "end": end},
+            {"event_type": "payment.settled", "end": end},
+            {"merchant_id": "m2", "start": start},
+            {"event_type": "payment.settled", "merchant_id": "m2"},
+        ):
+            matches = list(store.query(**filters, batch_size=2))
+            assert store.count(**filters) == len(matches)
+            assert [e.timestamp for e in matches] == sorted(e.timestamp for e in matches)
+
+    @pytest.mark.unit
+    def test_small_merchant_query_streams_in_time_order(self, store):
+        store.put_many([self._event("payment.settled", h % 7) for h in range(50)], "m_big")
+        small = [self._event("payment.captured", h) for h in (5, 1, 3)]
+        store.put_many(small, merchant_id="m_small")
+        matches = store.query(merchant_id="m_small", batch_size=1)
+        assert next(matches).event_id == small[1].event_id
+        store.put(small[2], merchant_id="m_big")  # moved away mid-query
+        assert [e.event_id for e in matches] == [small[0].event_id]
+
+    @pytest.mark.unit
+    def test_naive_timestamps_index_as_utc(self, store, monkeypatch):
+        monkeypatch.setenv("TZ", "America/New_York")
+        time.tzset()
+        try:
+            event = WebhookFactory.create_event("payment.captured")
+            event.timestamp = datetime(2026, 3, 1, 12)
+            store.put(event)
+            assert store.count(start=datetime(2026, 3, 1, 12, tzinfo=timezone.utc)) == 1
+            assert store.count(end=datetime(2026, 3, 1, 12, 0, 1, tzinfo=timezone.utc)) == 1
+        finally:
+            monkeypatch.undo()
+            time.tzset()
+
+    @pytest.mark.unit
+    def test_reregistered_event_moves_merchant(self, store):
+        event = self._event("payment.captured", 2)
+        store.put(event, merchant_id="merch_a")
+        store.put(event, merchant_id="merch_b")
+        assert store.count(merchant_id="merch_a") == 0
+        assert [e.event_id for e in store.query(merchant_id="merch_b")] == [event.event_id]
+
+
+class TestEviction:
+    """Tests for age- and count-based eviction."""
+
+    @staticmethod
+    def _event(hours_ago: float, payment_id: str | None = None):
+        overrides = {"payment_id": payment_id} if payment_id else {}
+        event = WebhookFactory.create_event("payment.captured", **overrides)
+        event.timestamp = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+        return event
+
+    @pytest.mark.unit
+    def test_evicts_older_than_cutoff_then_oldest_over_limit(self, store):
+        events = [self._event(h) for h in (100, 80, 5, 4, 3, 2)]
+        store.put_many(events[3:], merchant_id="merch_1")
+        store.put_many(events[:3], merchant_id="merch_2")
+
+        evicted = store.evict(max_events=2, before=datetime.now(timezone.utc) - timedelta(hours=72))
+
+        assert [e.event_id for e, _ in evicted] == [e.event_id for e in events[:4]]
+        assert [m for _, m in evicted] == ["merch_2", "merch_2", "merch_2", "merch_1"]
+        assert len(store) == 2
+        assert events[0].event_id not in store
+        assert store.count(merchant_id="merch_2") == 0
+        assert [e.event_id for e in store.query()] == [e.event_id for e in events[4:]]
+
+    @pytest.mark.unit
+    def test_failed_archive_keeps_events(self, store):
+        events = [self._event(h) for h in (3, 2, 1)]
+        store.put_many(events)
+
+        def archive(evicted):
+            raise OSError("archive unavailable")
+
+        with pytest.raises(OSError):
+            store.evict(max_events=1, archive=archive)
+        assert len(store) == 3
+        assert [e.event_id for e in store.query()] == [e.event_id for e in events]
+        archived = []
+        store.evict(max_events=1, archive=archived.extend)
+        assert [e.event_id for e, _ in archived] == [e.event_id for e in events[:2]]
+        assert len(store) == 1
+
+    @pytest.mark.unit
+    def test_len_counts_replaced_events_once(self, store):
+        event = self._event(1)
+        store.put_many([event, event])
+        store.put(event)
+        store.put(self._event(2))
+        assert len(store) == 2
+        assert store.evict(max_events=2) == []
+
+    @pytest.mark.unit
+    def test_evicted_events_leave_payment_index(self, store):
+        old, recent = self._event(10, "pay_1"), self._event(1, "pay_1")
+        store.put_many([old, recent])
+        store.evict(max_events=1)
+        assert [e.event_id for e in store.by_payment("pay_1")] == [recent.event_id]
+
+    @pytest.mark.unit
+    def test_reregistered_event_is_aged_by_new_timestamp(self, store):
+        event = self._event(100)
+        store.put(event)
+        event.timestamp = datetime.now(timezone.utc)
+        store.put(event)
+        assert store.evict(before=datetime.now(timezone.utc) - timedelta(hours=72)) == []
+        assert event.event_id in store
+
+
+class TestSQLiteEventStore:
+    """Tests for the on-disk event store."""
+
+    @pytest.mark.unit
+    def test_survives_reopen(self, tmp_path):
+        path = tmp_path / "events.db"
+        event = WebhookFactory.create_event("payment.settled")
+        event.timestamp = datetime.now(timezone.utc) - timedelta(days=3)
+        first = SQLiteEventStore(path)
+        first.put(event, merchant_id="merch_1")
+        first.close()
+        reopened = SQLiteEventStore(path)
+        assert reopened.get(event.event_id).timestamp == event.timestamp
+        assert len(reopened) == 1
+        reopened.close()
@@ -0,0 +1,147 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from src.webhook_simulator.exporter import AttemptExporter, read_export
+from src.webhook_simulator.logger import DeliveryLogger
+
+
+class TestAttemptExporter:
+    """Tests for the background batched exporter."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("fmt", ["jsonl", "binary"])
+    def test_close_flushes_everything_in_order(self, tmp_path, fmt, attempt_factory):
+        path = tmp_path / f"attempts.{fmt}"
+        exporter = AttemptExporter(path, file_format=fmt, batch_size=7)
+        originals = [
+            attempt_factory(n, status_code=None if n % 5 == 0 else 200) for n in range(100)
+        ]
+        for a in originals:
+            assert exporter.submit(a) is True
+        exporter.close()
+
+        assert exporter.exported == 100
+        assert list(read_export(path, file_format=fmt)) == originals
+
+    @pytest.mark.unit
+    def test_drop_policy_counts_overflow(self, tmp_path, attempt_factory):
+        exporter = AttemptExporter(tmp_path / "a.jsonl", max_queue=1, overflow="drop")
+        gate = threading.Event()
+        original_write = exporter._write
+
+        def slow_write(batch):
+            gate.wait(5)
+            original_write(batch)
+
+        exporter._write = slow_write
+        results = [exporter.submit(attempt_factory(n)) for n in range(50)]
+        gate.set()
+        exporter.close()
+
+        assert exporter.dropped == results.count(False)
+        assert exporter.dropped > 0
+        assert exporter.exported + exporter.dropped == 50
+
+    @pytest.mark.unit
+    def test_submit_after_close_is_rejected(self, tmp_path, attempt_factory):
+        exporter = AttemptExporter(tmp_path / "a.jsonl")
+        exporter.close()
+        assert exporter.submit(attempt_factory(1)) is False
+
+    @pytest.mark.unit
+    def test_binary_round_trips_long_strings(self, tmp_path, attempt_factory):
+        path = tmp_path / "a.bin"
+        exporter = AttemptExporter(path, file_format="binary")
+        attempt = attempt_factory(1, status_code=None)
+        attempt.error = "x" * 70_000
+        exporter.submit(attempt)
+        exporter.close()
+        assert list(read_export(path, file_format="binary")) == [attempt]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("fmt", ["jsonl", "binary"])
+    def test_naive_timestamp_round_trips_in_any_timezone(
+        self, tmp_path, monkeypatch, fmt, attempt_factory,
+    ):
+        monkeypatch.setenv("TZ", "America/New_York")
+        time.tzset()
+        try:
+            path = tmp_path / f"a.{fmt}"
+            exporter = AttemptExporter(path, file_format=fmt)
+            attempt = attempt_factory(1)
+            attempt.timestamp = datetime(2026, 1, 1, 12, 0, 0)
+            exporter.submit(attempt)
+            exporter.close()
+            assert list(read_export(path, file_format=fmt)) == [attempt]
+        finally:
+            monkeypatch.undo()
+            time.tzset()
+
+    @pytest.mark.unit
+    def test_unencodable_attempt_is_skipped_and_counted(self, tmp_path, attempt_factory):
+        path = tmp_path / "a.jsonl"
+        exporter = AttemptExporter(path)
+        bad = attempt_factory(1)
+        bad.response_time_ms = object()
+        for a in (attempt_factory(0), bad, attempt_factory(2)):
+            exporter.submit(a)
+        exporter.close()
+        assert exporter.failed == 1
+        assert [a.attempt_id for a in read_export(path)] == ["att_0000", "att_0002"]
+
+    @pytest.mark.unit
+    def test_write_error_stops_exporter_without_hanging(self, tmp_path, attempt_factory):
+        exporter = AttemptExporter(tmp_path / "a.jsonl", max_queue=2, overflow="block")
+
+        def broken_write(data):
+            raise OSError("disk full")
+
+        exporter._file.write = broken_write
+        for n in range(20):
+            exporter.submit(attempt_factory(n))
+        exporter.close(timeout=5)
+
+        assert not exporter._thread.is_alive()
+        assert isinstance(exporter.error, OSError)
+        assert exporter.exported == 0
+        assert exporter.submit(attempt_factory(99)) is False
+
+    @pytest.mark.unit
+    def test_submit_racing_close_is_never_lost(self, tmp_path, attempt_factory):
+        path = tmp_path / "a.jsonl"
+        exporter = AttemptExporter(path)
+        accepted = []
+
+        def submitter():
+            for n in range(2000):
+                if exporter.submit(attempt_factory(n)):
+                    accepted.append(n)
+
+        thread = threading.Thread(target=submitter)
+        thread.start()
+        exporter.close()
+        thread.join()
+        assert exporter.exported == len(accepted)
+
+    @pytest.mark.unit
+    def test_invalid_options_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            AttemptExporter(tmp_path / "a", file_format="csv")
+        with pytest.raises(ValueError):
+            AttemptExporter(tmp_path / "a", overflow="spill")
+
+
+class TestLoggerExport:
+    """Tests for DeliveryLogger streaming to an exporter."""
+
+    @pytest.mark.unit
+    def test_logged_attempts_are_exported_on_close(self, tmp_path, attempt_factory):
+        path = tmp_path / "attempts.jsonl"
+        lg = DeliveryLogger(exporter=AttemptExporter(path))
+        for n in range(10):
+            lg.log(attempt_factory(n))
+        lg.close()
+        assert [a.attempt_id for a in read_export(path)] == [f"att_{n:04d}" for n in range(10)]
@@ -0,0 +1,80 @@
+import pytest
+
+from src.observability.histogram import LatencyHistogram, WindowedHistogram
+
+
+class TestLatencyHistogram:
+    """Tests for the log-linear latency histogram."""
+
+    @pytest.mark.unit
+    def test_percentiles_within_relative_error(self):
+        h = LatencyHistogram()
+        for ms in range(1, 1001):
+            h.record(float(ms))
+        assert h.count == 1000
+        assert h.percentile(50) == pytest.approx(500, rel=0.02)
+        assert h.percentile(95) == pytest.approx(950, rel=0.02)
+        assert h.percentile(99) == pytest.approx(990, rel=0.02)
+        assert h.max_ms == 1000.0
+
+    @pytest.mark.unit
+    def test_percentile_never_exceeds_max(self):
+        h = LatencyHistogram()
+        h.record(12.345)
+        assert h.percentile(100) == 12.345
+
+    @pytest.mark.unit
+    def test_merge_adds_counts(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        for _ in range(90):
+            a.record(10.0)
+        for _ in range(10):
+            b.record(2000.0)
+        a.merge(b)
+        assert a.count == 100
+        assert a.percentile(50) == pytest.approx(10.0, rel=0.02)
+        assert a.percentile(95) == pytest.approx(2000.0, rel=0.02)
+        assert a.max_ms == 2000.0
+
+    @pytest.mark.unit
+    def test_storage_is_sparse(self):
+        h = LatencyHistogram()
+        for _ in range(10_000):
+            h.record(42.0)
+        assert len(h.counts) == 1
+
+    @pytest.mark.unit
+    def test_empty_summary(self):
+        assert LatencyHistogram().summary() == {
+            "count": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0,
+        }
+
+
+class TestWindowedHistogram:
+    """Tests for the rolling-window histogram."""
+
+    @pytest.mark.unit
+    def test_old_slices_leave_the_window(self):
+        w = WindowedHistogram(window_seconds=10, slices=10)
+        w.record(100.0, 5000.0)
+        w.record(105.0, 10.0)
+        assert w.snapshot(105.0).max_ms == 5000.0
+        assert w.snapshot(111.0).max_ms == 10.0
+        assert w.snapshot(120.0).count == 0
+
+    @pytest.mark.unit
+    def test_shorter_query_window(self):
+        w = WindowedHistogram(window_seconds=10, slices=10)
+        w.record(100.0, 1.0)
+        w.record(109.0, 2.0)
+        assert w.snapshot(109.0, window_seconds=2).count == 1
+
+    @pytest.mark.unit
+    def test_state_round_trip_and_slice_merge(self):
+        w = WindowedHistogram(window_seconds=10, slices=10)
+        w.record(105.0, 10.0)
+        h = LatencyHistogram()
+        h.record(200.0)
+        w.merge_slice(103, LatencyHistogram.from_state(h.to_state()))
+        assert [idx for idx, _ in w.items(105.0)] == [103, 105]
+        assert w.snapshot(105.0).max_ms == 200.0
@@ -0,0 +1,253 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+from src.webhook_simulator.attempt_store import ColumnarAttemptStore
+from src.webhook_simulator.logger import DeliveryLogger
+
+
+class TestBoundedRing:
+    """Tests for the capacity-bounded in-memory ring."""
+
+    @pytest.mark.unit
+    def test_unbounded_by_default(self, logger, attempt_factory):
+        for n in range(50):
+            logger.log(attempt_factory(n))
+        assert logger.memory_count() == 50
+        assert len(logger.get_attempts()) == 50
+
+    @pytest.mark.unit
+    def test_capacity_drops_oldest_without_spill_dir(self, attempt_factory):
+        lg = DeliveryLogger(capacity=10)
+        for n in range(25):
+            lg.log(attempt_factory(n))
+        attempts = lg.get_attempts()
+        assert lg.memory_count() == 10
+        assert [a.attempt_id for a in attempts] == [f"att_{n:04d}" for n in range(15, 25)]
+
+    @pytest.mark.unit
+    def test_invalid_capacity_rejected(self):
+        with pytest.raises(ValueError):
+            DeliveryLogger(capacity=0)
+
+
+class TestSpillToDisk:
+    """Tests for overflow segments on disk."""
+
+    @pytest.mark.unit
+    def test_queries_read_across_both_tiers(self, tmp_path, attempt_factory):
+        lg = DeliveryLogger(capacity=5, spill_dir=tmp_path, segment_max_records=4)
+        for n in range(20):
+            lg.log(attempt_factory(n, status_code=500 if n % 3 == 0 else 200))
+
+        assert lg.memory_count() == 5
+        assert lg.spilled_count() == 15
+        attempts = lg.get_attempts()
+        assert [a.attempt_id for a in attempts] == [f"att_{n:04d}" for n in range(20)]
+        failed = lg.get_failed_attempts()
+        assert [a.attempt_id for a in failed] == [f"att_{n:04d}" for n in range(0, 20, 3)]
+        lg.close()
+
+    @pytest.mark.unit
+    def test_spilled_attempt_round_trips(self, tmp_path, attempt_factory):
+        lg = DeliveryLogger(capacity=1, spill_dir=tmp_path)
+        original = attempt_factory(1, status_code=None)
+        lg.log(original)
+        lg.log(attempt_factory(2))
+        assert lg.get_attempts(event_id=original.event_id) == [original]
+        lg.close()
+
+    @pytest.mark.unit
+    def test_spilled_aggregates_survive_reopen(self, tmp_path, attempt_factory):
+        lg = DeliveryLogger(capacity=1, spill_dir=tmp_path, segment_max_records=3)
+        for n in range(7):
+            lg.log(attempt_factory(n, status_code=500 if n % 2 else 200))
+        assert lg.failure_count() == 3
+        assert lg.latency_percentiles((100,)) == {100: 6.0}
+        lg.close()
+        reopened = DeliveryLogger(capacity=1, spill_dir=tmp_path, segment_max_records=3)
+        assert reopened.failure_count() == 3
+        assert reopened.latency_percentiles((50, 100)) == {50: 2.0, 100: 5.0}
+        assert [a.attempt_id for a in reopened.get_failed_attempts()] == [
+            "att_0001", "att_0003", "att_0005",
+        ]
+        reopened.close()
+
+    @pytest.mark.unit
+    def test_spilled_attempts_are_not_held_in_memory(self, tmp_path, attempt_factory):
+        lg = DeliveryLogger(capacity=10, spill_dir=tmp_path, segment_max_records=100)
+        for n in range(1000):
+            lg.log(attempt_factory(n))
+        assert lg.memory_count() == 10
+        assert not any(
+            isinstance(value, ColumnarAttemptStore) for value in vars(lg._spill).values()
+        )
+        assert lg.get_attempts(event_id="evt_0123")[0].attempt_id == "att_0123"
+        lg.close()
+
+    @pytest.mark.unit
+    def test_naive_timestamp_survives_spill(self, tmp_path, attempt_factory):
+        lg = DeliveryLogger(capacity=1, spill_dir=tmp_path)
+        original = attempt_factory(1)
+        original.timestamp = datetime(2026, 1, 1, 12, 0, 0)
+        lg.log(original)
+        lg.log(attempt_factory(2))
+        lg.close()
+        reopened = DeliveryLogger(capacity=1, spill_dir=tmp_path)
+        assert reopened.get_attempts(event_id=original.event_id) == [original]
+        reopened.close()
+
+    @pytest.mark.unit
+    def test_segments_rotate(self, tmp_path, attempt_factory):
+        lg = DeliveryLogger(capacity=1, spill_dir=tmp_path, segment_max_records=3)
+        for n in range(11):
+            lg.log(attempt_factory(n))
+        lg.close()
+        assert len(list(tmp_path.glob("attempts-*.jsonl"))) == 4
+
+    @pytest.mark.unit
+    def test_clear_removes_segments(self, tmp_path, attempt_factory):
+        lg = DeliveryLogger(capacity=2, spill_dir=tmp_path)
+        for n in range(6):
+            lg.log(attempt_factory(n))
+        lg.clear()
+        assert lg.get_attempts() == []
+        assert list(tmp_path.glob("attempts-*.jsonl")) == []
+
+
+class TestAggregations:
+    """Tests for failure counts and latency percentiles across tiers."""
+
+    @pytest.mark.unit
+    def test_aggregations_include_spilled_attempts(self, tmp_path, attempt_factory):
+        lg = DeliveryLogger(capacity=10, spill_dir=tmp_path)
+        for n in range(1, 101):
+            lg.log(attempt_factory(n, status_code=500 if n <= 20 else 200))
+        assert lg.failure_count() == 20
+        assert lg.latency_percentiles((50, 95)) == {50: 50.0, 95: 95.0}
+        lg.close()
+
+
+class TestOutstanding:
+    """Tests for the set of events whose latest attempt failed."""
+
+    @pytest.mark.unit
+    def test_later_success_clears_event(self, logger, attempt_factory):
+        logger.log(attempt_factory(1, status_code=500, event_id="evt_a"))
+        logger.log(attempt_factory(2, status_code=None, event_id="evt_b"))
+        logger.log(attempt_factory(3, status_code=200, event_id="evt_a"))
+        logger.log(attempt_factory(4, status_code=200, event_id="evt_c"))
+        assert logger.outstanding_event_ids() == ["evt_b"]
+        logger.log(attempt_factory(5, status_code=503, event_id="evt_a"))
+        assert logger.outstanding_event_ids() == ["evt_b", "evt_a"]
+        assert logger.outstanding_count() == 2
+
+    @pytest.mark.unit
+    def test_rebuilt_from_spill_on_restart(self, tmp_path, attempt_factory):
+        lg = DeliveryLogger(capacity=1, spill_dir=tmp_path)
+        lg.log(attempt_factory(1, status_code=500, event_id="evt_a"))
+        lg.log(attempt_factory(2, status_code=500, event_id="evt_b"))
+        lg.log(attempt_factory(3, status_code=200, event_id="evt_b"))
+        lg.log(attempt_factory(4, status_code=200, event_id="evt_c"))
+        lg.close()
+        restarted = DeliveryLogger(capacity=1, spill_dir=tmp_path)
+        assert restarted.outstanding_event_ids() == ["evt_a"]
+        restarted.close()
+
+    @pytest.mark.unit
+    def test_clear_empties_outstanding(self, logger, attempt_factory):
+        logger.log(attempt_factory(1, status_code=500))
+        logger.clear()
+        assert logger.outstanding_count() == 0
+
+
+class TestShardedWrites:
+    """Tests for the per-thread buffered write path."""
+
+    @pytest.mark.unit
+    def test_concurrent_logs_all_visible_in_per_thread_order(self, attempt_factory):
+        lg = DeliveryLogger(shards=4)
+
+        def write(thread_no: int) -> None:
+            for n in range(500):
+                lg.log(attempt_factory(n, event_id=f"evt_thread_{thread_no}"))
+
+        threads = [threading.Thread(target=write, args=(t,)) for t in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert lg.memory_count() == 8 * 500
+        for t in range(8):
+            ids = [a.attempt_id for a in lg.get_attempts(event_id=f"evt_thread_{t}")]
+            assert ids == [f"att_{n:04d}" for n in range(500)]
+
+    @pytest.mark.unit
+    def test_log_then_read_on_another_thread_is_visible(self, attempt_factory):
+        lg = DeliveryLogger(shards=4)
+        writer = threading.Thread(target=lg.log, args=(attempt_factory(1),))
+        writer.start()
+        writer.join()
+        assert [a.attempt_id for a in lg.get_attempts()] == ["att_0001"]
+
+
+class TestCursor:
+    """Tests for iter_since() and wait_for()."""
+
+    @pytest.mark.unit
+    def test_iter_since_returns_only_new_entries(self, logger, attempt_factory):
+        for n in range(3):
+            logger.log(attempt_factory(n))
+        seen = list(logger.iter_since(0))
+        assert [offset for offset, _ in seen] == [0, 1, 2]
+
+        logger.log(attempt_factory(3))
+        cursor = seen[-1][0] + 1
+        assert [a.attempt_id for _, a in logger.iter_since(cursor)] == ["att_0003"]
+        assert list(logger.iter_since(logger.end_cursor())) == []
+
+    @pytest.mark.unit
+    def test_iter_since_reads_into_spilled_segments(self, tmp_path, attempt_factory):
+        lg = DeliveryLogger(capacity=3, spill_dir=tmp_path, segment_max_records=2)
+        for n in range(10):
+            lg.log(attempt_factory(n))
+        assert [(o, a.attempt_id) for o, a in lg.iter_since(5)] == [
+            (n, f"att_{n:04d}") for n in range(5, 10)
+        ]
+        lg.close()
+
+    @pytest.mark.unit
+    def test_iter_since_skips_dropped_offsets(self, attempt_factory):
+        lg = DeliveryLogger(capacity=2)
+        for n in range(5):
+            lg.log(attempt_factory(n))
+        assert [o for o, _ in lg.iter_since(0)] == [3, 4]
+
+    @pytest.mark.unit
+    def test_offsets_keep_increasing_after_clear(self, logger, attempt_factory):
+        logger.log(attempt_factory(0))
+        logger.clear()
+        logger.log(attempt_factory(1))
+        assert [o for o, _ in logger.iter_since(0)] == [1]
+
+    @pytest.mark.unit
+    def test_wait_for_returns_attempt_logged_later(self, logger, attempt_factory):
+        timer = threading.Timer(0.05, logger.log, args=(attempt_factory(7, event_id="evt_late"),))
+        timer.start()
+        found = logger.wait_for(lambda a: a.event_id == "evt_late", timeout=5)
+        timer.join()
+        assert found is not None
+        assert found.attempt_id == "att_0007"
+
+    @pytest.mark.unit
+    def test_wait_for_times_out(self, logger, attempt_factory):
+        logger.log(attempt_factory(1))
+        assert logger.wait_for(lambda a: a.status_code == 500, timeout=0.05) is None
+
+    @pytest.mark.unit
+    def test_wait_for_respects_cursor(self, logger, attempt_factory):
+        logger.log(attempt_factory(1))
+        cursor = logger.end_cursor()
+        assert logger.wait_for(lambda a: True, timeout=0.05, cursor=cursor) is None
@@ -1,8 +1,10 @@
+import json
+import threading
 import time
 
 import pytest
 
-from src.observability.metrics import MetricsCollector
+from src.observability.metrics import OVERFLOW_LABEL, MetricsCollector
 
 
 class TestRecordAndCounts:
@@ -81,3 +83,271 @@ class TestReset:
         assert metrics.failure_rate() == 0.0
         assert metrics.success_count_in_window() == 0
         assert metrics.failure_count_in_window() == 0
+
+
+class TestConcurrentRecording:
+    """Tests for sharded recording from many threads."""
+
+    @pytest.mark.unit
+    def test_records_from_many_threads_are_all_counted(self):
+        mc = MetricsCollector(window_seconds=300, shards=4)
+
+        def record() -> None:
+            for n in range(200):
+                if n % 4 == 0:
+                    mc.record_failure()
+                else:
+                    mc.record_success()
+
+        threads = [threading.Thread(target=record) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert mc.total_in_window() == 2000
+        assert mc.failure_count_in_window() == 500
+        assert mc.failure_rate() == pytest.approx(0.25)
+
+
+class TestSnapshot:
+    """Tests for snapshot()."""
+
+    @pytest.mark.unit
+    def test_snapshot_fields_are_consistent(self, metrics):
+        for _ in range(3):
+            metrics.record_success()
+        metrics.record_failure()
+        snap = metrics.snapshot()
+        assert snap.successes == 3
+        assert snap.failures == 1
+        assert snap.total == 4
+        assert snap.failure_rate == pytest.approx(0.25)
+        assert snap.window_seconds == 300
+
+    @pytest.mark.unit
+    def test_empty_snapshot_has_zero_rate(self, metrics):
+        snap = metrics.snapshot()
+        assert snap.total == 0
+        assert snap.failure_rate == 0.0
+
+
+class TestLabelledMetrics:
+    """Tests for per-event-type and per-endpoint dimensions."""
+
+    @pytest.mark.unit
+    def test_failure_rate_for_one_event_type_and_merchant(self, metrics):
+        url_a = "http://merchant-a.test/webhook"
+        url_b = "http://merchant-b.test/webhook"
+        metrics.record_failure("payment.chargeback", url_a)
+        metrics.record_success("payment.chargeback", url_a)
+        metrics.record_success("payment.chargeback", url_b)
+        metrics.record_failure("payment.authorized", url_a)
+
+        snap = metrics.snapshot(event_type="payment.chargeback", url=url_a)
+        assert (snap.successes, snap.failures) == (1, 1)
+        assert metrics.snapshot(event_type="payment.chargeback").total == 3
+        assert metrics.snapshot(url=url_a).failures == 2
+        assert metrics.snapshot().total == 4
+
+    @pytest.mark.unit
+    def test_unknown_label_is_empty(self, metrics):
+        metrics.record_success("payment.settled", "http://a.test")
+        assert metrics.snapshot(event_type="payment.settled", url="http://b.test").total == 0
+
+    @pytest.mark.unit
+    def test_cardinality_overflow_bucket(self):
+        mc = MetricsCollector(window_seconds=300, max_label_sets=3)
+        for n in range(10):
+            mc.record_failure("payment.captured", f"http://merchant-{n}.test")
+        by_label = mc.snapshot_by_label()
+        assert len(by_label) == 4
+        assert by_label[OVERFLOW_LABEL].failures == 7
+        assert mc.snapshot().failures == 10
+
+    @pytest.mark.unit
+    def test_filtered_snapshot_reports_overflow(self):
+        mc = MetricsCollector(window_seconds=300, max_label_sets=2)
+        for n in range(5):
+            mc.record_failure("payment.captured", f"http://merchant-{n}.test")
+        snap = mc.snapshot(event_type="payment.captured")
+        assert (snap.failures, snap.overflow) == (2, 3)
+        assert mc.snapshot().overflow == 0
+
+    @pytest.mark.unit
+    def test_labelled_counts_expire_with_window(self):
+        mc = MetricsCollector(window_seconds=0.1)
+        mc.record_failure("payment.declined", "http://a.test")
+        time.sleep(0.15)
+        assert mc.snapshot(event_type="payment.declined").total == 0
+        assert mc.snapshot_by_label() == {}
+
+    @pytest.mark.unit
+    def test_reset_clears_labels(self, metrics):
+        metrics.record_success("payment.authorized", "http://a.test")
+        metrics.reset()
+        assert metrics.snapshot_by_label() == {}
+
+    @pytest.mark.unit
+    def test_reset_between_intern_and_record_reinterns(self):
+        mc = MetricsCollector(window_seconds=300)
+        intern = mc._labels.intern
+        calls = []
+
+        def intern_then_reset(label):
+            label_id = intern(label)
+            if not calls:
+                calls.append(label)
+                mc.reset()
+            return label_id
+
+        mc._labels.intern = intern_then_reset
+        mc.record_failure("payment.refunded", "http://a.test")
+        assert mc.snapshot_by_label()[("payment.refunded", "http://a.test")].failures == 1
+
+
+class TestLatency:
+    """Tests for latency histograms in the collector."""
+
+    @pytest.mark.unit
+    def test_latency_histogram_overall_and_by_label(self, metrics):
+        for ms in range(1, 101):
+            metrics.record_success("payment.authorized", "http://a.test", latency_ms=float(ms))
+        metrics.record_failure("payment.authorized", "http://b.test", latency_ms=5000.0)
+
+        overall = metrics.latency_histogram()
+        assert overall.count == 101
+        assert overall.max_ms == 5000.0
+        by_merchant = metrics.latency_histogram(url="http://a.test")
+        assert by_merchant.count == 100
+        assert by_merchant.percentile(95) == pytest.approx(95.0, rel=0.02)
+
+    @pytest.mark.unit
+    def test_records_without_latency_leave_histogram_empty(self, metrics):
+        metrics.record_success()
+        assert metrics.latency_histogram().count == 0
+
+    @pytest.mark.unit
+    def test_label_latency_capped_into_overflow(self):
+        metrics = MetricsCollector(window_seconds=60, max_latency_label_sets=2)
+        for n in range(5):
+            metrics.record_success("payment.captured", f"http://m{n}.test", latency_ms=10.0)
+        by_label = metrics.latency_by_label()
+        assert set(by_label) == {
+            ("payment.captured", "http://m0.test"),
+            ("payment.captured", "http://m1.test"),
+            OVERFLOW_LABEL,
+        }
+        assert by_label[OVERFLOW_LABEL].count == 3
+        assert metrics.snapshot(url="http://m4.test").total == 1
+        merged = MetricsCollector.from_states([metrics.export_state()])
+        assert merged.latency_histogram().count == 5
+        assert merged.latency_by_label()[OVERFLOW_LABEL].count == 3
+
+
+class TestMultiWindow:
+    """Tests for several rolling windows over one bucket structure."""
+
+    @pytest.mark.unit
+    def test_windows_include_default_window(self):
+        mc = MetricsCollector(window_seconds=300, windows=(60, 3600))
+        assert mc.windows == (60, 300, 3600)
+
+    @pytest.mark.unit
+    def test_snapshot_windows_returns_every_window(self):
+        mc = MetricsCollector(window_seconds=300, windows=(60, 3600))
+        mc.record_failure()
+        mc.record_success()
+        snaps = mc.snapshot_windows()
+        assert set(snaps) == {60, 300, 3600}
+        assert all(s.total == 2 and s.failures == 1 for s in snaps.values())
+        assert snaps[3600].window_seconds == 3600
+
+    @pytest.mark.unit
+    def test_short_window_expires_before_long_window(self):
+        mc = MetricsCollector(window_seconds=0.1, windows=(1.0,))
+        mc.record_failure("payment.captured", "http://a.test", latency_ms=30.0)
+        time.sleep(0.15)
+        assert mc.snapshot().total == 0
+        assert mc.snapshot(window_seconds=1.0).failures == 1
+        assert mc.snapshot(event_type="payment.captured", window_seconds=1.0).failures == 1
+        assert mc.latency_histogram(window_seconds=1.0).count == 1
+        assert mc.latency_histogram().count == 0
+
+    @pytest.mark.unit
+    def test_long_windows_use_coarser_buckets(self):
+        mc = MetricsCollector(window_seconds=300, windows=(60, 3600), shards=1)
+        mc.record_failure("payment.captured", "http://a.test", latency_ms=30.0)
+        tiers = next(iter(mc._shards)).tiers
+        assert [tier.ring.size for tier in tiers] == [100, 100, 100]
+        assert [tier.ring.bucket_seconds for tier in tiers] == [0.6, 3.0, 36.0]
+        assert mc.snapshot(event_type="payment.captured", window_seconds=3600).failures == 1
+        assert mc.latency_histogram(window_seconds=3600).count == 1
+
+    @pytest.mark.unit
+    def test_windows_with_the_same_bucket_width_share_a_tier(self):
+        mc = MetricsCollector(window_seconds=60, windows=(30,), bucket_seconds=1.0, shards=1)
+        assert len(next(iter(mc._shards)).tiers) == 1
+
+    @pytest.mark.unit
+    def test_window_longer_than_span_rejected(self, metrics):
+        with pytest.raises(ValueError):
+            metrics.snapshot(window_seconds=3600)
+
+
+class TestStateMerge:
+    """Tests for exporting and merging collector state."""
+
+    @pytest.mark.unit
+    def test_totals_outlive_window(self):
+        mc = MetricsCollector(window_seconds=0.1)
+        mc.record_success()
+        mc.record_failure()
+        time.sleep(0.15)
+        assert mc.snapshot().total == 0
+        assert mc.totals() == (1, 1)
+
+    @pytest.mark.unit
+    def test_export_state_is_json_round_trippable(self, metrics):
+        metrics.record_failure("payment.declined", "http://a.test", latency_ms=12.0)
+        state = json.loads(json.dumps(metrics.export_state()))
+        merged = MetricsCollector.from_states([state])
+        assert merged.totals() == (0, 1)
+        assert merged.snapshot(event_type="payment.declined").failures == 1
+        assert merged.latency_histogram(url="http://a.test").count == 1
+
+    @pytest.mark.unit
+    def test_merge_combines_workers(self):
+        workers = [MetricsCollector(window_seconds=300) for _ in range(3)]
+        for n, worker in enumerate(workers):
+            for _ in range(10):
+                worker.record_success("payment.authorized", latency_ms=float(n + 1))
+            worker.record_failure("payment.authorized", latency_ms=100.0)
+        merged = MetricsCollector.from_states([w.export_state() for w in workers])
+        snap = merged.snapshot()
+        assert snap.total == 33
+        assert snap.failures == 3
+        assert merged.snapshot_by_label()[("payment.authorized", None)].total == 33
+        assert merged.latency_histogram().max_ms == 100.0
+
+    @pytest.mark.unit
+    def test_merge_rejects_different_bucket_width(self, metrics):
+        other = MetricsCollector(window_seconds=300, bucket_seconds=0.5)
+        with pytest.raises(ValueError):
+            metrics.merge_state(other.export_state())
+
+    @pytest.mark.unit
+    def test_merge_rejects_different_windows(self, metrics):
+        other = MetricsCollector(window_seconds=300, windows=(3600,))
+        with pytest.raises(ValueError):
+            metrics.merge_state(other.export_state())
+
+    @pytest.mark.unit
+    def test_multi_window_state_round_trips(self):
+        mc = MetricsCollector(window_seconds=300, windows=(60, 3600))
+        mc.record_failure("payment.declined", "http://a.test", latency_ms=12.0)
+        merged = MetricsCollector.from_states([json.loads(json.dumps(mc.export_state()))])
+        assert {w: s.failures for w, s in merged.snapshot_windows().items()} == {
+            60: 1, 300: 1, 3600: 1,
+        }
+        assert merged.latency_histogram(url="http://a.test", window_seconds=3600).count == 1
@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from src.replay.pacing import ReplayProgress, ReplayRateController
+
+
+class TestReplayRateController:
+    """Tests for slow-start / AIMD replay pacing."""
+
+    @pytest.mark.unit
+    def test_slow_start_doubles_per_round(self):
+        rc = ReplayRateController(initial_rate=4, max_rate=100)
+        for _ in range(4):
+            rc.on_success()
+        assert rc.rate == 8
+
+    @pytest.mark.unit
+    def test_failure_halves_and_ends_slow_start(self):
+        rc = ReplayRateController(initial_rate=20, max_rate=100)
+        rc.on_failure()
+        assert rc.rate == 10
+        assert not rc.slow_start
+        for _ in range(10):
+            rc.on_success()
+        # additive increase: about +1/s per second of successes
+        assert rc.rate == pytest.approx(11, rel=0.05)
+
+    @pytest.mark.unit
+    def test_rate_bounds(self):
+        rc = ReplayRateController(initial_rate=2, max_rate=3, min_rate=1.5)
+        for _ in range(5):
+            rc.on_success()
+        assert rc.rate == 3
+        for _ in range(5):
+            rc.on_failure()
+        assert rc.rate == 1.5
+
+    @pytest.mark.unit
+    def test_acquire_paces_sends(self):
+        rc = ReplayRateController(initial_rate=100, max_rate=100)
+        start = time.monotonic()
+        for _ in range(11):
+            rc.acquire()
+        assert time.monotonic() - start >= 0.09
+
+    @pytest.mark.unit
+    def test_invalid_rates_rejected(self):
+        with pytest.raises(ValueError):
+            ReplayRateController(initial_rate=10, max_rate=5)
+
+    @pytest.mark.unit
+    def test_progress_remaining(self):
+        p = ReplayProgress(total=10, completed=4, succeeded=3, failed=1, rate=None, elapsed_seconds=1.0)
+        assert p.remaining == 6
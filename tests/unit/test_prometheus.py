@@ -0,0 +1,70 @@
+import pytest
+
+from src.observability.metrics import MetricsCollector
+from src.observability.prometheus import PrometheusRenderer
+
+
+class TestPrometheusRenderer:
+    """Tests for rendering metrics in the Prometheus text format."""
+
+    @pytest.mark.unit
+    def test_counters_windows_and_latency_rendered(self):
+        mc = MetricsCollector(window_seconds=300, windows=(60,))
+        mc.record_success("payment.captured", "http://a.test", latency_ms=20.0)
+        mc.record_failure("payment.captured", "http://a.test", latency_ms=80.0)
+        text = PrometheusRenderer(mc).render()
+
+        assert 'webhook_deliveries_total{outcome="failure"} 1' in text
+        assert (
+            'webhook_label_deliveries_total{event_type="payment.captured",'
+            'url="http://a.test",outcome="success"} 1'
+        ) in text
+        assert 'webhook_window_failure_rate{window="60"} 0.5' in text
+        assert 'webhook_window_failure_rate{window="300"} 0.5' in text
+        assert "webhook_delivery_latency_seconds_count 2" in text
+        assert "webhook_delivery_latency_seconds_sum 0.1" in text
+        assert 'url="http://a.test",quantile="0.99"} 0.08' in text
+        assert "# TYPE webhook_delivery_latency_seconds summary" in text
+        assert text.endswith("\n")
+
+    @pytest.mark.unit
+    def test_label_values_escaped(self):
+        mc = MetricsCollector(window_seconds=300)
+        mc.record_success('evt"quoted\\', None)
+        text = PrometheusRenderer(mc).render()
+        assert 'event_type="evt\\"quoted\\\\",url=""' in text
+
+    @pytest.mark.unit
+    def test_render_cached_within_min_interval(self):
+        mc = MetricsCollector(window_seconds=300)
+        renderer = PrometheusRenderer(mc, min_interval=60)
+        first = renderer.render()
+        mc.record_failure()
+        assert renderer.render() is first
+        renderer.invalidate()
+        assert 'webhook_deliveries_total{outcome="failure"} 1' in renderer.render()
+
+    @pytest.mark.unit
+    def test_unchanged_label_lines_reused(self):
+        mc = MetricsCollector(window_seconds=300)
+        mc.record_success("payment.captured", "http://a.test")
+        renderer = PrometheusRenderer(mc, min_interval=0)
+        renderer.render()
+        cached = renderer._counter_lines[("payment.captured", "http://a.test")][1]
+        mc.record_success("payment.refunded", "http://b.test")
+        renderer.render()
+        assert renderer._counter_lines[("payment.captured", "http://a.test")][1] is cached
+
+    @pytest.mark.unit
+    def test_caches_follow_collector_labels(self):
+        mc = MetricsCollector(window_seconds=300)
+        mc.record_success("payment.captured", "http://a.test", latency_ms=5.0)
+        renderer = PrometheusRenderer(mc, min_interval=0)
+        renderer.render()
+        assert len(renderer._latency_lines) == 1
+        mc.reset()
+        mc.record_success("payment.refunded", "http://b.test")
+        renderer.render()
+        assert list(renderer._counter_lines) == [("payment.refunded", "http://b.test")]
+        assert list(renderer._label_text) == [("payment.refunded", "http://b.test")]
+        assert renderer._latency_lines == {}
@@ -0,0 +1,224 @@
+import threading
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.models.delivery import DeliveryAttempt
+from src.replay.manager import WebhookReplayManager
+from src.replay.store import InMemoryEventStore, SQLiteEventStore
+from src.utils.factories import WebhookFactory
+
+
+def _aged(hours_ago: float):
+    event = WebhookFactory.create_event("payment.captured")
+    event.timestamp = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+    return event
+
+
+def _ok(event, url) -> list[DeliveryAttempt]:
+    return [DeliveryAttempt(
+        attempt_id=f"att_{event.event_id}",
+        event_id=event.event_id,
+        url=url,
+        status_code=200,
+        timestamp=datetime.now(timezone.utc),
+        response_time_ms=1.0,
+    )]
+
+
+class TestConcurrentReplay:
+    """Tests for the bounded in-flight window of concurrent replays."""
+
+    @pytest.mark.unit
+    def test_reads_at_most_batch_size_ahead(self, engine, logger, monkeypatch):
+        manager = WebhookReplayManager(engine, logger)
+        events = [WebhookFactory.create_event("payment.captured") for _ in range(40)]
+        state = {"read": 0, "done": 0, "ahead": 0}
+        lock = threading.Lock()
+
+        def source():
+            for event in events:
+                with lock:
+                    state["read"] += 1
+                    state["ahead"] = max(state["ahead"], state["read"] - state["done"])
+                yield event
+
+        def replay(event, url):
+            with lock:
+                state["done"] += 1
+            return _ok(event, url)
+
+        monkeypatch.setattr(manager, "_replay", replay)
+        results = manager._replay_many(source(), 40, "http://m.test", 4, None, None, batch_size=5)
+        assert len(results) == 40
+        assert state["ahead"] <= 5
+
+    @pytest.mark.unit
+    def test_slow_payment_does_not_hold_up_others(self, engine, logger, monkeypatch):
+        manager = WebhookReplayManager(engine, logger)
+        slow = [WebhookFactory.create_event("payment.captured", payment_id="pay_slow")]
+        fast = [
+            WebhookFactory.create_event("payment.captured", payment_id=f"pay_{n}")
+            for n in range(10)
+        ]
+        release = threading.Event()
+        finished = []
+
+        def replay(event, url):
+            if event.payment_id == "pay_slow":
+                release.wait(5)
+            finished.append(event.payment_id)
+            if len(finished) == len(fast):
+                release.set()
+            return _ok(event, url)
+
+        monkeypatch.setattr(manager, "_replay", replay)
+        manager._replay_many(slow + fast, 11, "http://m.test", 2, None, None, batch_size=3)
+        assert finished[-1] == "pay_slow"
+
+    @pytest.mark.unit
+    def test_payment_events_stay_in_order(self, engine, logger, monkeypatch):
+        manager = WebhookReplayManager(engine, logger)
+        events = [
+            WebhookFactory.create_event("payment.captured", payment_id=f"pay_{n % 3}")
+            for n in range(30)
+        ]
+        seen: dict[str, list[str]] = {}
+        lock = threading.Lock()
+
+        def replay(event, url):
+            with lock:
+                seen.setdefault(event.payment_id, []).append(event.event_id)
+            return _ok(event, url)
+
+        monkeypatch.setattr(manager, "_replay", replay)
+        manager._replay_many(events, 30, "http://m.test", 4, None, None, batch_size=4)
+        for payment_id, ids in seen.items():
+            assert ids == [e.event_id for e in events if e.payment_id == payment_id]
+
+    @pytest.mark.unit
+    def test_replay_error_is_raised(self, engine, logger, monkeypatch):
+        manager = WebhookReplayManager(engine, logger)
+        events = [WebhookFactory.create_event("payment.captured") for _ in range(10)]
+
+        def replay(event, url):
+            raise RuntimeError("engine failed")
+
+        monkeypatch.setattr(manager, "_replay", replay)
+        with pytest.raises(RuntimeError):
+            manager._replay_many(events, 10, "http://m.test", 4, None, None, batch_size=2)
+
+
+class TestReplayFailedOrder:
+    """Tests for the order replay_failed sends events in."""
+
+    @pytest.mark.unit
+    def test_equal_timestamps_replay_in_registration_order(self, engine, logger, monkeypatch):
+        manager = WebhookReplayManager(engine, logger)
+        at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        events = [
+            replace(WebhookFactory.create_event("payment.captured"), timestamp=at)
+            for _ in range(5)
+        ]
+        for event in events:
+            manager.register_event(event)
+        for event in reversed(events):
+            logger.log(replace(_ok(event, "http://m.test")[0], status_code=500))
+        sent = []
+
+        def replay(event, url):
+            sent.append(event.event_id)
+            return _ok(event, url)
+
+        monkeypatch.setattr(manager, "_replay", replay)
+        manager.replay_failed("http://m.test")
+        assert sent == [e.event_id for e in events]
+
+
+class TestRetention:
+    """Tests for WebhookReplayManager retention limits."""
+
+    @pytest.mark.unit
+    def test_max_events_deletes_oldest_on_register(self, engine, logger):
+        manager = WebhookReplayManager(engine, logger, max_events=3)
+        events = [_aged(h) for h in (5, 4, 3, 2, 1)]
+        for event in events:
+            manager.register_event(event)
+        assert len(manager.store) == 3
+        assert manager.get_event(events[0].event_id) is None
+        assert manager.get_event(events[-1].event_id) is not None
+
+    @pytest.mark.unit
+    def test_expired_events_move_to_cold_store(self, engine, logger, tmp_path):
+        cold = SQLiteEventStore(tmp_path / "cold.db")
+        manager = WebhookReplayManager(
+            engine, logger, max_age_seconds=72 * 3600, cold_store=cold,
+        )
+        stale, fresh = _aged(73), _aged(1)
+        manager.register_events([stale, fresh], merchant_id="merch_1")
+
+        assert stale.event_id not in manager.store
+        assert fresh.event_id in manager.store
+        assert cold.count(merchant_id="merch_1") == 1
+        assert manager.get_event(stale.event_id).payload == stale.payload
+        cold.close()
+
+    @pytest.mark.unit
+    def test_failed_cold_copy_keeps_events(self, engine, logger, monkeypatch):
+        cold = InMemoryEventStore()
+        manager = WebhookReplayManager(engine, logger, max_events=1, cold_store=cold)
+        first, second = _aged(2), _aged(1)
+        manager.register_event(first)
+
+        def broken(events, merchant_id=None):
+            raise OSError("cold store unavailable")
+
+        monkeypatch.setattr(cold, "put_many", broken)
+        with pytest.raises(OSError):
+            manager.register_event(second)
+        assert first.event_id in manager.store
+
+    @pytest.mark.unit
+    def test_rejects_non_positive_limits(self, engine, logger):
+        with pytest.raises(ValueError):
+            WebhookReplayManager(engine, logger, max_events=0)
+        with pytest.raises(ValueError):
+            WebhookReplayManager(engine, logger, max_age_seconds=0)
+
+
+class TestReplayEncoding:
+    """Tests for reusing an event's encoded body across replays."""
+
+    @pytest.mark.unit
+    def test_replays_resend_cached_bytes(self, engine, logger, monkeypatch):
+        manager = WebhookReplayManager(engine, logger)
+        event = WebhookFactory.create_event("payment.captured")
+        manager.register_event(event)
+        encodes, sent = [], []
+        original = engine.signer.encode
+        monkeypatch.setattr(engine.signer, "encode", lambda p: encodes.append(p) or original(p))
+        monkeypatch.setattr(
+            engine, "deliver_with_retry",
+            lambda event, url, **kwargs: sent.append(kwargs["encoded"]) or _ok(event, url),
+        )
+
+        manager.replay_event(event.event_id, "http://m.test")
+        manager.replay_event(event.event_id, "http://m.test")
+        assert len(encodes) == 1
+        assert sent[0] == sent[1] == original(event.payload)
+
+        changed = replace(event, payload={**event.payload, "amount": "1.00"})
+        manager.register_event(changed)
+        manager.replay_event(event.event_id, "http://m.test")
+        assert sent[2] == original(changed.payload)
+
+    @pytest.mark.unit
+    def test_cache_keeps_most_recent_events(self, engine, logger):
+        manager = WebhookReplayManager(engine, logger, encoded_cache_size=2)
+        events = [WebhookFactory.create_event("payment.captured") for _ in range(3)]
+        for event in events:
+            manager._encode(event)
+        assert list(manager._encoded) == [e.event_id for e in events[1:]]
+        with pytest.raises(ValueError):
+            WebhookReplayManager(engine, logger, encoded_cache_size=-1)
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from src.webhook_simulator.signer import WebhookSigner
@@ -63,3 +65,15 @@ class TestVerify:
         sig = signer.sign(payload)
         tampered = {"payment_id": "pay_123", "amount": "999.99"}
         assert signer.verify(tampered, sig) is False
+
+
+class TestEncode:
+    """Tests for WebhookSigner.encode()."""
+
+    @pytest.mark.unit
+    def test_encoded_body_round_trips_and_matches_sign(self, signer):
+        payload = {"payment_id": "pay_123", "amount": "100.00", "currency": "USD"}
+        body, signature = signer.encode(payload)
+        assert json.loads(body) == payload
+        assert signature == signer.sign(payload)
+        assert signer.verify(json.loads(body), signature)